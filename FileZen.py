@@ -1,10 +1,12 @@
 import tkinter as tk
-# For folder selection dialog and progress bar
-from tkinter import filedialog, ttk
-from resources import load_translations, load_background, load_icon
-from gui_helpers import create_canvas, add_progress_bar, add_language_buttons, add_undo_button
+# Pillow, the folder dialog and the undo journal are imported on first use,
+# so none of them delays the window from appearing
+from resources import load_translations, load_background_async, load_icon
+from gui_helpers import (create_canvas, set_canvas_background, add_progress_bar,
+                         add_language_buttons, add_undo_button)
 from event_handler import update_texts, switch_language
-from undo_manager import UndoManager
+from task_runner import run_in_background
+from log_pipeline import start_async_logging
 import logging
 
 # Configure logging for debugging and error tracking
@@ -13,21 +15,22 @@ logging.basicConfig(
     level=logging.DEBUG,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
+# Write the log from a background thread, so sorting never waits on app.log
+start_async_logging()
 
 # Initialize main application window
 app = tk.Tk()
 app.title("FileZen")
 app.geometry("740x600")
 
-# Load external resources, such as translations, background image, and icon
+# Load the lightweight resources needed to draw the window: translations and icon.
+# The background image is decoded in the background once the window is up.
 try:
     translations = load_translations("resources/translations.json")
-    background_photo = load_background("icon/background.jpg")
     load_icon(app, "icon/favicon.ico")
 except Exception as e:
     logging.error(f"Error loading resources: {e}")
     translations = {}
-    background_photo = None
 
 # Initialize variables for application state
 current_language = tk.StringVar(value="uk")  # Default language is Ukrainian
@@ -36,7 +39,7 @@ sort_option = tk.StringVar(value="type")
 progress_var = tk.DoubleVar()
 
 # Create and configure the main canvas for the UI
-canvas = create_canvas(app, background_photo)
+canvas = create_canvas(app)
 
 # Text elements for user interface
 lang_translations = translations.get(current_language.get(), {})
@@ -112,6 +115,18 @@ elements['run_button'] = tk.Button(
 )
 elements['run_button'].place(x=300, y=400)
 
+# Stops a running sort between two files; enabled only while sorting
+elements['cancel_button'] = tk.Button(
+    app,
+    text=lang_translations.get("cancel", "Stop"),
+    bg="#A9A9A9",
+    width=10,
+    height=1,
+    state="disabled",
+    command=lambda: cancel_sorting()
+)
+elements['cancel_button'].place(x=440, y=400)
+
 # Add a progress bar to show sorting progress
 add_progress_bar(app, canvas, progress_var)
 
@@ -126,19 +141,56 @@ add_language_buttons(
     translations  # Pass translations for localization
 )
 
-# Initialize undo functionality
-undo_manager = UndoManager()
+# Initialize undo functionality; the journal is opened on the first undo
+undo_manager = None
+
+# Cancel flag of the sorting run or undo in progress, and the sort type of
+# the last run
+active_cancel_flag = None
+last_sort_type = "organize_files"
+
+# Define functions to handle cancel and undo actions
 
-# Define function to handle undo action
+
+def cancel_sorting():
+    if active_cancel_flag is not None:
+        # The run stops between two files; on_done restores the buttons
+        active_cancel_flag.set()
+        logging.info("Cancellation requested.")
 
 
 def undo_action():
-    try:
-        # Undo file organization actions
-        undo_manager.undo("organize_files")
-        logging.info("Undo action executed successfully.")
-    except Exception as e:
-        logging.error(f"Error executing undo: {e}")
+    global active_cancel_flag
+    if active_cancel_flag is not None:
+        logging.warning("Undo is not available while sorting or undo is running.")
+        return
+    sort_type = last_sort_type
+
+    def task(relay, cancel_flag):
+        global undo_manager
+        # The journal is opened and restored on the worker, off the main loop
+        if undo_manager is None:
+            from undo_manager import UndoManager
+            undo_manager = UndoManager()
+        # Undo the most recent sorting run
+        return undo_manager.undo(sort_type)
+
+    def on_done(report, error):
+        global active_cancel_flag
+        active_cancel_flag = None
+        elements['run_button'].config(state="normal")
+        elements['undo_button'].config(state="normal")
+        if error is not None:
+            logging.error(f"Error executing undo: {error}")
+            folder_label.config(text=str(error))
+        else:
+            logging.info("Undo action executed successfully.")
+            folder_label.config(text=report.summary())
+
+    # Undo cannot be stopped halfway, so the Stop button stays disabled
+    elements['run_button'].config(state="disabled")
+    elements['undo_button'].config(state="disabled")
+    active_cancel_flag = run_in_background(app, task, on_done=on_done)
 
 
 # Add Undo button to the interface
@@ -148,6 +200,7 @@ add_undo_button(app, canvas, undo_action, current_language, elements)
 
 
 def browse_directory():
+    from tkinter import filedialog
     folder = filedialog.askdirectory()
     if folder:
         folder_path.set(folder)  # Save selected path
@@ -163,13 +216,53 @@ def browse_directory():
 
 
 def run_application():
+    global active_cancel_flag, last_sort_type
     selected_folder = folder_path.get()
-    if selected_folder:
-        logging.info(f"Running application in folder: {selected_folder}")
-        # Add sorting logic here
-    else:
+    if not selected_folder:
         logging.warning("No folder selected. Cannot proceed.")
+        return
+    if active_cancel_flag is not None:
+        logging.warning("Sorting is already running.")
+        return
+
+    logging.info(f"Running application in folder: {selected_folder}")
+    by_date = sort_option.get() == "date"
+    last_sort_type = "sort_by_year_and_month" if by_date else "organize_files"
+
+    def task(relay, cancel_flag):
+        # The engines are imported on the worker, off the main loop
+        if by_date:
+            from sort_by_date import sort_by_year_and_month
+            return sort_by_year_and_month(selected_folder, progress=relay.report,
+                                          cancel_flag=cancel_flag)
+        from organize_files import sort_by_type
+        return sort_by_type(selected_folder, relay, cancel_flag, app)
 
+    def on_done(executor, error):
+        global active_cancel_flag
+        active_cancel_flag = None
+        elements['run_button'].config(state="normal")
+        elements['undo_button'].config(state="normal")
+        elements['cancel_button'].config(state="disabled")
+        if error is not None:
+            folder_label.config(text=str(error))
+        else:
+            folder_label.config(text=executor.summary())
+
+    progress_var.set(0)
+    elements['run_button'].config(state="disabled")
+    elements['undo_button'].config(state="disabled")
+    elements['cancel_button'].config(state="normal")
+    active_cancel_flag = run_in_background(app, task, progress_var, on_done)
+
+
+# Decode and scale the background off the main thread; it is drawn behind
+# the widgets as soon as it is ready
+load_background_async(
+    app, "icon/background.jpg",
+    lambda photo: set_canvas_background(canvas, photo),
+    size=(740, 600)
+)
 
 # Start the Tkinter main event loop
 app.mainloop()
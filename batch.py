@@ -0,0 +1,346 @@
+import os
+import glob
+import json
+import time
+import shutil
+import logging
+import tempfile
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging.handlers import QueueHandler, QueueListener
+import instrumentation
+import log_pipeline
+
+# Strategy flag -> undo journal sort type
+SORT_TYPES = {
+    "type": "organize_files",
+    "date": "sort_by_year_and_month",
+}
+
+# Outcome of one folder of a batch. errors holds the (path, message) pairs of
+# files that failed; error is set when the whole folder failed.
+FolderResult = namedtuple(
+    "FolderResult",
+    ["folder_path", "moved", "renamed", "copied", "errors", "seconds", "error"])
+
+# Longest a worker holds recorded moves before committing its journal, so
+# a worker that dies loses at most this much undo information
+WORKER_JOURNAL_SECONDS = 1.0
+
+# Rules compiled in the parent, received once per worker process
+_worker_rules = None
+
+
+class BatchReport:
+    """
+    Merged outcome of a batch run over many folders.
+    """
+
+    def __init__(self, strategy):
+        """
+        Initializes an empty report.
+
+        Args:
+            strategy (str): "type" or "date".
+        """
+        self.strategy = strategy
+        self.results = []  # FolderResult per folder, in scheduling order
+        self.merged_moves = 0  # Moves copied into the shared undo journal
+        self.elapsed = 0.0
+
+    @property
+    def moved(self):
+        """
+        Returns:
+            int: Files moved across every folder.
+        """
+        return sum(result.moved for result in self.results)
+
+    @property
+    def failed_folders(self):
+        """
+        Returns:
+            list: FolderResult of every folder that failed as a whole.
+        """
+        return [result for result in self.results if result.error is not None]
+
+    def summary(self):
+        """
+        Returns:
+            str: Human-readable one-line summary of the batch.
+        """
+        file_errors = sum(len(result.errors) for result in self.results)
+        return (f"Sorted {len(self.results)} folders by {self.strategy} in "
+                f"{self.elapsed:.1f}s: moved {self.moved} files, {file_errors} "
+                f"failed, {len(self.failed_folders)} folders failed")
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: JSON-ready report with the totals and one entry per folder.
+        """
+        return {
+            "run": "batch", "strategy": self.strategy,
+            "elapsed_seconds": round(self.elapsed, 6),
+            "folders": len(self.results), "moved": self.moved,
+            "failed_folders": len(self.failed_folders),
+            "merged_moves": self.merged_moves,
+            "results": [{"folder": result.folder_path, "moved": result.moved,
+                         "renamed": result.renamed, "copied": result.copied,
+                         "errors": len(result.errors),
+                         "seconds": round(result.seconds, 6), "error": result.error}
+                        for result in self.results],
+        }
+
+
+def sort_batch(folders, strategy="type", processes=None, category_index=None,
+               undo_manager=None, **options):
+    """
+    Sorts many folders at once, one folder per worker process at a time.
+
+    Folders are scheduled largest first, so one huge folder does not start
+    last and hold up the end of the batch. The compiled category rules are
+    sent to each worker once. Every worker records its moves in its own
+    undo journal; they are merged into one undo run afterwards, and their
+    log records are written by this process. A folder that fails, even by
+    killing its worker, only fails itself.
+
+    Args:
+        folders (list): Folders to sort.
+        strategy (str): "type" for category folders, "date" for year/month
+            folders.
+        processes (int, optional): Folders sorted at the same time. Defaults
+            to the number of CPUs.
+        category_index (CategoryIndex or RuleSet, optional): Compiled rules for the type
+            strategy. Defaults to organize_files.default_category_index().
+        undo_manager (UndoManager, optional): Journal receiving the merged
+            undo run. Defaults to the one of the chosen engine.
+        **options: Passed to organize_files() or sort_by_year_and_month(),
+            such as workers, recursive or flatten. "sniff" (bool) creates a
+            content sniffer in each worker.
+
+    Raises:
+        ValueError: If strategy is unknown, or the default rules file is
+            invalid.
+
+    Returns:
+        BatchReport: Per-folder results and totals.
+    """
+    if strategy not in SORT_TYPES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    import organize_files
+    import sort_by_date
+    if category_index is None:
+        category_index = organize_files.default_category_index()
+    if undo_manager is None:
+        undo_manager = (organize_files if strategy == "type" else sort_by_date).undo_manager
+
+    report = BatchReport(strategy)
+    started = time.perf_counter()
+    work_dir = tempfile.mkdtemp(prefix="filezen-batch-")
+    context = multiprocessing.get_context("spawn")
+    log_queue = context.Queue()
+    listener = QueueListener(log_queue, _ParentLogHandler())
+    listener.start()
+    merged = False
+    try:
+        try:
+            pending = list(enumerate(sorted(folders, key=_folder_size, reverse=True)))
+            initargs = (work_dir, category_index, log_queue,
+                        logging.getLogger().getEffectiveLevel(),
+                        bool(instrumentation.settings()["report_path"]),
+                        log_pipeline.summary_enabled())
+            while pending:
+                broken = _run_pool(pending, strategy, options, processes, context,
+                                   initargs, report.results)
+                # Folders that were running when a worker died are retried
+                # alone, to find the culprit; the ones that never started go
+                # back to a full pool.
+                running = [(key, folder_path) for key, folder_path in broken
+                           if os.path.exists(_start_marker(work_dir, key))]
+                if not running:
+                    running = broken
+                    broken = []
+                for key, folder_path in running:
+                    if _run_pool([(key, folder_path)], strategy, options, 1, context,
+                                 initargs, report.results):
+                        logging.error(f"Worker process died while sorting {folder_path}")
+                        report.results.append(FolderResult(
+                            folder_path, 0, 0, 0, [], 0.0, "worker process died"))
+                pending = [item for item in broken if item not in running]
+        finally:
+            listener.stop()
+            report.merged_moves = undo_manager.merge(
+                SORT_TYPES[strategy],
+                sorted(glob.glob(os.path.join(work_dir, "journal-*.sqlite3"))))
+            merged = True
+        report.elapsed = time.perf_counter() - started
+        _merge_run_reports(work_dir, report)
+    finally:
+        # Unmerged worker journals are the only undo record of their moves
+        if merged:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        else:
+            logging.error(f"Undo journals of the batch were not merged, kept in {work_dir}")
+
+    logging.info(report.summary())
+    return report
+
+
+def _run_pool(folders, strategy, options, processes, context, initargs, results):
+    """
+    Sorts folders on a fresh process pool.
+
+    Args:
+        folders (list): (key, folder) pairs, in the order they should start.
+            The key names the start marker of the folder.
+        strategy (str): "type" or "date".
+        options (dict): Engine options.
+        processes (int): Pool size.
+        context: Multiprocessing context of the pool.
+        initargs (tuple): Arguments of _start_worker.
+        results (list): Receives a FolderResult per finished folder.
+
+    Returns:
+        list: (key, folder) pairs without a result because a worker died,
+            started or not.
+    """
+    work_dir = initargs[0]
+    broken = []
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                             initializer=_start_worker, initargs=initargs) as pool:
+        futures = [(key, folder_path,
+                    pool.submit(_sort_folder, folder_path, strategy, options,
+                                _start_marker(work_dir, key)))
+                   for key, folder_path in folders]
+        for key, folder_path, future in futures:
+            try:
+                results.append(future.result())
+            except BrokenProcessPool:
+                broken.append((key, folder_path))
+    return broken
+
+
+def _start_marker(work_dir, key):
+    """
+    Returns:
+        str: Path of the file a worker creates when it starts sorting the
+            folder of this key.
+    """
+    return os.path.join(work_dir, f"started-{key}")
+
+
+def _start_worker(work_dir, category_index, log_queue, log_level, report, summary):
+    """
+    Prepares a worker process: its own undo journal and run report file, the
+    shared category rules, and logging through the parent.
+
+    Returns:
+        None
+    """
+    global _worker_rules
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(log_level)
+    if summary:
+        log_pipeline.start_summary()
+
+    # Imported after logging is set up, so their file logging stays off
+    import organize_files
+    import sort_by_date
+    from undo_manager import UndoManager
+
+    _worker_rules = category_index
+    journal = UndoManager(os.path.join(work_dir, f"journal-{os.getpid()}.sqlite3"),
+                          flush_seconds=WORKER_JOURNAL_SECONDS)
+    organize_files.undo_manager = journal
+    sort_by_date.undo_manager = journal
+    if report:
+        instrumentation.configure(os.path.join(work_dir, f"report-{os.getpid()}.jsonl"))
+
+
+def _sort_folder(folder_path, strategy, options, marker_path):
+    """
+    Sorts one folder in a worker process.
+
+    Args:
+        folder_path (str): Folder to sort.
+        strategy (str): "type" or "date".
+        options (dict): Engine options.
+        marker_path (str): File created first, to tell a folder that was
+            running when its worker died from one that never started.
+
+    Returns:
+        FolderResult: Outcome of the folder; failures are reported, not raised.
+    """
+    import organize_files
+    import sort_by_date
+
+    open(marker_path, "w").close()
+    options = dict(options)
+    started = time.perf_counter()
+    sniffer = None
+    try:
+        if strategy == "type":
+            if options.pop("sniff", False):
+                from content_sniffer import ContentSniffer
+                sniffer = options["sniffer"] = ContentSniffer()
+            executor = organize_files.organize_files(
+                folder_path, category_index=_worker_rules, **options)
+        else:
+            executor = sort_by_date.sort_by_year_and_month(folder_path, **options)
+    except Exception as e:
+        logging.error(f"Error sorting {folder_path}: {e}")
+        return FolderResult(folder_path, 0, 0, 0, [], time.perf_counter() - started, str(e))
+    finally:
+        if sniffer is not None:
+            sniffer.close()
+        log_pipeline.flush_summary()
+    return FolderResult(folder_path, executor.moved, executor.renamed, executor.copied,
+                        executor.errors, time.perf_counter() - started, None)
+
+
+def _folder_size(folder_path):
+    """
+    Returns:
+        int: Number of entries in a folder, 0 if it cannot be read.
+    """
+    try:
+        with os.scandir(folder_path) as it:
+            return sum(1 for _ in it)
+    except OSError:
+        return 0
+
+
+def _merge_run_reports(work_dir, report):
+    """
+    Appends the run reports of the workers and the batch totals to the
+    configured report file.
+
+    Returns:
+        None
+    """
+    report_path = instrumentation.settings()["report_path"]
+    if not report_path:
+        return
+    try:
+        with open(report_path, "a", encoding="utf-8") as out:
+            for path in sorted(glob.glob(os.path.join(work_dir, "report-*.jsonl"))):
+                with open(path, encoding="utf-8") as f:
+                    shutil.copyfileobj(f, out)
+            out.write(json.dumps(report.to_dict()) + "\n")
+    except OSError as e:
+        logging.error(f"Cannot write run report: {e}")
+
+
+class _ParentLogHandler(logging.Handler):
+    """
+    Hands records logged by worker processes to the loggers of this process.
+    """
+
+    def emit(self, record):
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
@@ -0,0 +1,77 @@
+"""
+Microbenchmark for year/month bucketing of modification times.
+
+Compares the per-file datetime and strftime formatting the date sorter used
+to do with one batched lookup in the precomputed month table. Only folder
+names are computed, so no file is created or moved. Usage, from the
+repository root:
+
+    python -m benchmarks.bench_date_buckets --count 1000000
+"""
+import os
+import time
+import random
+import argparse
+import datetime
+
+
+def _per_file(timestamps, target_root):
+    """
+    Builds month folder paths the way the date sorter did per file.
+
+    Returns:
+        list: Month folder path of each timestamp.
+    """
+    folders = []
+    for timestamp in timestamps:
+        date = datetime.datetime.fromtimestamp(timestamp)
+        year_folder = os.path.join(target_root, str(date.year))
+        folders.append(os.path.join(year_folder, date.strftime('%m-%B')))
+    return folders
+
+
+def _bucketed(timestamps, target_root):
+    """
+    Builds month folder paths through the shared month table.
+
+    Returns:
+        list: Month folder path of each timestamp.
+    """
+    from date_buckets import MONTH_BUCKETS
+
+    joined = {}
+    folders = []
+    for folder in MONTH_BUCKETS.folders(timestamps):
+        path = joined.get(folder)
+        if path is None:
+            path = joined[folder] = os.path.join(target_root, folder)
+        folders.append(path)
+    return folders
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000000)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    # Ten years of modification times, like a long-lived downloads folder
+    now = time.time()
+    timestamps = [rng.uniform(now - 10 * 365 * 86400, now) for _ in range(args.count)]
+
+    _bucketed(timestamps[:1], "sorted")  # Build the month table outside the timing
+    results = {}
+    for name, bucket in (("per-file", _per_file), ("bucketed", _bucketed)):
+        started = time.perf_counter()
+        results[name] = bucket(timestamps, "sorted")
+        elapsed = time.perf_counter() - started
+        print(f"{name:>9} {args.count:>10} files {elapsed:>8.2f} s "
+              f"{args.count / elapsed:>12.0f} files/sec")
+        results[name + "_seconds"] = elapsed
+
+    assert results["per-file"] == results["bucketed"], "bucketing changed folder names"
+    print(f"speedup: {results['per-file_seconds'] / results['bucketed_seconds']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
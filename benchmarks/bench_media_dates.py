@@ -0,0 +1,113 @@
+"""
+Throughput benchmark for capture-date extraction on a synthetic photo corpus.
+
+Creates small JPEG files carrying an EXIF DateTimeOriginal, then plans a
+year/month sort by modification time and by capture date, in-process and on
+a process pool. Only planning is timed, so no file moves. Usage, from the
+repository root:
+
+    python -m benchmarks.bench_media_dates --count 100000 --workers 1 4 8
+"""
+import os
+import time
+import random
+import shutil
+import struct
+import logging
+import argparse
+import tempfile
+
+
+def exif_jpeg(date_text):
+    """
+    Builds a minimal JPEG whose EXIF block holds a DateTimeOriginal.
+
+    Args:
+        date_text (str): Date in EXIF form, such as "2019:07:04 12:00:00".
+
+    Returns:
+        bytes: File content: SOI, an APP1 EXIF segment and EOI.
+    """
+    # Little-endian TIFF: IFD0 points to the Exif IFD, which holds the date
+    exif_ifd = 8 + 2 + 12 + 4
+    date_offset = exif_ifd + 2 + 12 + 4
+    tiff = (b"II" + struct.pack("<HI", 42, 8)
+            + struct.pack("<H", 1) + struct.pack("<HHII", 0x8769, 4, 1, exif_ifd)
+            + struct.pack("<I", 0)
+            + struct.pack("<H", 1) + struct.pack("<HHII", 0x9003, 2, 20, date_offset)
+            + struct.pack("<I", 0)
+            + date_text.encode("ascii") + b"\x00")
+    app1 = b"Exif\x00\x00" + tiff
+    return (b"\xff\xd8" + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1
+            + b"\xff\xd9")
+
+
+def _create_photos(folder_path, count):
+    """
+    Creates photos with random capture dates and a shared recent mtime.
+
+    Args:
+        folder_path (str): Folder to fill.
+        count (int): Number of photos to create.
+
+    Returns:
+        None
+    """
+    rng = random.Random(42)
+    os.makedirs(folder_path, exist_ok=True)
+    for i in range(count):
+        date_text = (f"{rng.randint(2005, 2024)}:{rng.randint(1, 12):02d}:"
+                     f"{rng.randint(1, 28):02d} 12:00:00")
+        with open(os.path.join(folder_path, f"IMG_{i:06d}.jpg"), "wb") as f:
+            f.write(exif_jpeg(date_text))
+
+
+def _plan(folder_path, date_source, workers):
+    """
+    Plans a year/month sort and times it.
+
+    Args:
+        folder_path (str): Folder to plan.
+        date_source (str): "mtime" or "media".
+        workers (int): Processes for capture-date extraction.
+
+    Returns:
+        tuple: (number of planned moves, seconds spent).
+    """
+    from media_dates import MediaDateReader
+    from sort_by_date import iter_moves_by_year_and_month
+
+    started = time.perf_counter()
+    if date_source == "media":
+        with MediaDateReader(workers) as reader:
+            moves = list(iter_moves_by_year_and_month(folder_path, date_reader=reader))
+    else:
+        moves = list(iter_moves_by_year_and_month(folder_path))
+    return len(moves), time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args(argv)
+
+    # Keep per-file log lines out of the measurement and the working directory
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()])
+
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    work_dir = tempfile.mkdtemp(prefix="filezen-bench-", dir=base)
+    try:
+        _create_photos(work_dir, args.count)
+        print(f"{'source':>8} {'workers':>8} {'files':>10} {'seconds':>9} {'files/sec':>11}")
+        runs = [("mtime", 1)] + [("media", workers) for workers in args.workers]
+        for date_source, workers in runs:
+            planned, elapsed = _plan(work_dir, date_source, workers)
+            print(f"{date_source:>8} {workers:>8} {planned:>10} {elapsed:>9.2f} "
+                  f"{planned / elapsed:>11.0f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
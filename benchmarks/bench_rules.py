@@ -0,0 +1,102 @@
+"""
+Microbenchmark for classification rule sets of growing size.
+
+Builds rule sets of extension rules and globs with distinct literal
+prefixes, then times the compiled RuleSet against a plain first-match loop
+over the same rules. The compiled cost per file should stay flat as the
+rules grow, while the loop grows with them. Usage, from the repository root:
+
+    python -m benchmarks.bench_rules --rules 10 100 1000 10000
+"""
+import time
+import random
+import fnmatch
+import argparse
+
+
+def _rules(count):
+    """
+    Builds count rules: three extension rules for every prefixed glob rule.
+
+    Returns:
+        list: Rule entries, in priority order.
+    """
+    from rule_engine import Rule
+
+    rules = []
+    for number in range(count):
+        if number % 4 == 3:
+            rules.append(Rule(f"Glob {number}", glob=f"p{number:05d}_*"))
+        else:
+            rules.append(Rule(f"Ext {number}", extensions=f".e{number}"))
+    return rules
+
+
+def _names(count, rule_count, rng):
+    """
+    Returns:
+        list: File names hitting random rules, and a tenth matching none.
+    """
+    names = []
+    for _ in range(count):
+        number = rng.randrange(rule_count)
+        if rng.random() < 0.1:
+            names.append(f"unmatched_{number}.bin")
+        elif number % 4 == 3:
+            names.append(f"p{number:05d}_scan.jpg")
+        else:
+            names.append(f"file_{number}.e{number}")
+    return names
+
+
+def _linear(rules, default):
+    """
+    Returns:
+        function: Name -> category, trying every rule in turn.
+    """
+    def lookup(file_name):
+        lowered = file_name.lower()
+        for rule in rules:
+            if rule.extensions is not None and lowered.endswith(rule.extensions):
+                return rule.category
+            if rule.glob is not None and any(fnmatch.fnmatch(lowered, pattern.lower())
+                                             for pattern in rule.glob):
+                return rule.category
+        return default
+    return lookup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--count", type=int, default=100000, help="File names per size.")
+    parser.add_argument("--linear-limit", type=int, default=1000,
+                        help="Largest rule count also timed with the first-match loop.")
+    args = parser.parse_args(argv)
+
+    from rule_engine import RuleSet
+
+    rng = random.Random(42)
+    print(f"{'rules':>7} {'compile s':>10} {'compiled ns/file':>17} {'loop ns/file':>13}")
+    for rule_count in args.rules:
+        started = time.perf_counter()
+        rule_set = RuleSet(_rules(rule_count))
+        compile_seconds = time.perf_counter() - started
+        names = _names(args.count, rule_count, rng)
+
+        started = time.perf_counter()
+        decisions = [rule_set.lookup(name) for name in names]
+        compiled_ns = (time.perf_counter() - started) / len(names) * 1e9
+
+        loop = "-"
+        if rule_count <= args.linear_limit:
+            lookup = _linear(rule_set.rules, rule_set.default)
+            started = time.perf_counter()
+            expected = [lookup(name) for name in names]
+            loop = f"{(time.perf_counter() - started) / len(names) * 1e9:.0f}"
+            assert decisions == expected, "compiled rules changed a decision"
+        print(f"{rule_count:>7} {compile_seconds:>10.3f} {compiled_ns:>17.0f} {loop:>13}")
+
+
+if __name__ == "__main__":
+    main()
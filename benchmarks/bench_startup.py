@@ -0,0 +1,79 @@
+"""
+Startup-time benchmark for the FileZen window.
+
+Launches FileZen.py in fresh processes and reports how long it takes until
+the window is idle (drawn and responsive) and until the background image is
+in place. Requires a display (for example under xvfb-run). Usage, from the
+repository root:
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs FileZen.py with the main loop instrumented. Executed with -c in a child.
+_DRIVER = r"""
+import json, runpy, sys, time
+started = time.perf_counter()
+import tkinter, gui_helpers
+
+marks = {}
+set_background = gui_helpers.set_canvas_background
+
+def timed_set_background(canvas, photo):
+    set_background(canvas, photo)
+    marks["background_ms"] = (time.perf_counter() - started) * 1000
+    canvas.after_idle(canvas.winfo_toplevel().destroy)
+
+gui_helpers.set_canvas_background = timed_set_background
+mainloop = tkinter.Tk.mainloop
+
+def timed_mainloop(self, n=0):
+    def idle():
+        marks["window_ms"] = (time.perf_counter() - started) * 1000
+        marks["modules"] = len(sys.modules)
+    self.after_idle(idle)
+    self.after(10000, self.destroy)  # Safety net if the background never loads
+    mainloop(self, n)
+
+tkinter.Tk.mainloop = timed_mainloop
+runpy.run_path("FileZen.py", run_name="__main__")
+print(json.dumps(marks))
+"""
+
+
+def measure_once():
+    """
+    Starts FileZen once in a child process.
+
+    Returns:
+        dict: window_ms, background_ms and the number of loaded modules.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", _DRIVER], cwd=REPO_ROOT,
+        check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = [measure_once() for _ in range(args.runs)]
+    for key in ("window_ms", "background_ms"):
+        values = [result[key] for result in results if key in result]
+        if values:
+            print(f"{key:>14}: median {statistics.median(values):8.1f}  "
+                  f"min {min(values):8.1f}  max {max(values):8.1f}")
+    print(f"{'modules':>14}: {results[-1].get('modules')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Memory benchmark for planned versus streaming organize runs.
+
+Each measurement runs in a fresh child process so that peak RSS is not
+inherited from earlier runs. Usage, from the repository root:
+
+    python -m benchmarks.bench_streaming_memory --counts 10000 50000 100000
+"""
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+
+
+def _create_files(folder_path, count):
+    """
+    Creates empty files with a mix of extensions.
+
+    Args:
+        folder_path (str): Folder to fill.
+        count (int): Number of files to create.
+
+    Returns:
+        None
+    """
+    extensions = [".pdf", ".jpg", ".mp4", ".zip", ".txt", ".bin"]
+    os.makedirs(folder_path, exist_ok=True)
+    for i in range(count):
+        open(os.path.join(folder_path, f"file{i}{extensions[i % len(extensions)]}"), "w").close()
+
+
+def _measure(mode, folder_path):
+    """
+    Organizes a folder in this process and reports its memory use.
+
+    Undo recording is disabled here so the measurement covers the
+    scan -> classify -> move pipeline itself.
+
+    Args:
+        mode (str): "planned" or "streaming".
+        folder_path (str): Folder to organize.
+
+    Returns:
+        dict: Peak traced Python allocations and peak RSS, in KiB.
+    """
+    # Keep per-file log lines out of the measurement and the working directory
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()])
+    from move_executor import MoveExecutor
+    from move_plan import MovePlan
+    from organize_files import iter_moves_by_type
+
+    tracemalloc.start()
+    executor = MoveExecutor()
+    moves = iter_moves_by_type(folder_path)
+    if mode == "streaming":
+        executor.execute_stream(moves)
+    else:
+        executor.execute(MovePlan(folder_path, list(moves)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "moved": executor.moved,
+        "peak_traced_kib": peak // 1024,
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "FOLDER"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_measure(*args.child)))
+        return
+
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    print(f"{'files':>10} {'mode':>10} {'peak traced KiB':>16} {'max RSS KiB':>12}")
+    for count in args.counts:
+        for mode in ("planned", "streaming"):
+            work_dir = tempfile.mkdtemp(prefix="filezen-bench-", dir=base)
+            try:
+                _create_files(work_dir, count)
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_streaming_memory",
+                     "--child", mode, work_dir],
+                    check=True, capture_output=True, text=True).stdout
+                result = json.loads(output)
+                print(f"{count:>10} {mode:>10} {result['peak_traced_kib']:>16} "
+                      f"{result['max_rss_kib']:>12}")
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
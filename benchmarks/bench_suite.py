@@ -0,0 +1,186 @@
+"""
+Throughput and memory benchmark suite for the sorting engines.
+
+Generates a reproducible synthetic tree (see synthetic_tree.py) on tmpfs for
+every size, then times organize_files, sort_by_year_and_month and the undo
+of an organize run. Each measurement runs in a fresh child process with its
+own undo journal, so peak RSS is per case. Results are compared with a
+stored baseline and regressions are flagged. Usage, from the repository root:
+
+    python -m benchmarks.bench_suite --counts 10000 100000 1000000
+    python -m benchmarks.bench_suite --counts 10000 --save-baseline
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+import subprocess
+
+from benchmarks.synthetic_tree import MTIME_DISTRIBUTIONS, generate_tree, parse_mix
+
+CASES = ("organize_files", "sort_by_year_and_month", "undo")
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Relative throughput drop or peak RSS growth reported as a regression
+DEFAULT_TOLERANCE = 0.15
+
+
+def _measure(case, folder_path, workers, recursive):
+    """
+    Runs one case in this process and reports its cost.
+
+    Args:
+        case (str): One of CASES. "undo" reverts the latest organize_files run.
+        folder_path (str): Folder to sort.
+        workers (int): Concurrent moves or restored folders.
+        recursive (bool): Sort every subfolder too.
+
+    Returns:
+        dict: Files handled, seconds, files per second and peak RSS in KiB.
+    """
+    # Keep per-file log lines out of the measurement and the working directory
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()])
+    from organize_files import organize_files
+    from sort_by_date import sort_by_year_and_month
+    from undo_manager import UndoManager
+
+    started = time.perf_counter()
+    if case == "undo":
+        files = UndoManager().undo("organize_files", workers=workers).restored
+    elif case == "organize_files":
+        files = organize_files(folder_path, workers=workers, recursive=recursive).moved
+    else:
+        files = sort_by_year_and_month(folder_path, workers=workers, recursive=recursive).moved
+    elapsed = time.perf_counter() - started
+
+    return {
+        "files": files,
+        "seconds": round(elapsed, 3),
+        "files_per_sec": round(files / elapsed) if elapsed > 0 else 0,
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def _run_child(case, folder_path, journal_path, args):
+    """
+    Measures a case in a fresh interpreter.
+
+    Returns:
+        dict: The result of _measure() in the child.
+    """
+    env = dict(os.environ, FILEZEN_UNDO_JOURNAL=journal_path)
+    command = [sys.executable, "-m", "benchmarks.bench_suite", "--child", case, folder_path,
+               "--workers", str(args.workers)]
+    if args.depth:
+        command.append("--recursive")
+    output = subprocess.run(command, check=True, capture_output=True, text=True,
+                            env=env).stdout
+    return json.loads(output)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Finds the results that are worse than the baseline.
+
+    Args:
+        results (dict): Key -> result of _measure().
+        baseline (dict): Key -> stored result.
+        tolerance (float): Allowed relative change, such as 0.15.
+
+    Returns:
+        dict: Key -> list of regression descriptions, for regressed keys only.
+    """
+    regressions = {}
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        found = []
+        if result["files_per_sec"] < base["files_per_sec"] * (1 - tolerance):
+            found.append(f"throughput {result['files_per_sec']} < {base['files_per_sec']}")
+        if result["max_rss_kib"] > base["max_rss_kib"] * (1 + tolerance):
+            found.append(f"peak RSS {result['max_rss_kib']} > {base['max_rss_kib']} KiB")
+        if found:
+            regressions[key] = found
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--depth", type=int, default=0, help="Subfolder levels of the tree.")
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--mix", type=parse_mix, help="Extension weights, e.g. .jpg=5,.pdf=2")
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--distribution", choices=MTIME_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--recursive", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child", nargs=2, metavar=("CASE", "FOLDER"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_measure(*args.child, args.workers, args.recursive)))
+        return 0
+
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    if base is None:
+        print("warning: no tmpfs at /dev/shm, measuring on the temporary folder's disk",
+              file=sys.stderr)
+
+    results = {}
+    print(f"{'case':>24} {'files':>9} {'seconds':>9} {'files/sec':>11} {'max RSS KiB':>12}")
+    for count in args.counts:
+        for case in args.cases:
+            work_dir = tempfile.mkdtemp(prefix="filezen-bench-", dir=base)
+            try:
+                folder_path = os.path.join(work_dir, "tree")
+                journal_path = os.path.join(work_dir, "undo_journal.sqlite3")
+                generate_tree(folder_path, count, args.mix, args.years, args.distribution,
+                              args.depth, args.fanout, args.seed)
+                if case == "undo":
+                    # The run to revert is prepared in its own process, untimed
+                    _run_child("organize_files", folder_path, journal_path, args)
+                result = _run_child(case, folder_path, journal_path, args)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+            key = f"{case}/{count}/depth{args.depth}/workers{args.workers}"
+            results[key] = result
+            print(f"{case:>24} {count:>9} {result['seconds']:>9.2f} "
+                  f"{result['files_per_sec']:>11} {result['max_rss_kib']:>12}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for key, found in sorted(regressions.items()):
+        print(f"REGRESSION {key}: {'; '.join(found)}")
+    if not baseline:
+        print("No baseline stored yet; run with --save-baseline to create one.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
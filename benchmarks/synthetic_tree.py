@@ -0,0 +1,128 @@
+"""
+Reproducible synthetic directory trees for the benchmarks.
+
+The same arguments and seed always produce the same names, folders and
+modification times, so runs on different commits sort identical input.
+Usage, from the repository root:
+
+    python -m benchmarks.synthetic_tree /dev/shm/tree --count 100000 --depth 2
+"""
+import os
+import time
+import random
+import argparse
+
+# Extension -> relative weight; roughly the mix of a downloads folder,
+# including files no category matches
+DEFAULT_MIX = {
+    ".pdf": 12, ".docx": 6, ".txt": 10, ".xlsx": 4,
+    ".jpg": 25, ".png": 10, ".gif": 2,
+    ".mp4": 6, ".mkv": 2,
+    ".zip": 6, ".rar": 2,
+    ".bin": 5, ".log": 5, "": 5,
+}
+
+# Modification time distributions: "uniform" spreads files evenly over the
+# span, "recent" makes newer files exponentially more common
+MTIME_DISTRIBUTIONS = ("uniform", "recent")
+
+
+def parse_mix(text):
+    """
+    Parses an extension mix given as ".jpg=5,.pdf=2".
+
+    Args:
+        text (str): Comma-separated extension=weight pairs.
+
+    Raises:
+        ValueError: If a pair is malformed or a weight is not positive.
+
+    Returns:
+        dict: Extension -> weight.
+    """
+    mix = {}
+    for pair in text.split(","):
+        extension, _, weight = pair.strip().partition("=")
+        if not weight or float(weight) <= 0:
+            raise ValueError(f"Invalid extension weight: {pair}")
+        mix[extension] = float(weight)
+    return mix
+
+
+def generate_tree(root, count, mix=None, years=5, distribution="uniform", depth=0,
+                  fanout=4, seed=42, now=None):
+    """
+    Fills a folder with empty files.
+
+    Files are spread evenly over every folder of a tree with the given depth
+    and fanout; depth 0 puts every file directly in root.
+
+    Args:
+        root (str): Folder to fill, created if missing.
+        count (int): Number of files.
+        mix (dict, optional): Extension -> weight. Defaults to DEFAULT_MIX.
+        years (float): Span of modification times, ending at now.
+        distribution (str): One of MTIME_DISTRIBUTIONS.
+        depth (int): Levels of subfolders below root.
+        fanout (int): Subfolders per folder.
+        seed (int): Seed of the generator.
+        now (float, optional): End of the mtime span. Defaults to the start
+            of the current day, so one day's runs get equal trees.
+
+    Raises:
+        ValueError: If distribution is unknown.
+
+    Returns:
+        list: Every folder of the tree, root first.
+    """
+    if distribution not in MTIME_DISTRIBUTIONS:
+        raise ValueError(f"Unknown mtime distribution: {distribution}")
+    mix = mix or DEFAULT_MIX
+    if now is None:
+        now = time.time() // 86400 * 86400
+    span = years * 365 * 86400
+    rng = random.Random(seed)
+
+    folders = [root]
+    level = [root]
+    for d in range(depth):
+        level = [os.path.join(parent, f"dir{d}_{i}") for parent in level for i in range(fanout)]
+        folders.extend(level)
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+
+    extensions = list(mix)
+    weights = [mix[extension] for extension in extensions]
+    chosen = rng.choices(extensions, weights, k=count)
+    for i, extension in enumerate(chosen):
+        if distribution == "uniform":
+            age = rng.random() * span
+        else:
+            age = min(rng.expovariate(5 / span), span)
+        mtime = now - age
+        path = os.path.join(folders[i % len(folders)], f"file{i:07d}{extension}")
+        with open(path, "wb"):
+            pass
+        os.utime(path, (mtime, mtime))
+    return folders
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--mix", type=parse_mix, help="Extension weights, e.g. .jpg=5,.pdf=2")
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--distribution", choices=MTIME_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--depth", type=int, default=0)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    folders = generate_tree(args.root, args.count, args.mix, args.years, args.distribution,
+                            args.depth, args.fanout, args.seed)
+    print(f"Created {args.count} files in {len(folders)} folders under {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+class CategoryIndex:
+    """
+    Precompiled suffix index mapping file extensions to categories.
+
+    The index is built once from a category -> extensions mapping and then
+    answers each lookup with one hash probe per candidate suffix, instead of
+    testing every extension of every category.
+    """
+
+    def __init__(self, extensions, default="Others"):
+        """
+        Compiles the extension mapping into a suffix lookup table.
+
+        Args:
+            extensions (dict): Dictionary mapping categories to file extensions.
+                Multi-part suffixes such as ".tar.gz" are supported.
+            default (str): Category returned when no suffix matches.
+        """
+        self.default = default
+        self._suffixes = {}  # Lowercase suffix (with leading dot) -> category
+        self._max_parts = 1  # Most dots found in a single suffix
+
+        for category, exts in extensions.items():
+            for ext in exts:
+                suffix = ext.lower()
+                if not suffix.startswith("."):
+                    suffix = "." + suffix
+                # Keep the first category, as the old linear scan did
+                self._suffixes.setdefault(suffix, category)
+                self._max_parts = max(self._max_parts, suffix.count("."))
+
+    def __len__(self):
+        return len(self._suffixes)
+
+    def categories(self):
+        """
+        Returns:
+            set: Every category the index can produce, including the default.
+        """
+        return set(self._suffixes.values()) | {self.default}
+
+    def lookup(self, file_name):
+        """
+        Determines the category of a file name, ignoring case.
+
+        The longest matching suffix wins, so "backup.tar.gz" resolves through
+        ".tar.gz" before ".gz".
+
+        Args:
+            file_name (str): Name of the file.
+
+        Returns:
+            str: Category name for the file.
+        """
+        # Collect dot positions from the right, at most one per suffix part
+        positions = []
+        end = len(file_name)
+        for _ in range(self._max_parts):
+            end = file_name.rfind(".", 0, end)
+            if end < 0:
+                break
+            positions.append(end)
+
+        for position in reversed(positions):
+            category = self._suffixes.get(file_name[position:].lower())
+            if category is not None:
+                return category
+        return self.default
+
+    def lookup_entry(self, entry):
+        """
+        Determines the category of a scanned file, by its name only.
+
+        Args:
+            entry (os.DirEntry): Entry of the file.
+
+        Returns:
+            str: Category name for the file.
+        """
+        return self.lookup(entry.name)
@@ -0,0 +1,376 @@
+"""
+Headless command-line interface for FileZen.
+
+Runs the sorting engines directly, without creating a Tk window, so it can
+be used on servers without a display:
+
+    python -m filezen --strategy type ~/Downloads ~/Desktop
+
+Only the standard library is imported at startup. The engines are imported
+when a command actually needs them, and tkinter and PIL are never imported.
+"""
+import sys
+import logging
+import argparse
+
+# Strategy flag -> undo journal sort type
+SORT_TYPES = {
+    "type": "organize_files",
+    "date": "sort_by_year_and_month",
+}
+
+
+def build_parser():
+    """
+    Builds the argument parser of the command-line interface.
+
+    Returns:
+        ArgumentParser: The configured parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="filezen",
+        description="Sort the files of one or more folders by type or by date.")
+    parser.add_argument(
+        "folders", nargs="*", metavar="FOLDER",
+        help="Folders to sort, processed one after another.")
+    parser.add_argument(
+        "-s", "--strategy", choices=sorted(SORT_TYPES), default="type",
+        help="Sort into category folders (type) or year/month folders (date).")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="Number of concurrent moves per folder (default: 1).")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Number of folders sorted at the same time in separate processes, "
+             "largest folders first (default: 1).")
+    parser.add_argument(
+        "--streaming", action="store_true",
+        help="Move while scanning instead of planning first; bounded memory.")
+    parser.add_argument(
+        "-r", "--recursive", action="store_true",
+        help="Also sort every subfolder.")
+    parser.add_argument(
+        "--flatten", action="store_true",
+        help="With --recursive, gather files from all levels into the top folder.")
+    parser.add_argument(
+        "-n", "--dry-run", action="store_true",
+        help="Print the planned moves without touching any file.")
+    parser.add_argument(
+        "--dedup", choices=["move", "link"],
+        help="With --strategy type, move duplicate files into a Duplicates "
+             "folder or replace them with hard links.")
+    parser.add_argument(
+        "--sniff", action="store_true",
+        help="With --strategy type, classify files with unknown or missing "
+             "extensions by their content.")
+    parser.add_argument(
+        "--rules", metavar="PATH",
+        help="With --strategy type, classify files with the rules of a JSON "
+             "rules file instead of the built-in extension list.")
+    parser.add_argument(
+        "--date-source", choices=["mtime", "media"], default="mtime",
+        help="With --strategy date, date photos and videos by their EXIF or "
+             "container capture date instead of the modification time.")
+    parser.add_argument(
+        "--index", action="store_true",
+        help="With --strategy date, keep a metadata index between runs so "
+             "unchanged folders are not read again.")
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Keep running and organize files as they arrive (Linux inotify).")
+    parser.add_argument(
+        "--checkpoint", action="store_true",
+        help="Store the move plan so an interrupted run can be resumed.")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continue the most recent interrupted run of the chosen strategy.")
+    parser.add_argument(
+        "--undo", action="store_true",
+        help="Revert the most recent run of the chosen strategy.")
+    parser.add_argument(
+        "-v", "--verbose", action="store_true",
+        help="Log every move to stderr instead of warnings only.")
+    parser.add_argument(
+        "--log-summary", action="store_true",
+        help="Log one line per source and destination folder instead of one "
+             "per file.")
+    parser.add_argument(
+        "--report", metavar="PATH",
+        help="Append a JSON report with per-phase timings of every run to PATH "
+             "(also enabled by the FILEZEN_REPORT environment variable).")
+    parser.add_argument(
+        "--profile", metavar="PATH",
+        help="Write cProfile statistics of the latest run to PATH "
+             "(also enabled by the FILEZEN_PROFILE environment variable).")
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point of the command-line interface.
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults
+            to sys.argv[1:].
+
+    Returns:
+        int: Process exit code, 0 on success and 1 if any folder failed.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Configured before the engines are imported, so their own file-based
+    # logging setup does not take effect on the command line
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.report or args.profile:
+        import instrumentation
+        instrumentation.configure(args.report, args.profile)
+
+    # Logging calls only enqueue; a writer thread formats and writes in batches
+    from log_pipeline import async_logging
+    with async_logging(summary=args.log_summary):
+        return _dispatch(parser, args)
+
+
+def _dispatch(parser, args):
+    """
+    Runs the command selected by the parsed arguments.
+
+    Args:
+        parser (ArgumentParser): Parser, for reporting invalid combinations.
+        args (Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: Process exit code, 0 on success and 1 if any folder failed.
+    """
+    if args.undo:
+        from undo_manager import UndoManager
+        report = UndoManager().undo(SORT_TYPES[args.strategy], workers=max(args.workers, 1))
+        print(report.summary())
+        return 1 if report.failures else 0
+
+    if args.resume:
+        from resume import resume_sort
+        executor = resume_sort(SORT_TYPES[args.strategy], workers=args.workers)
+        if executor is None:
+            print("Nothing to resume")
+            return 0
+        print(executor.summary())
+        return 1 if executor.errors else 0
+
+    if not args.folders:
+        parser.error("at least one FOLDER is required")
+    if args.flatten and not args.recursive:
+        parser.error("--flatten requires --recursive")
+    if args.checkpoint and args.streaming:
+        parser.error("--checkpoint cannot be combined with --streaming")
+    if args.dedup and (args.streaming or args.strategy != "type"):
+        parser.error("--dedup requires --strategy type without --streaming")
+    if args.sniff and args.strategy != "type":
+        parser.error("--sniff requires --strategy type")
+    if args.rules:
+        if args.strategy != "type":
+            parser.error("--rules requires --strategy type")
+        from rule_engine import load_rules
+        try:
+            args.rules = load_rules(args.rules)
+        except (OSError, ValueError) as e:
+            parser.error(f"--rules: {e}")
+    elif args.strategy == "type":
+        from organize_files import default_category_index
+        try:
+            args.rules = default_category_index()
+        except ValueError as e:
+            parser.error(str(e))
+    if args.date_source != "mtime" and args.strategy != "date":
+        parser.error("--date-source requires --strategy date")
+    if args.index and args.strategy != "date":
+        parser.error("--index requires --strategy date")
+    if args.watch:
+        if len(args.folders) != 1 or args.dry_run or args.recursive:
+            parser.error("--watch takes exactly one FOLDER and no --dry-run or --recursive")
+        return _watch(args.folders[0], args)
+    if args.jobs > 1 and not args.dry_run:
+        if args.checkpoint or args.index:
+            parser.error("--jobs cannot be combined with --checkpoint or --index")
+        return _batch(args)
+
+    if args.dry_run:
+        journal = None
+    elif args.strategy == "type":
+        from organize_files import undo_manager as journal
+    else:
+        from sort_by_date import undo_manager as journal
+    before = journal.latest_run(SORT_TYPES[args.strategy]) if journal else 0
+
+    exit_code = 0
+    try:
+        for folder in args.folders:
+            try:
+                if args.dry_run:
+                    for move in _plan(folder, args):
+                        print(f"{move.source} -> {move.destination}")
+                    continue
+                executor = _run(folder, args)
+                print(f"{folder}: {executor.summary()}")
+                if executor.errors:
+                    exit_code = 1
+            except Exception as e:
+                # One bad folder must not stop the rest of the batch
+                print(f"{folder}: error: {e}", file=sys.stderr)
+                exit_code = 1
+    finally:
+        # One undo reverts the whole invocation, as with --jobs
+        if journal is not None:
+            journal.join_runs(SORT_TYPES[args.strategy], before)
+    return exit_code
+
+
+def _watch(folder, args):
+    """
+    Organizes a folder as files arrive until SIGINT or SIGTERM.
+
+    Args:
+        folder (str): Folder to watch.
+        args (Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: Process exit code, 0 on a clean stop and 1 on failure.
+    """
+    import signal
+    import threading
+    from watcher import watch
+
+    # Stop between batches instead of interrupting a move
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    try:
+        executor = watch(folder, args.strategy, stop, workers=args.workers,
+                         category_index=args.rules)
+    except OSError as e:
+        print(f"{folder}: error: {e}", file=sys.stderr)
+        return 1
+    print(f"{folder}: {executor.summary()}")
+    return 0
+
+
+def _batch(args):
+    """
+    Sorts every folder on a process pool, see batch.sort_batch().
+
+    Args:
+        args (Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: Process exit code, 0 on success and 1 if any folder or file failed.
+    """
+    from batch import sort_batch
+    options = dict(workers=args.workers, streaming=args.streaming,
+                   recursive=args.recursive, flatten=args.flatten)
+    if args.strategy == "type":
+        options.update(dedup=args.dedup, sniff=args.sniff)
+    else:
+        options.update(date_source=args.date_source)
+    report = sort_batch(args.folders, args.strategy, processes=args.jobs,
+                        category_index=args.rules, **options)
+
+    exit_code = 0
+    for result in report.results:
+        if result.error is not None:
+            print(f"{result.folder_path}: error: {result.error}", file=sys.stderr)
+            exit_code = 1
+        else:
+            print(f"{result.folder_path}: moved {result.moved} files, "
+                  f"{len(result.errors)} failed")
+            if result.errors:
+                exit_code = 1
+    print(report.summary())
+    return exit_code
+
+
+def _plan(folder, args):
+    """
+    Lazily computes the moves of a folder for a dry run.
+
+    Args:
+        folder (str): Folder to plan.
+        args (Namespace): Parsed command-line arguments.
+
+    Returns:
+        generator: PlannedMove entries.
+    """
+    if args.strategy == "type":
+        from organize_files import iter_moves_by_type
+        sniffer = _sniffer(args)
+        type_moves = iter_moves_by_type(folder, args.rules, recursive=args.recursive,
+                                        flatten=args.flatten, sniffer=sniffer)
+
+        def planned_by_type():
+            try:
+                yield from type_moves
+            finally:
+                if sniffer is not None:
+                    sniffer.close()
+
+        return planned_by_type()
+    from sort_by_date import iter_moves_by_year_and_month, year_month_index
+    from media_dates import MediaDateReader
+    index = year_month_index(date_source=args.date_source) if args.index else None
+    date_reader = MediaDateReader() if args.date_source == "media" else None
+    moves = iter_moves_by_year_and_month(folder, recursive=args.recursive,
+                                         flatten=args.flatten, index=index,
+                                         date_reader=date_reader)
+
+    def planned():
+        try:
+            yield from moves
+        finally:
+            if index is not None:
+                index.close()
+            if date_reader is not None:
+                date_reader.close()
+
+    return planned()
+
+
+def _run(folder, args):
+    """
+    Sorts one folder with the chosen strategy.
+
+    Args:
+        folder (str): Folder to sort.
+        args (Namespace): Parsed command-line arguments.
+
+    Returns:
+        MoveExecutor: The finished run.
+    """
+    options = dict(workers=args.workers, streaming=args.streaming,
+                   recursive=args.recursive, flatten=args.flatten,
+                   checkpoint=args.checkpoint)
+    if args.strategy == "type":
+        from organize_files import organize_files
+        sniffer = _sniffer(args)
+        try:
+            return organize_files(folder, args.rules, dedup=args.dedup, sniffer=sniffer,
+                                  **options)
+        finally:
+            if sniffer is not None:
+                sniffer.close()
+    from sort_by_date import sort_by_year_and_month
+    return sort_by_year_and_month(folder, index=args.index,
+                                  date_source=args.date_source, **options)
+
+
+def _sniffer(args):
+    """
+    Returns:
+        ContentSniffer: Content classifier if --sniff was given, else None.
+    """
+    if not args.sniff:
+        return None
+    from content_sniffer import ContentSniffer
+    return ContentSniffer()
@@ -0,0 +1,364 @@
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from undo_manager import STATE_DIR
+
+# Bytes read from the start of a file; every signature below fits in it
+SNIFF_SIZE = 4096
+
+# Files sniffed per batch submitted to the thread pool
+SNIFF_BATCH_SIZE = 256
+
+# Most results kept in the in-memory (device, inode, mtime) cache
+CACHE_SIZE = 100_000
+
+# Results kept between runs, next to the undo journal
+DEFAULT_CACHE_PATH = os.environ.get(
+    "FILEZEN_SNIFF_CACHE", os.path.join(STATE_DIR, "sniff_cache.sqlite3"))
+
+# Most files remembered in the cache file; the oldest results are dropped
+PERSISTENT_CACHE_SIZE = 1_000_000
+
+# Magic numbers per category. Each signature is a tuple of conditions that
+# must all hold: (offset, bytes) matches at that offset, (None, bytes)
+# anywhere in the header. Signatures with more conditions are tried first.
+SIGNATURES = {
+    "Documents": [
+        ((0, b"%PDF-"),),
+        ((0, b"{\\rtf"),),
+        ((0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"),),  # OLE2: .doc, .xls
+        ((0, b"PK\x03\x04"), (None, b"word/")),  # Office Open XML
+        ((0, b"PK\x03\x04"), (None, b"xl/")),
+        ((0, b"PK\x03\x04"), (None, b"ppt/")),
+        ((0, b"PK\x03\x04"), (30, b"mimetypeapplication/vnd.oasis.opendocument")),
+    ],
+    "Images": [
+        ((0, b"\xff\xd8\xff"),),
+        ((0, b"\x89PNG\r\n\x1a\n"),),
+        ((0, b"GIF87a"),),
+        ((0, b"GIF89a"),),
+        ((0, b"BM"), (6, b"\x00\x00\x00\x00")),
+        ((0, b"II*\x00"),),
+        ((0, b"MM\x00*"),),
+        ((0, b"RIFF"), (8, b"WEBP")),
+        ((4, b"ftyp"), (8, b"heic")),
+        ((4, b"ftyp"), (8, b"heix")),
+        ((4, b"ftyp"), (8, b"avif")),
+        ((4, b"ftyp"), (8, b"mif1")),
+    ],
+    "Videos": [
+        ((4, b"ftyp"),),  # MP4, MOV, 3GP
+        ((0, b"\x1a\x45\xdf\xa3"),),  # Matroska, WebM
+        ((0, b"RIFF"), (8, b"AVI ")),
+        ((0, b"FLV\x01"),),
+        ((0, b"\x00\x00\x01\xba"),),  # MPEG program stream
+        ((0, b"\x30\x26\xb2\x75\x8e\x66\xcf\x11"),),  # ASF, WMV
+    ],
+    "Archives": [
+        ((0, b"PK\x03\x04"),),
+        ((0, b"PK\x05\x06"),),
+        ((0, b"Rar!\x1a\x07"),),
+        ((0, b"7z\xbc\xaf\x27\x1c"),),
+        ((0, b"\x1f\x8b"),),  # gzip
+        ((0, b"BZh"),),
+        ((0, b"\xfd7zXZ\x00"),),
+        ((0, b"\x28\xb5\x2f\xfd"),),  # zstd
+        ((257, b"ustar"),),  # tar
+    ],
+}
+
+
+class SignatureTable:
+    """
+    Magic-number table compiled for lookup by hash probes.
+
+    Signatures are grouped by the offset and length of their first condition,
+    so matching a header costs one dictionary probe per distinct
+    (offset, length) pair instead of one comparison per signature.
+    """
+
+    def __init__(self, signatures=None):
+        """
+        Compiles a signature table.
+
+        Args:
+            signatures (dict, optional): Category -> list of condition tuples,
+                as in SIGNATURES. Defaults to SIGNATURES.
+        """
+        groups = {}  # (offset, length) -> first bytes -> [(rest, category)]
+        for category, entries in (signatures or SIGNATURES).items():
+            for conditions in entries:
+                (offset, magic), rest = conditions[0], conditions[1:]
+                groups.setdefault((offset, len(magic)), {}).setdefault(
+                    magic, []).append((rest, category))
+
+        for probes in groups.values():
+            for candidates in probes.values():
+                # Most specific first, so a HEIC image is not taken for a video
+                candidates.sort(key=lambda candidate: -len(candidate[0]))
+        self._groups = sorted(groups.items())
+        # Results cached on disk are only reused by an identical table
+        self.fingerprint = hashlib.blake2b(
+            repr(self._groups).encode(), digest_size=8).hexdigest()
+
+    def categories(self):
+        """
+        Returns:
+            set: Every category a signature can produce.
+        """
+        return {category for _, probes in self._groups
+                for candidates in probes.values() for _, category in candidates}
+
+    def match(self, header):
+        """
+        Determines the category of a file header.
+
+        Args:
+            header (bytes): First bytes of a file.
+
+        Returns:
+            str: The category, or None if no signature matches.
+        """
+        best, best_conditions = None, -1
+        for (offset, length), probes in self._groups:
+            candidates = probes.get(header[offset:offset + length])
+            if not candidates:
+                continue
+            for rest, category in candidates:
+                if len(rest) > best_conditions and _holds(header, rest):
+                    best, best_conditions = category, len(rest)
+                    break
+        return best
+
+
+class ContentSniffer:
+    """
+    Classifies files by their content, for files whose extension says nothing.
+
+    Each file costs a single pread of at most SNIFF_SIZE bytes, and reads run
+    on a thread pool. Results are cached by (device, inode, size, mtime) in
+    memory and in a SQLite file, so a file seen again, in this run or a
+    later one, is never reread until it changes.
+    """
+
+    def __init__(self, table=None, workers=8, cache_path=None):
+        """
+        Initializes a sniffer. The cache file is opened on first use.
+
+        Args:
+            table (SignatureTable, optional): Compiled signatures. Defaults to
+                one built from SIGNATURES.
+            workers (int): Number of headers read at the same time.
+            cache_path (str, optional): Path of the cache database. Defaults
+                to DEFAULT_CACHE_PATH; an empty string keeps results in
+                memory only.
+        """
+        self.table = table or SignatureTable()
+        self.workers = max(1, int(workers or 1))
+        self.cache_path = DEFAULT_CACHE_PATH if cache_path is None else cache_path
+        self.reads = 0  # Headers actually read from disk
+        self._cache = OrderedDict()
+        self._pending = []  # Results read from disk, not yet in the cache file
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def sniff(self, path, stat=None):
+        """
+        Classifies one file by its header.
+
+        Args:
+            path (str): Path of the file.
+            stat (os.stat_result, optional): Metadata of the file, if known.
+
+        Returns:
+            str: The category, or None if the content is not recognized or
+                the file cannot be read.
+        """
+        try:
+            if stat is None:
+                stat = os.stat(path)
+            key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            with self._lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    return self._cache[key]
+                row = self._stored(key)
+                if row is not None:
+                    self._remember(key, row[0])
+                    return row[0]
+
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                header = os.pread(fd, SNIFF_SIZE, 0)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logging.error(f"Cannot read file {path}: {e}")
+            return None
+
+        category = self.table.match(header)
+        with self._lock:
+            self.reads += 1
+            self._remember(key, category)
+            self._pending.append((*key, self.table.fingerprint, category))
+            flush = len(self._pending) >= SNIFF_BATCH_SIZE
+        if flush:
+            self.flush()
+        return category
+
+    def flush(self):
+        """
+        Saves the results read since the last flush to the cache file.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            conn = self._connect() if pending else None
+            if conn is None:
+                return
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO headers "
+                    "(device, inode, size, mtime, tables, category) VALUES (?, ?, ?, ?, ?, ?)",
+                    pending)
+                conn.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"Cannot save content sniffing results: {e}")
+
+    def close(self):
+        """
+        Saves pending results, trims and closes the cache file.
+
+        Returns:
+            None
+        """
+        self.flush()
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                # Replaced rows get a new rowid, so the lowest are the oldest
+                self._conn.execute(
+                    "DELETE FROM headers WHERE rowid <= "
+                    "(SELECT MAX(rowid) FROM headers) - ?", (PERSISTENT_CACHE_SIZE,))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"Cannot trim content sniffing cache: {e}")
+            self._conn.close()
+            self._conn = None
+
+    def sniff_entries(self, entries):
+        """
+        Classifies scanned file entries on the thread pool, in batches.
+
+        Args:
+            entries (iterable): os.DirEntry objects of regular files.
+
+        Yields:
+            tuple: (entry, category or None), in the order of the entries.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            batch = []
+            for entry in entries:
+                batch.append(entry)
+                if len(batch) >= SNIFF_BATCH_SIZE:
+                    yield from zip(batch, pool.map(self._sniff_entry, batch))
+                    batch = []
+            if batch:
+                yield from zip(batch, pool.map(self._sniff_entry, batch))
+        self.flush()
+
+    def _remember(self, key, category):
+        """
+        Adds a result to the in-memory cache. The caller holds the lock.
+
+        Returns:
+            None
+        """
+        self._cache[key] = category
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _stored(self, key):
+        """
+        Looks a file up in the cache file. The caller holds the lock.
+
+        Returns:
+            tuple: (category,) if the file is cached unchanged, else None.
+        """
+        conn = self._connect()
+        if conn is None:
+            return None
+        device, inode, size, mtime = key
+        try:
+            return conn.execute(
+                "SELECT category FROM headers WHERE device = ? AND inode = ? "
+                "AND size = ? AND mtime = ? AND tables = ?",
+                (device, inode, size, mtime, self.table.fingerprint)).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"Cannot read content sniffing cache: {e}")
+            return None
+
+    def _connect(self):
+        """
+        Opens the cache file on first use and creates its table. The caller
+        holds the lock.
+
+        Returns:
+            sqlite3.Connection: The connection, or None if results are kept
+                in memory only, or the file cannot be opened.
+        """
+        if self._conn is None and self.cache_path:
+            try:
+                directory = os.path.dirname(self.cache_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # Headers are sniffed from pool threads; batch workers in
+                # other processes may be writing the same file
+                self._conn = sqlite3.connect(
+                    self.cache_path, timeout=30, check_same_thread=False)
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS headers (
+                        device INTEGER NOT NULL,
+                        inode INTEGER NOT NULL,
+                        size INTEGER NOT NULL,
+                        mtime INTEGER NOT NULL,
+                        tables TEXT NOT NULL,
+                        category TEXT,
+                        PRIMARY KEY (device, inode)
+                    )
+                    """)
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Content sniffing results are not cached between runs: {e}")
+                self._conn = None
+                self.cache_path = ""
+        return self._conn
+
+    def _sniff_entry(self, entry):
+        try:
+            stat = entry.stat()
+        except OSError as e:
+            logging.error(f"Cannot read file {entry.path}: {e}")
+            return None
+        return self.sniff(entry.path, stat)
+
+
+def _holds(header, conditions):
+    """
+    Returns:
+        bool: True if every (offset, bytes) condition holds for the header.
+    """
+    for offset, magic in conditions:
+        if offset is None:
+            if magic not in header:
+                return False
+        elif header[offset:offset + len(magic)] != magic:
+            return False
+    return True
@@ -0,0 +1,135 @@
+import os
+import time
+import bisect
+import datetime
+
+# Years covered by the precomputed month table; other dates take the slow path
+FIRST_YEAR = 1970
+LAST_YEAR = 2100
+
+
+class MonthBuckets:
+    """
+    Maps timestamps to local year/month folder names in bulk.
+
+    The local start of every month between FIRST_YEAR and LAST_YEAR is
+    computed once, together with its folder name ("2025/03-March"). A
+    timestamp is then bucketed by one bisect over those integer boundaries,
+    instead of building a datetime and formatting it for every file. The
+    names are identical to datetime.fromtimestamp(t).strftime('%m-%B') under
+    the same time zone and locale.
+    """
+
+    def __init__(self, first_year=FIRST_YEAR, last_year=LAST_YEAR):
+        """
+        Initializes the table. It is built on first use, so the current time
+        zone and locale at that moment apply.
+
+        Args:
+            first_year (int): First year with precomputed boundaries.
+            last_year (int): Last year with precomputed boundaries.
+        """
+        self.first_year = first_year
+        self.last_year = last_year
+        self._starts = None  # Local start of each month, as POSIX seconds
+        self._folders = None  # Relative folder of each month
+        self._end = None  # Start of the month after the table
+
+    def folders(self, timestamps):
+        """
+        Buckets many timestamps in one pass.
+
+        Args:
+            timestamps (iterable): POSIX timestamps, such as st_mtime values.
+
+        Returns:
+            list: Relative year/month folder of each timestamp, in order;
+                None for timestamps that are not valid local dates.
+        """
+        if self._starts is None:
+            self._build()
+        starts, folders = self._starts, self._folders
+        first, end = starts[0], self._end
+        find = bisect.bisect_right
+
+        result = []
+        for timestamp in timestamps:
+            if first <= timestamp < end:
+                result.append(folders[find(starts, timestamp) - 1])
+            else:
+                result.append(_folder_of(timestamp))
+        return result
+
+    def folder(self, timestamp):
+        """
+        Buckets a single timestamp.
+
+        Args:
+            timestamp (float): POSIX timestamp.
+
+        Returns:
+            str: Relative year/month folder, such as "2025/03-March", or None.
+        """
+        return self.folders((timestamp,))[0]
+
+    def _build(self):
+        """
+        Computes the month boundaries and the memoized folder names.
+
+        Returns:
+            None
+        """
+        names = [datetime.date(2000, month, 1).strftime('%m-%B') for month in range(1, 13)]
+        starts, folders = [], []
+        for year in range(self.first_year, self.last_year + 1):
+            for month in range(1, 13):
+                starts.append(_month_start(year, month))
+                folders.append(os.path.join(str(year), names[month - 1]))
+        self._end = _month_start(self.last_year + 1, 1)
+        self._starts, self._folders = starts, folders
+
+
+# Shared table of the sorters, built on first use
+MONTH_BUCKETS = MonthBuckets()
+
+
+def _month_start(year, month):
+    """
+    Finds the first second that falls in a month in local time.
+
+    Args:
+        year (int): Year.
+        month (int): Month, 1 to 12.
+
+    Returns:
+        int: POSIX timestamp of the local start of the month.
+    """
+    target = (year, month)
+    start = int(time.mktime((year, month, 1, 0, 0, 0, 0, 0, -1)))
+    if time.localtime(start)[:2] == target and time.localtime(start - 1)[:2] != target:
+        return start
+
+    # Local midnight does not exist on this date (a DST jump), search nearby
+    low, high = start - 2 * 86400, start + 2 * 86400
+    while low < high:
+        middle = (low + high) // 2
+        if time.localtime(middle)[:2] >= target:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def _folder_of(timestamp):
+    """
+    Formats the folder of a timestamp outside the precomputed table.
+
+    Returns:
+        str: Relative year/month folder, or None if the timestamp cannot be
+            represented as a local date.
+    """
+    try:
+        date = datetime.datetime.fromtimestamp(timestamp)
+    except (OverflowError, ValueError, OSError):
+        return None
+    return os.path.join(str(date.year), date.strftime('%m-%B'))
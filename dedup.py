@@ -0,0 +1,223 @@
+import os
+import hashlib
+import logging
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from move_plan import MovePlan, PlannedMove
+from log_pipeline import log_file
+
+# Folder receiving duplicates, next to the category folders
+DUPLICATES_FOLDER = "Duplicates"
+
+# Bytes read from the start of each candidate for the partial hash
+PARTIAL_HASH_SIZE = 64 * 1024
+
+# Read size for full hashes; files are never loaded into memory whole
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Below this many files to hash, a process pool costs more than it saves
+POOL_THRESHOLD = 64
+
+
+def find_duplicates(paths, workers=None):
+    """
+    Groups files with identical content.
+
+    Files are compared in three rounds, and each round only looks at files
+    that still have a potential twin: equal size (one stat per file), equal
+    hash of the first PARTIAL_HASH_SIZE bytes, and finally equal hash of the
+    whole file. Most files differ in size or in their first block, so they
+    are never read in full. Hashing runs on a process pool.
+
+    Args:
+        paths (iterable): Paths of the files to compare.
+        workers (int, optional): Number of hashing processes. Defaults to
+            the number of CPUs; 1 hashes in the calling process.
+
+    Returns:
+        list: Groups of two or more identical files, each a sorted list of
+            paths. Empty and unreadable files are never reported.
+    """
+    by_size = defaultdict(list)
+    for path in paths:
+        try:
+            size = os.stat(path).st_size
+        except OSError as e:
+            logging.error(f"Cannot read file {path}: {e}")
+            continue
+        if size:
+            by_size[size].append(path)
+
+    candidates = {size: group for size, group in by_size.items() if len(group) > 1}
+    if not candidates:
+        return []
+    small = {path for size, group in candidates.items()
+             if size <= PARTIAL_HASH_SIZE for path in group}
+
+    with _HashPool(workers) as pool:
+        groups = _split_by_hash(list(candidates.values()), _partial_hash, pool)
+        # Files no larger than the partial block were already hashed in full
+        complete = [group for group in groups if group[0] in small]
+        remaining = [group for group in groups if group[0] not in small]
+        complete.extend(_split_by_hash(remaining, _full_hash, pool))
+
+    duplicates = sorted(sorted(group) for group in complete)
+    logging.info(f"Found {sum(len(g) - 1 for g in duplicates)} duplicates "
+                 f"in {len(duplicates)} groups")
+    return duplicates
+
+
+def route_duplicates(plan, workers=None):
+    """
+    Redirects the moves of duplicate files into the Duplicates folder.
+
+    The first path of every group (in sorted order) keeps its planned move;
+    the others are moved into a Duplicates folder beside the category
+    folders instead. These are ordinary moves, so undo restores them.
+
+    Args:
+        plan (MovePlan): Type moves computed for a folder.
+        workers (int, optional): Number of hashing processes.
+
+    Returns:
+        MovePlan: A new plan with the same sources.
+    """
+    duplicates = set()
+    for group in find_duplicates([move.source for move in plan], workers):
+        duplicates.update(group[1:])
+
+    moves = []
+    for move in plan:
+        if move.source in duplicates:
+            target_root = os.path.dirname(os.path.dirname(move.destination))
+            destination = os.path.join(target_root, DUPLICATES_FOLDER,
+                                       os.path.basename(move.source))
+            move = PlannedMove(move.source, destination, move.strategy)
+        moves.append(move)
+    return MovePlan(plan.folder_path, moves)
+
+
+def link_duplicates(plan, workers=None, undo_manager=None, sort_type=None):
+    """
+    Replaces every duplicate with a hard link to the first file of its group,
+    so identical files share their disk space. The plan is left unchanged and
+    every path is still sorted. Each link is recorded for undo, which moves
+    it back like any file and then turns it into a separate copy again.
+
+    Args:
+        plan (MovePlan): Moves computed for a folder, not yet applied.
+        workers (int, optional): Number of hashing processes.
+        undo_manager (UndoManager, optional): Journal receiving the links.
+        sort_type (str, optional): Sorting type the links belong to.
+
+    Returns:
+        int: Number of files replaced by a link.
+    """
+    linked = 0
+    for group in find_duplicates([move.source for move in plan], workers):
+        original = group[0]
+        for duplicate in group[1:]:
+            temporary = duplicate + ".filezen-link"
+            try:
+                os.link(original, temporary)
+                # Atomic swap, the duplicate path is never missing
+                os.replace(temporary, duplicate)
+            except OSError as e:
+                logging.error(f"Cannot link {duplicate} to {original}: {e}")
+                if os.path.lexists(temporary):
+                    os.remove(temporary)
+                continue
+            linked += 1
+            log_file("Linked", duplicate, original)
+            if undo_manager is not None and sort_type:
+                undo_manager.record_link(sort_type, duplicate)
+    if undo_manager is not None:
+        undo_manager.flush()
+    return linked
+
+
+def _split_by_hash(groups, hash_func, pool):
+    """
+    Splits groups of candidate files by a content hash.
+
+    Args:
+        groups (list): Lists of paths that are still potential duplicates.
+        hash_func (function): Picklable function returning a digest or None.
+        pool (_HashPool): Pool computing the hashes.
+
+    Returns:
+        list: The resulting groups that still hold two or more files.
+    """
+    paths = [path for group in groups for path in group]
+    digests = dict(zip(paths, pool.map(hash_func, paths)))
+
+    result = []
+    for group in groups:
+        by_digest = defaultdict(list)
+        for path in group:
+            if digests[path] is not None:
+                by_digest[digests[path]].append(path)
+        result.extend(g for g in by_digest.values() if len(g) > 1)
+    return result
+
+
+def _partial_hash(path):
+    """
+    Returns:
+        bytes: Digest of the first PARTIAL_HASH_SIZE bytes, or None if the
+            file cannot be read.
+    """
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(PARTIAL_HASH_SIZE)).digest()
+    except OSError as e:
+        logging.error(f"Cannot read file {path}: {e}")
+        return None
+
+
+def _full_hash(path):
+    """
+    Returns:
+        bytes: Digest of the whole file read in HASH_CHUNK_SIZE chunks into
+            a reused buffer, or None if the file cannot be read.
+    """
+    digest = hashlib.blake2b()
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    try:
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+    except OSError as e:
+        logging.error(f"Cannot read file {path}: {e}")
+        return None
+    return digest.digest()
+
+
+class _HashPool:
+    """
+    Maps hash functions over paths on a process pool that is started on
+    first real use, and not at all for small inputs.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def map(self, func, paths):
+        if self.workers == 1 or len(paths) < POOL_THRESHOLD:
+            return list(map(func, paths))
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        chunksize = max(1, len(paths) // (self.workers * 4))
+        return list(self._pool.map(func, paths, chunksize=chunksize))
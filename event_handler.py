@@ -44,6 +44,9 @@ def update_texts(canvas, elements, translations, current_language):
         if 'undo_button' in elements:
             elements['undo_button'].config(
                 text=translations.get(lang, {}).get("undo", "Undo"))
+        if 'cancel_button' in elements:
+            elements['cancel_button'].config(
+                text=translations.get(lang, {}).get("cancel", "Stop"))
 
         logging.info(f"GUI texts successfully updated for language: {lang}")
 
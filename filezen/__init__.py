@@ -0,0 +1,3 @@
+"""
+Package entry point for ``python -m filezen``, the headless command line.
+"""
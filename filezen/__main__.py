@@ -0,0 +1,12 @@
+import os
+import sys
+
+# The engines are top-level modules next to this package; make them
+# importable when FileZen is started from another directory
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from cli import main
+
+sys.exit(main())
@@ -17,13 +17,33 @@ def create_canvas(app, background_photo=None):
     canvas = tk.Canvas(app, width=740, height=600)
     canvas.pack(fill="both", expand=True)
     if background_photo:
-        try:
-            canvas.create_image(0, 0, image=background_photo, anchor="nw")
-        except Exception as e:
-            logging.error(f"Error adding background image: {e}")
+        set_canvas_background(canvas, background_photo)
     return canvas
 
 
+def set_canvas_background(canvas, background_photo):
+    """
+    Places a background image behind everything already drawn on the canvas.
+
+    Used both at creation time and when the background finishes loading
+    after the window is shown.
+
+    Args:
+        canvas (Canvas): The canvas to decorate.
+        background_photo (PhotoImage): The background image.
+
+    Returns:
+        None
+    """
+    try:
+        image_id = canvas.create_image(0, 0, image=background_photo, anchor="nw")
+        canvas.tag_lower(image_id)
+        # Tk does not keep a reference, so the image would be garbage collected
+        canvas.background_photo = background_photo
+    except Exception as e:
+        logging.error(f"Error adding background image: {e}")
+
+
 def add_progress_bar(app, canvas, progress_var):
     """
     Adds a progress bar to the canvas for indicating task progression.
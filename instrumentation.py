@@ -0,0 +1,333 @@
+import os
+import json
+import time
+import inspect
+import cProfile
+import logging
+import functools
+import threading
+from contextvars import ContextVar
+from contextlib import contextmanager, nullcontext
+
+# Setting these variables switches instrumentation on without code changes:
+# a JSON report is appended per run, and the last run is profiled
+REPORT_ENV = "FILEZEN_REPORT"
+PROFILE_ENV = "FILEZEN_PROFILE"
+
+# Latency buckets are powers of two in microseconds, up to about 70 minutes
+HISTOGRAM_BUCKETS = 32
+
+_NULL_PHASE = nullcontext()
+
+_config = {
+    "report_path": os.environ.get(REPORT_ENV) or None,
+    "profile_path": os.environ.get(PROFILE_ENV) or None,
+}
+# Run being instrumented in the current context. Each thread starts with
+# its own context, so a watcher and a GUI run never share a report; pool
+# threads of a run get their timers from the calling thread (see timed()).
+_active = ContextVar("filezen_instruments", default=None)
+
+
+class PhaseStats:
+    """
+    Counter and latency histogram of one phase of a run.
+
+    A sample is one timed call. Phases timed per batch, such as directory
+    listing, record one sample per batch and count every item in it.
+    """
+
+    def __init__(self):
+        self.samples = 0
+        self.items = 0
+        self.seconds = 0.0
+        self.max = 0.0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, seconds, items=1):
+        """
+        Records one timed sample.
+
+        Args:
+            seconds (float): Duration of the sample.
+            items (int): Items handled by the sample.
+
+        Returns:
+            None
+        """
+        self.samples += 1
+        self.items += items
+        self.seconds += seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = min(int(seconds * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)
+        self.histogram[bucket] += 1
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: JSON-ready statistics. The histogram maps the upper bound
+                of each non-empty bucket, in microseconds, to its samples.
+        """
+        return {
+            "samples": self.samples,
+            "items": self.items,
+            "seconds": round(self.seconds, 6),
+            "max_seconds": round(self.max, 6),
+            "histogram_us": {str(1 << bucket): count
+                             for bucket, count in enumerate(self.histogram) if count},
+        }
+
+
+class Instruments:
+    """
+    Per-phase counters and latency histograms of one engine run.
+
+    Phases are recorded from any thread. The names used by the engines are
+    "list" (directory reads), "stat", "classify", "mkdir", "move" and
+    "restore" (undo).
+    """
+
+    def __init__(self, run, **details):
+        """
+        Initializes empty statistics.
+
+        Args:
+            run (str): Name of the run, such as "organize_files".
+            **details: Extra fields for the report, such as the folder.
+        """
+        self.run = run
+        self.details = details
+        self.phases = {}
+        self.totals = {}
+        self.started = time.time()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds, items=1):
+        """
+        Records one timed sample of a phase.
+
+        Args:
+            phase (str): Phase name.
+            seconds (float): Duration of the sample.
+            items (int): Items handled by the sample.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            stats = self.phases.get(phase)
+            if stats is None:
+                stats = self.phases[phase] = PhaseStats()
+            stats.add(seconds, items)
+
+    @contextmanager
+    def phase(self, phase, items=1):
+        """
+        Times the enclosed block as one sample of a phase.
+
+        Args:
+            phase (str): Phase name.
+            items (int): Items handled by the block.
+
+        Yields:
+            None
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started, items)
+
+    def report(self):
+        """
+        Returns:
+            dict: JSON-ready run report.
+        """
+        with self._lock:
+            phases = {name: stats.to_dict() for name, stats in sorted(self.phases.items())}
+        return {"run": self.run, **self.details, "started": self.started,
+                "elapsed_seconds": round(self.elapsed, 6), "phases": phases,
+                "totals": dict(self.totals)}
+
+
+def configure(report_path=None, profile_path=None):
+    """
+    Switches instrumentation on or off for the following runs.
+
+    Args:
+        report_path (str, optional): File receiving one JSON report per run,
+            one per line. None disables the reports.
+        profile_path (str, optional): File receiving the cProfile statistics
+            of the latest run, for pstats. None disables profiling.
+
+    Returns:
+        None
+    """
+    _config["report_path"] = report_path
+    _config["profile_path"] = profile_path
+
+
+def settings():
+    """
+    Returns:
+        dict: The current "report_path" and "profile_path", either may be None.
+    """
+    return dict(_config)
+
+
+@contextmanager
+def instrumented_run(run, **details):
+    """
+    Instruments one engine run when a report or profile is configured.
+
+    Nested runs, such as a sort started inside a batch, are recorded in the
+    outer run. Runs on other threads are recorded separately. cProfile only
+    sees the calling thread; moves on the executor pool show up in the
+    "move" phase instead.
+
+    Args:
+        run (str): Name of the run, such as "organize_files".
+        **details: Extra JSON fields for the report, such as the folder.
+
+    Yields:
+        Instruments: The statistics of the run, or None when switched off.
+    """
+    report_path, profile_path = _config["report_path"], _config["profile_path"]
+    outer = _active.get()
+    if outer is not None or not (report_path or profile_path):
+        yield outer
+        return
+
+    instruments = Instruments(run, **details)
+    token = _active.set(instruments)
+    profiler = cProfile.Profile() if profile_path else None
+    started = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield instruments
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        instruments.elapsed = time.perf_counter() - started
+        _active.reset(token)
+        try:
+            if profiler is not None:
+                profiler.dump_stats(profile_path)
+            if report_path:
+                with open(report_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(instruments.report()) + "\n")
+        except OSError as e:
+            logging.error(f"Cannot write run report: {e}")
+
+
+def instrumented(run, totals=None, **details):
+    """
+    Decorates an engine entry point so each call is an instrumented_run().
+
+    Args:
+        run (str): Name of the run, such as "organize_files".
+        totals (function, optional): Called with the return value; returns
+            the totals to add to the report, as for note().
+        **details: Report field -> name of the argument that gives its
+            value, such as folder="folder_path".
+
+    Returns:
+        function: The decorator.
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not (_config["report_path"] or _config["profile_path"]):
+                return func(*args, **kwargs)
+            arguments = signature.bind(*args, **kwargs).arguments
+            with instrumented_run(run, **{field: arguments.get(name)
+                                          for field, name in details.items()}):
+                result = func(*args, **kwargs)
+                if totals is not None:
+                    note(**totals(result))
+            return result
+
+        return wrapper
+    return decorate
+
+
+def phase(name, items=1):
+    """
+    Times the enclosed block as one sample of a phase of the current run.
+
+    Args:
+        name (str): Phase name.
+        items (int): Items handled by the block.
+
+    Returns:
+        context manager: A shared no-op context when no run is instrumented.
+    """
+    instruments = _active.get()
+    if instruments is None:
+        return _NULL_PHASE
+    return instruments.phase(name, items)
+
+
+def add(name, seconds, items=1):
+    """
+    Records an already measured sample of a phase of the current run.
+
+    Args:
+        name (str): Phase name.
+        seconds (float): Duration of the sample.
+        items (int): Items handled by the sample.
+
+    Returns:
+        None
+    """
+    instruments = _active.get()
+    if instruments is not None:
+        instruments.add(name, seconds, items)
+
+
+def timed(name, func):
+    """
+    Wraps a function so each call is a sample of a phase of the current run.
+
+    Meant for cheap per-file calls in planning loops: when no run is
+    instrumented the function is returned unchanged, so the loop pays nothing.
+    The wrapper records into the run of the calling context, so it may be
+    handed to pool threads.
+
+    Args:
+        name (str): Phase name.
+        func (function): Function to time.
+
+    Returns:
+        function: func itself, or a timing wrapper.
+    """
+    instruments = _active.get()
+    if instruments is None:
+        return func
+    perf_counter = time.perf_counter
+
+    def wrapper(*args):
+        started = perf_counter()
+        try:
+            return func(*args)
+        finally:
+            instruments.add(name, perf_counter() - started)
+
+    return wrapper
+
+
+def note(**totals):
+    """
+    Adds totals, such as the moved file count, to the report of the current run.
+
+    Returns:
+        None
+    """
+    instruments = _active.get()
+    if instruments is not None:
+        instruments.totals.update(totals)
@@ -0,0 +1,229 @@
+import os
+import queue
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, MemoryHandler
+
+# Records buffered per log handler before they are written in one go
+LOG_BATCH_SIZE = 512
+
+# Seconds the writer thread waits for more records before writing a partial batch
+FLUSH_SECONDS = 0.5
+
+# Logger of the per-file lines (moves, restores, file dates). Summary mode
+# silences it and logs one aggregate line per pair of folders instead.
+FILE_LOG = logging.getLogger("filezen.files")
+
+_listener = None
+_handlers = None  # Root handlers replaced by the queue, restored on stop
+_summary = None
+
+
+class DirectorySummary:
+    """
+    Per-folder aggregate of per-file events, for summary-only logging.
+
+    Counting an event is a dictionary update under a lock, so the sorting
+    threads pay neither formatting nor I/O for it.
+    """
+
+    def __init__(self):
+        self._counts = {}  # (action, source folder, destination folder) -> files
+        self._lock = threading.Lock()
+
+    def add(self, action, source, destination):
+        """
+        Counts one per-file event.
+
+        Args:
+            action (str): What happened to the file, such as "Moved".
+            source (str): Path the file came from.
+            destination (str): Path the file went to.
+
+        Returns:
+            None
+        """
+        key = (action, os.path.dirname(source), os.path.dirname(destination))
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def flush(self, logger):
+        """
+        Logs one line per pair of folders and starts counting afresh.
+
+        Args:
+            logger (Logger): Logger receiving the aggregate lines.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        for (action, source, destination), files in sorted(counts.items()):
+            logger.info("%s %d files from %s to %s", action, files, source, destination)
+
+
+def start_async_logging(summary=False, batch_size=LOG_BATCH_SIZE):
+    """
+    Moves the handlers of the root logger behind a queue.
+
+    Logging calls then only enqueue their record; a single writer thread
+    formats the records and writes them in batches of batch_size, writing
+    at once for errors and whenever the queue goes idle. The pipeline is
+    stopped at interpreter exit, so no record is lost.
+
+    Args:
+        summary (bool): Replace per-file lines with one line per source and
+            destination folder, logged by flush_summary().
+        batch_size (int): Records buffered per handler before a write.
+
+    Returns:
+        None
+    """
+    global _listener, _handlers, _summary
+    if _listener is not None:
+        return
+
+    root = logging.getLogger()
+    _handlers = root.handlers[:]
+    buffered = []
+    for handler in _handlers:
+        batch = MemoryHandler(batch_size, flushLevel=logging.ERROR, target=handler)
+        batch.setLevel(handler.level)
+        buffered.append(batch)
+        root.removeHandler(handler)
+
+    records = queue.SimpleQueue()
+    root.addHandler(_DeferredQueueHandler(records))
+    _listener = _BatchingListener(records, *buffered, respect_handler_level=True)
+    _listener.start()
+
+    if summary:
+        start_summary()
+    atexit.register(stop_async_logging)
+
+
+def stop_async_logging():
+    """
+    Writes every queued record and puts the original handlers back.
+
+    Returns:
+        None
+    """
+    global _listener, _handlers, _summary
+    if _listener is None:
+        return
+    flush_summary()
+    _listener.stop()
+    for batch in _listener.handlers:
+        batch.flush()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, _DeferredQueueHandler):
+            root.removeHandler(handler)
+    for handler in _handlers:
+        root.addHandler(handler)
+    FILE_LOG.setLevel(logging.NOTSET)
+    _listener, _handlers, _summary = None, None, None
+
+
+@contextmanager
+def async_logging(summary=False):
+    """
+    Runs a block with the asynchronous pipeline, as start/stop_async_logging.
+
+    Args:
+        summary (bool): Summary-only logging, see start_async_logging().
+
+    Yields:
+        None
+    """
+    start_async_logging(summary)
+    try:
+        yield
+    finally:
+        stop_async_logging()
+
+
+def start_summary():
+    """
+    Switches to summary-only logging without the asynchronous pipeline, as
+    in the worker processes of a batch.
+
+    Returns:
+        None
+    """
+    global _summary
+    _summary = DirectorySummary()
+    FILE_LOG.setLevel(logging.WARNING)
+
+
+def summary_enabled():
+    """
+    Returns:
+        bool: Whether per-file events are counted instead of logged.
+    """
+    return _summary is not None
+
+
+def log_file(action, source, destination):
+    """
+    Logs a per-file event, or counts it in summary mode.
+
+    Args:
+        action (str): What happened to the file, such as "Moved".
+        source (str): Path the file came from.
+        destination (str): Path the file went to.
+
+    Returns:
+        None
+    """
+    summary = _summary
+    if summary is not None:
+        summary.add(action, source, destination)
+    elif FILE_LOG.isEnabledFor(logging.INFO):
+        FILE_LOG.info("%s %s to %s", action, os.path.basename(source), destination)
+
+
+def flush_summary():
+    """
+    Logs the per-folder aggregates counted so far in summary mode.
+
+    Returns:
+        None
+    """
+    summary = _summary
+    if summary is not None:
+        summary.flush(logging.getLogger())
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves message formatting to the writer thread.
+
+    The stock QueueHandler merges the arguments into the message before
+    enqueueing; this one only does so for records carrying an exception,
+    whose traceback cannot outlive the calling frame.
+    """
+
+    def prepare(self, record):
+        if record.exc_info:
+            return super().prepare(record)
+        return record
+
+
+class _BatchingListener(QueueListener):
+    """
+    Queue listener that writes buffered records whenever the queue is idle.
+    """
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, timeout=FLUSH_SECONDS)
+            except queue.Empty:
+                for batch in self.handlers:
+                    batch.flush()
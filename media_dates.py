@@ -0,0 +1,313 @@
+import os
+import struct
+import logging
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+# Files whose capture date is read from EXIF: JPEG and TIFF-based raw formats
+EXIF_EXTENSIONS = frozenset({
+    ".jpg", ".jpeg", ".tif", ".tiff", ".dng", ".nef", ".cr2", ".arw"})
+
+# Files whose creation date is read from the ISO base media (QuickTime) header
+CONTAINER_EXTENSIONS = frozenset({".mp4", ".mov", ".m4v", ".3gp"})
+
+# Files dated per batch submitted to the process pool
+MEDIA_BATCH_SIZE = 1024
+
+# Below this many files in a batch, a process pool costs more than it saves
+POOL_THRESHOLD = 64
+
+# JPEG segments scanned before giving up on finding EXIF data
+MAX_JPEG_SEGMENTS = 32
+
+# Top-level boxes scanned before giving up on finding the movie header
+MAX_CONTAINER_BOXES = 64
+
+# Seconds between the QuickTime epoch (1904-01-01) and the Unix epoch
+_QUICKTIME_EPOCH_OFFSET = 2082844800
+
+# EXIF tags: Exif sub-IFD pointer, DateTimeOriginal, DateTimeDigitized, DateTime
+_EXIF_IFD_POINTER = 0x8769
+_DATE_TIME_ORIGINAL = 0x9003
+_DATE_TIME_DIGITIZED = 0x9004
+_DATE_TIME = 0x0132
+
+
+def is_media_file(file_name):
+    """
+    Tells whether a file may carry a capture date in its metadata.
+
+    Args:
+        file_name (str): File name.
+
+    Returns:
+        bool: True for formats media_timestamp() can read.
+    """
+    extension = os.path.splitext(file_name)[1].lower()
+    return extension in EXIF_EXTENSIONS or extension in CONTAINER_EXTENSIONS
+
+
+def media_timestamp(path):
+    """
+    Reads the capture date of a photo or video from its metadata.
+
+    Only header bytes are read with pread, never pixel or sample data: the
+    JPEG segment list up to the EXIF block, a few TIFF directory entries, or
+    the box headers of a video up to its movie header.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        float: POSIX timestamp of the capture, or None if the file has no
+            usable date (the caller then falls back to st_mtime).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError as e:
+        logging.error(f"Cannot read file {path}: {e}")
+        return None
+    try:
+        if extension in CONTAINER_EXTENSIONS:
+            return _container_timestamp(fd)
+        if extension in (".jpg", ".jpeg"):
+            return _jpeg_timestamp(fd)
+        if extension in EXIF_EXTENSIONS:
+            return _tiff_timestamp(fd, 0)
+        return None
+    except (OSError, struct.error, ValueError) as e:
+        logging.warning(f"Unreadable metadata in {path}: {e}")
+        return None
+    finally:
+        os.close(fd)
+
+
+class MediaDateReader:
+    """
+    Reads capture dates of many files on a process pool.
+
+    The pool is started on first real use and reused for every batch of a
+    run, so recursive sorts do not pay its start-up cost per folder.
+    """
+
+    def __init__(self, workers=None):
+        """
+        Initializes a reader.
+
+        Args:
+            workers (int, optional): Number of processes. Defaults to the
+                number of CPUs; 1 reads in the calling process.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def timestamps(self, paths):
+        """
+        Reads the capture dates of several files.
+
+        Args:
+            paths (list): Paths of media files.
+
+        Returns:
+            list: media_timestamp() result for each path, in order.
+        """
+        if self.workers == 1 or len(paths) < POOL_THRESHOLD:
+            return [media_timestamp(path) for path in paths]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        chunksize = max(1, len(paths) // (self.workers * 4))
+        return list(self._pool.map(media_timestamp, paths, chunksize=chunksize))
+
+    def with_dates(self, entries):
+        """
+        Pairs scanned file entries with their capture date, in batches.
+
+        Args:
+            entries (iterable): os.DirEntry objects of regular files.
+
+        Yields:
+            tuple: (entry, timestamp or None), in the order of the entries.
+        """
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= MEDIA_BATCH_SIZE:
+                yield from self._dated(batch)
+                batch = []
+        if batch:
+            yield from self._dated(batch)
+
+    def close(self):
+        """
+        Stops the process pool.
+
+        Returns:
+            None
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _dated(self, batch):
+        media = [entry.path for entry in batch if is_media_file(entry.name)]
+        dates = dict(zip(media, self.timestamps(media)))
+        for entry in batch:
+            yield entry, dates.get(entry.path)
+
+
+def _read(fd, offset, size):
+    """
+    Reads exactly size bytes at offset.
+
+    Raises:
+        ValueError: If the file ends first.
+    """
+    data = os.pread(fd, size, offset)
+    if len(data) != size:
+        raise ValueError("truncated header")
+    return data
+
+
+def _jpeg_timestamp(fd):
+    """
+    Finds the EXIF block among the first segments of a JPEG file.
+
+    Returns:
+        float: Capture timestamp, or None.
+    """
+    if _read(fd, 0, 2) != b"\xff\xd8":
+        return None
+    offset = 2
+    for _ in range(MAX_JPEG_SEGMENTS):
+        marker, length = struct.unpack(">HH", _read(fd, offset, 4))
+        if marker in (0xFFDA, 0xFFD9) or marker >> 8 != 0xFF:
+            return None  # Image data starts, no EXIF before it
+        if marker == 0xFFE1 and _read(fd, offset + 4, 6) == b"Exif\x00\x00":
+            return _tiff_timestamp(fd, offset + 10)
+        offset += 2 + length
+    return None
+
+
+def _tiff_timestamp(fd, base):
+    """
+    Reads the capture date from a TIFF structure starting at base.
+
+    Returns:
+        float: Capture timestamp, or None.
+    """
+    order = _read(fd, base, 2)
+    if order == b"II":
+        endian = "<"
+    elif order == b"MM":
+        endian = ">"
+    else:
+        return None
+    magic, ifd0 = struct.unpack(endian + "HI", _read(fd, base + 2, 6))
+    if magic != 42:
+        return None
+
+    tags = _ifd_tags(fd, base, ifd0, endian)
+    if _EXIF_IFD_POINTER in tags:
+        exif_offset = struct.unpack(endian + "I", tags[_EXIF_IFD_POINTER][2])[0]
+        exif_tags = _ifd_tags(fd, base, exif_offset, endian)
+        for tag in (_DATE_TIME_ORIGINAL, _DATE_TIME_DIGITIZED):
+            timestamp = _exif_date(fd, base, exif_tags.get(tag), endian)
+            if timestamp is not None:
+                return timestamp
+    return _exif_date(fd, base, tags.get(_DATE_TIME), endian)
+
+
+def _ifd_tags(fd, base, offset, endian):
+    """
+    Reads the entries of one TIFF image file directory.
+
+    Returns:
+        dict: Tag -> (type, count, raw 4-byte value or offset).
+    """
+    count = struct.unpack(endian + "H", _read(fd, base + offset, 2))[0]
+    data = _read(fd, base + offset + 2, count * 12)
+    tags = {}
+    for i in range(count):
+        tag, kind, items = struct.unpack_from(endian + "HHI", data, i * 12)
+        tags[tag] = (kind, items, data[i * 12 + 8:i * 12 + 12])
+    return tags
+
+
+def _exif_date(fd, base, entry, endian):
+    """
+    Parses an EXIF "YYYY:MM:DD HH:MM:SS" date entry as local time.
+
+    Returns:
+        float: Timestamp, or None if the entry is missing or blank.
+    """
+    if entry is None:
+        return None
+    kind, items, value = entry
+    if kind != 2 or items < 19:  # ASCII, 19 characters and a terminator
+        return None
+    offset = struct.unpack(endian + "I", value)[0]
+    text = _read(fd, base + offset, 19).decode("ascii", "replace")
+    try:
+        return datetime.datetime.strptime(text, "%Y:%m:%d %H:%M:%S").timestamp()
+    except ValueError:
+        return None  # Cameras write "0000:00:00 00:00:00" when unset
+
+
+def _container_timestamp(fd):
+    """
+    Reads the creation time from the movie header (moov/mvhd) of an MP4 or
+    QuickTime file, stepping over the media data box without reading it.
+
+    Returns:
+        float: Creation timestamp, or None.
+    """
+    moov = _find_box(fd, 0, None, b"moov")
+    if moov is None:
+        return None
+    start, end = moov
+    mvhd = _find_box(fd, start, end, b"mvhd")
+    if mvhd is None:
+        return None
+    version = _read(fd, mvhd[0], 1)[0]
+    if version == 1:
+        created = struct.unpack(">Q", _read(fd, mvhd[0] + 4, 8))[0]
+    else:
+        created = struct.unpack(">I", _read(fd, mvhd[0] + 4, 4))[0]
+    if created == 0:
+        return None  # Not set by the recorder
+    return float(created - _QUICKTIME_EPOCH_OFFSET)
+
+
+def _find_box(fd, offset, end, box_type):
+    """
+    Scans sibling boxes for one of a type.
+
+    Returns:
+        tuple: (payload start, box end) of the box, or None.
+    """
+    for _ in range(MAX_CONTAINER_BOXES):
+        if end is not None and offset + 8 > end:
+            return None
+        header = os.pread(fd, 16, offset)
+        if len(header) < 8:
+            return None
+        size, kind = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:  # 64-bit size follows the type
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:  # Box extends to the end of the file
+            size = os.fstat(fd).st_size - offset
+        if size < header_size:
+            return None
+        if kind == box_type:
+            return offset + header_size, offset + size
+        offset += size
+    return None
@@ -0,0 +1,268 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import namedtuple
+from undo_manager import STATE_DIR
+
+# Index shared by every run of the application, next to the undo journal
+DEFAULT_INDEX_PATH = os.environ.get(
+    "FILEZEN_METADATA_INDEX", os.path.join(STATE_DIR, "metadata_index.sqlite3"))
+
+# A directory modified this recently may still change within the same
+# timestamp tick, so its listing is not trusted on the next run
+RACY_SECONDS = 2
+
+# Indexed file: full path, name, size, mtime in seconds, inode and the
+# category (such as a year/month folder) decided for it
+FileRecord = namedtuple(
+    "FileRecord", ["path", "name", "size", "mtime", "inode", "category"])
+
+
+class MetadataIndex:
+    """
+    On-disk cache of directory listings and file metadata between runs.
+
+    A directory whose modification time is unchanged since it was indexed has
+    had no entries added, removed or renamed, so its files and subfolders are
+    served from the index without reading the directory or stating a file.
+    In a changed directory every file is stated, and only files whose size,
+    mtime or inode differ from the index are classified again.
+
+    Like every directory-mtime cache, this cannot see a file rewritten in
+    place in an unchanged directory; it keeps its indexed metadata until
+    something is added to or removed from the directory.
+    """
+
+    def __init__(self, namespace, classify, index_path=None):
+        """
+        Initializes an index. The database is opened on first use.
+
+        Args:
+            namespace (str): Name of the strategy the categories belong to,
+                such as "year_month". Each namespace is indexed separately.
+            classify (function): Called as classify(path, stat_result) for
+                new or changed files; returns the category to store.
+            index_path (str, optional): Path of the index database. Defaults
+                to DEFAULT_INDEX_PATH.
+        """
+        self.namespace = namespace
+        self.classify = classify
+        self.index_path = index_path or DEFAULT_INDEX_PATH
+        self.hits = 0  # Directories served from the index
+        self.misses = 0  # Directories read from disk
+        self._conn = None
+        self._lock = threading.Lock()
+        self._scanned = {}  # Directory -> mtime it had when scanned this run
+
+    def scan(self, directory):
+        """
+        Lists a directory, from the index when it is unchanged.
+
+        Has the same result shape as tree_walker._scan_directory, so it can be
+        passed to walk_tree as its scan function. Safe to call from several
+        threads.
+
+        Args:
+            directory (str): Directory to list.
+
+        Returns:
+            tuple: (directory, files, subdirs, entry count, seconds spent),
+                where files is a list of FileRecord and subdirs a list of
+                (name, path).
+        """
+        started = time.perf_counter()
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError as e:
+            logging.error(f"Cannot scan folder {directory}: {e}")
+            return directory, [], [], 0, time.perf_counter() - started
+
+        with self._lock:
+            self._scanned[directory] = mtime
+            row = self._connect().execute(
+                "SELECT mtime, subdirs FROM dirs WHERE namespace = ? AND path = ?",
+                (self.namespace, os.path.abspath(directory))).fetchone()
+            known = self._known_files(directory)
+
+            if row is not None and row[0] == mtime:
+                self.hits += 1
+                files = [FileRecord(os.path.join(directory, name), name, *values)
+                         for name, values in known.items()]
+                subdirs = [(name, os.path.join(directory, name))
+                           for name in row[1].split("\0") if name]
+                return (directory, files, subdirs, len(files) + len(subdirs),
+                        time.perf_counter() - started)
+            self.misses += 1
+
+        files, subdirs, entries = self._read(directory, known)
+        self._store(directory, mtime, files, subdirs)
+        return directory, files, subdirs, entries, time.perf_counter() - started
+
+    def commit(self):
+        """
+        Brings the directories scanned during this run up to date, after the
+        run moved files out of them, and saves the index.
+
+        Only directories whose mtime changed since they were scanned are read
+        again; after a sort they usually hold little more than the new
+        folders, so this is cheap.
+
+        Returns:
+            None
+        """
+        scanned, self._scanned = self._scanned, {}
+        for directory, mtime in scanned.items():
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                current = None
+            if current == mtime:
+                continue
+            with self._lock:
+                known = self._known_files(directory)
+            if current is None:
+                self._store(directory, None, [], [])
+                continue
+            files, subdirs, _ = self._read(directory, known)
+            self._store(directory, current, files, subdirs)
+
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+        logging.info(f"Metadata index: {self.hits} folders reused, "
+                     f"{self.misses} folders read")
+
+    def close(self):
+        """
+        Saves and closes the index.
+
+        Returns:
+            None
+        """
+        self.commit()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _known_files(self, directory):
+        """
+        Returns:
+            dict: Indexed files of a directory, name -> (size, mtime, inode,
+                category). The caller holds the lock.
+        """
+        rows = self._connect().execute(
+            "SELECT name, size, mtime, inode, category FROM files "
+            "WHERE namespace = ? AND directory = ?",
+            (self.namespace, os.path.abspath(directory)))
+        return {name: values for name, *values in rows}
+
+    def _read(self, directory, known):
+        """
+        Reads a directory, classifying only files that are new or changed.
+
+        Args:
+            directory (str): Directory to read.
+            known (dict): Indexed files of the directory, name ->
+                (size, mtime, inode, category).
+
+        Returns:
+            tuple: (list of FileRecord, list of (name, path), entry count).
+        """
+        files, subdirs, entries = [], [], 0
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    entries += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append((entry.name, entry.path))
+                            continue
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                        metadata = (stat.st_size, stat.st_mtime, stat.st_ino)
+                        previous = known.get(entry.name)
+                        if previous is not None and tuple(previous[:3]) == metadata:
+                            category = previous[3]
+                        else:
+                            category = self.classify(entry.path, stat)
+                        files.append(FileRecord(entry.path, entry.name, *metadata, category))
+                    except (OSError, ValueError) as e:
+                        logging.error(f"Cannot read entry {entry.path}: {e}")
+        except OSError as e:
+            logging.error(f"Cannot scan folder {directory}: {e}")
+        return files, subdirs, entries
+
+    def _store(self, directory, mtime, files, subdirs):
+        """
+        Replaces the indexed state of a directory.
+
+        Args:
+            directory (str): Directory that was read.
+            mtime (int): Its mtime in nanoseconds when read, or None if it no
+                longer exists.
+            files (list): FileRecord entries of the directory.
+            subdirs (list): (name, path) of its subdirectories.
+
+        Returns:
+            None
+        """
+        directory = os.path.abspath(directory)
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM files WHERE namespace = ? AND directory = ?",
+                         (self.namespace, directory))
+            if mtime is None:
+                conn.execute("DELETE FROM dirs WHERE namespace = ? AND path = ?",
+                             (self.namespace, directory))
+                return
+            if time.time_ns() - mtime < RACY_SECONDS * 1_000_000_000:
+                mtime = -1  # Never matches, the directory is read next time
+            conn.execute(
+                "INSERT OR REPLACE INTO dirs (namespace, path, mtime, subdirs) "
+                "VALUES (?, ?, ?, ?)",
+                (self.namespace, directory, mtime,
+                 "\0".join(name for name, _ in subdirs)))
+            conn.executemany(
+                "INSERT INTO files (namespace, directory, name, size, mtime, inode, category) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((self.namespace, directory, record.name, record.size, record.mtime,
+                  record.inode, record.category) for record in files))
+
+    def _connect(self):
+        """
+        Opens the index on first use and creates its tables.
+
+        Returns:
+            sqlite3.Connection: The shared connection of this index.
+        """
+        if self._conn is None:
+            directory = os.path.dirname(self.index_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Directories are scanned from walk_tree worker threads
+            self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS dirs (
+                    namespace TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    mtime INTEGER NOT NULL,
+                    subdirs TEXT NOT NULL,
+                    PRIMARY KEY (namespace, path)
+                );
+                CREATE TABLE IF NOT EXISTS files (
+                    namespace TEXT NOT NULL,
+                    directory TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    inode INTEGER NOT NULL,
+                    category TEXT NOT NULL,
+                    PRIMARY KEY (namespace, directory, name)
+                );
+                """)
+        return self._conn
@@ -0,0 +1,546 @@
+import os
+import errno
+import shutil
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from move_plan import OVERWRITING_STRATEGIES
+from log_pipeline import log_file, flush_summary
+import instrumentation
+
+# Chunk size for kernel-side copies on the cross-device path
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Cross-device copies are made durable (fsync) in batches of this size
+SYNC_BATCH_SIZE = 256
+
+
+class MoveExecutor:
+    """
+    Applies file moves either serially or across a bounded thread pool.
+
+    Directory creation is always serialized through a lock and a cache of
+    already created folders, every failure is reported per file, and only
+    moves that actually succeeded are recorded for undo.
+
+    Moves within one filesystem are a single rename. Moves across filesystems
+    take a streaming copy path and the sources are removed only after the
+    copies have been synced to disk in batches; such a move counts as done,
+    and is recorded for undo, only once its source is gone.
+    """
+
+    def __init__(self, workers=1, undo_manager=None, sort_type=None, overwrite=True,
+                 progress=None, cancel_flag=None, resume=False):
+        """
+        Initializes the executor for a single sorting run.
+
+        Args:
+            workers (int): Number of concurrent moves. 1 keeps the classic
+                serial behavior and does not start a thread pool.
+            undo_manager (UndoManager, optional): Receives one record per
+                successful move.
+            sort_type (str, optional): Sorting type the undo records belong to.
+            overwrite (bool): Let strategies in OVERWRITING_STRATEGIES replace
+                existing files. Disable it when files from several folders
+                are merged into one.
+            progress (function, optional): Called as progress(done, total)
+                after every move, from whichever thread performed it. total
+                is None when the number of moves is not known in advance.
+            cancel_flag (Event, optional): When set, no further moves are
+                started; moves already in flight finish normally.
+            resume (bool): Record moves in the run reopened by
+                UndoManager.resume instead of starting a new undo run.
+        """
+        self.workers = max(1, int(workers or 1))
+        self.undo_manager = undo_manager
+        self.sort_type = sort_type
+        self.overwrite = overwrite
+        self.progress = progress
+        self.cancel_flag = cancel_flag
+        self.cancelled = False  # True once the run stopped on cancel_flag
+        self.total = None  # Number of planned moves, when known
+        self.moved = 0
+        self.renamed = 0  # Moves that took the same-device rename path
+        self.copied = 0  # Moves that took the cross-device copy path
+        self.errors = []  # (source path, error message) for each failed move
+        self._created_dirs = set()
+        self._devices = {}  # Directory -> st_dev, looked up once per directory
+        self._pending_sync = []  # Copied (source, destination, tracked) awaiting fsync
+        self._local = threading.local()  # Per-thread state of the running job
+        self._dir_lock = threading.Lock()
+        self._result_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+        if self.undo_manager is not None and self.sort_type and not resume:
+            self.undo_manager.start(self.sort_type)
+
+    def ensure_dir(self, path):
+        """
+        Creates a target directory once per run, one creation at a time.
+
+        Args:
+            path (str): Directory that must exist before files are moved in.
+
+        Returns:
+            None
+        """
+        # Lock-free fast path: set membership is safe to read concurrently
+        if path in self._created_dirs:
+            return
+        self.prepare_dirs((path,))
+
+    def prepare_dirs(self, paths):
+        """
+        Creates every target directory of a planned run in one batch.
+
+        Directories already in the run-scoped cache are skipped, so once the
+        plan has been prepared the move phase makes no mkdir calls at all.
+        A folder that cannot be created is logged; the moves into it then
+        fail and are reported per file. Folders created here, including
+        missing parents, are recorded for undo.
+
+        Args:
+            paths (iterable): Target directories, duplicates allowed.
+
+        Returns:
+            None
+        """
+        with self._dir_lock:
+            for path in sorted(set(paths) - self._created_dirs):
+                logging.info("Creating folder: %s", path)
+                try:
+                    with instrumentation.phase("mkdir"):
+                        missing = _missing_dirs(path)
+                        os.makedirs(path, exist_ok=True)
+                except OSError as e:
+                    logging.error(f"Error creating folder {path}: {e}")
+                    continue
+                self._created_dirs.add(path)
+                if self.undo_manager is not None and self.sort_type:
+                    for folder in missing:
+                        self.undo_manager.record_folder(self.sort_type, folder)
+
+    def run(self, jobs, move_func):
+        """
+        Executes every job with move_func.
+
+        Args:
+            jobs (iterable): Argument tuples for move_func. The first item of
+                each tuple must be the source path. The iterable is consumed
+                lazily, so a generator keeps memory bounded.
+            move_func (function): Performs one move and returns the
+                destination path.
+
+        Returns:
+            MoveExecutor: The executor itself, for chaining summary().
+        """
+        if hasattr(jobs, "__len__"):
+            self.total = len(jobs)
+        jobs = self._until_cancelled(jobs)
+        move_func = instrumentation.timed("move", move_func)
+
+        try:
+            if self.workers == 1:
+                for job in jobs:
+                    self._execute(move_func, job)
+                return self
+
+            # Cap the number of queued moves so huge folders are not buffered
+            slots = threading.BoundedSemaphore(self.workers * 4)
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for job in jobs:
+                    slots.acquire()
+                    future = pool.submit(self._execute, move_func, job)
+                    future.add_done_callback(lambda _: slots.release())
+            return self
+        finally:
+            self.finish()
+            flush_summary()
+
+    def execute(self, plan, move_func=None, checkpoint=False):
+        """
+        Applies a move plan: creates its folders in one batch, then moves.
+
+        Args:
+            plan (MovePlan): Moves computed by a planning function.
+            move_func (function, optional): Called as
+                move_func(source, destination, strategy) for each move and
+                returns the destination. Defaults to a plain move that only
+                overwrites for strategies in OVERWRITING_STRATEGIES, and only
+                if the executor allows overwriting.
+            checkpoint (bool): Store the plan in the undo journal first, so a
+                cancelled or crashed run can be resumed (see resume.py).
+                Requires an undo manager.
+
+        Returns:
+            MoveExecutor: The executor itself, for chaining summary().
+        """
+        if move_func is None:
+            move_func = self._move_planned
+        checkpoint = checkpoint and self.undo_manager is not None and self.sort_type
+        if checkpoint:
+            self.undo_manager.save_plan(self.sort_type, plan, self.overwrite)
+        self.prepare_dirs(plan.target_dirs())
+        self.run(plan, move_func)
+        if checkpoint and not self.cancelled:
+            self.undo_manager.complete_plan(self.sort_type)
+        return self
+
+    def execute_stream(self, moves, move_func=None):
+        """
+        Applies moves as they are produced, without materializing a plan.
+
+        Each folder is created the first time a move needs it and then served
+        from the run-scoped cache, so memory stays bounded by the number of
+        in-flight moves and distinct folders rather than the number of files.
+
+        Args:
+            moves (iterable): PlannedMove entries, typically a generator.
+            move_func (function, optional): Same contract as in execute().
+
+        Returns:
+            MoveExecutor: The executor itself, for chaining summary().
+        """
+        if move_func is None:
+            move_func = self._move_planned
+
+        def prepared():
+            for move in moves:
+                self.ensure_dir(os.path.dirname(move.destination))
+                yield move
+
+        return self.run(prepared(), move_func)
+
+    def move(self, source, destination, overwrite=False):
+        """
+        Moves one file, renaming in place whenever both sides share a device.
+
+        Args:
+            source (str): Full path of the file to move.
+            destination (str): Full destination path. Its folder must exist.
+            overwrite (bool): Replace an existing destination file instead of
+                failing, as shutil.move does for file destinations.
+
+        Raises:
+            FileExistsError: If the destination exists and overwrite is False.
+
+        Returns:
+            str: The destination path.
+        """
+        if not overwrite and os.path.lexists(destination):
+            raise FileExistsError(f"Destination already exists: {destination}")
+
+        source_dev = self._device(os.path.dirname(source))
+        target_dev = self._device(os.path.dirname(destination))
+        # An unknown device is resolved by trying the rename and catching EXDEV
+        if None in (source_dev, target_dev) or source_dev == target_dev:
+            try:
+                os.replace(source, destination)
+                with self._result_lock:
+                    self.renamed += 1
+                return destination
+            except OSError as e:
+                # Bind mounts can share st_dev and still refuse a rename
+                if e.errno != errno.EXDEV:
+                    raise
+
+        _stream_copy(source, destination)
+        # Inside a run the outcome is recorded when the copy is finalized
+        tracked = getattr(self._local, "in_job", False)
+        if tracked:
+            self._local.copying = True
+        self._queue_sync(source, destination, tracked)
+        return destination
+
+    def finish(self):
+        """
+        Syncs pending cross-device copies, removes their sources and commits
+        buffered undo records.
+
+        A copy that cannot be finalized is removed again, so the file stays
+        only at its source, and is reported as failed.
+
+        Returns:
+            None
+        """
+        with self._sync_lock:
+            pending, self._pending_sync = self._pending_sync, []
+
+        synced_dirs = set()
+        for source, destination, tracked in pending:
+            try:
+                _fsync_path(destination)
+                directory = os.path.dirname(destination)
+                if directory not in synced_dirs:
+                    _fsync_path(directory)
+                    synced_dirs.add(directory)
+                os.remove(source)
+            except OSError as e:
+                logging.error(f"Error finalizing copy {source} -> {destination}: {e}")
+                if os.path.lexists(source):
+                    _remove_quietly(destination)
+                self._failed(source, e)
+                continue
+            with self._result_lock:
+                self.copied += 1
+            if tracked:
+                self._succeeded(source, destination)
+
+        # Make the undo records of this run durable as well
+        if self.undo_manager is not None:
+            self.undo_manager.flush()
+
+    def totals(self):
+        """
+        Returns:
+            dict: Counters of the run for its run report.
+        """
+        return {"moved": self.moved, "renamed": self.renamed, "copied": self.copied,
+                "errors": len(self.errors), "cancelled": self.cancelled}
+
+    def summary(self):
+        """
+        Returns:
+            str: Human-readable one-line summary of the run.
+        """
+        summary = (f"Moved {self.moved} files ({self.renamed} renamed, "
+                   f"{self.copied} copied across devices), {len(self.errors)} failed")
+        if self.cancelled:
+            summary += ", cancelled"
+        return summary
+
+    def _move_planned(self, source, destination, strategy):
+        """
+        Default move function for execute().
+
+        Args:
+            source (str): Full path of the file to move.
+            destination (str): Full destination path.
+            strategy (str): Strategy that planned the move.
+
+        Returns:
+            str: The destination path.
+        """
+        self.move(source, destination, overwrite=(
+            self.overwrite and strategy in OVERWRITING_STRATEGIES))
+        log_file("Moved", source, destination)
+        return destination
+
+    def _device(self, directory):
+        """
+        Returns the device of a directory, caching it for the run.
+
+        Args:
+            directory (str): Directory to look up.
+
+        Returns:
+            int or None: The st_dev value, or None if the directory is missing.
+        """
+        device = self._devices.get(directory)
+        if device is None:
+            try:
+                device = os.stat(directory or ".").st_dev
+            except OSError:
+                return None
+            self._devices[directory] = device
+        return device
+
+    def _queue_sync(self, source, destination, tracked):
+        """
+        Queues a finished copy and flushes the queue once a batch is full.
+
+        Args:
+            source (str): Source file to remove after the copy is durable.
+            destination (str): Copied file that needs an fsync.
+            tracked (bool): Count the move and record it for undo once the
+                copy is finalized.
+
+        Returns:
+            None
+        """
+        with self._sync_lock:
+            self._pending_sync.append((source, destination, tracked))
+            batch_full = len(self._pending_sync) >= SYNC_BATCH_SIZE
+        if batch_full:
+            self.finish()
+
+    def _until_cancelled(self, jobs):
+        """
+        Passes jobs through until the cancel flag is set.
+
+        Args:
+            jobs (iterable): Jobs to dispatch.
+
+        Yields:
+            tuple: The next job, as long as the run is not cancelled.
+        """
+        for job in jobs:
+            if self.cancel_flag is not None and self.cancel_flag.is_set():
+                self.cancelled = True
+                logging.info("Sorting cancelled, no further files are moved.")
+                return
+            yield job
+
+    def _execute(self, move_func, job):
+        """
+        Runs a single move and records its outcome.
+
+        Args:
+            move_func (function): Performs the move and returns the destination.
+            job (tuple): Arguments for move_func, starting with the source path.
+
+        Returns:
+            None
+        """
+        source = job[0]
+        self._local.in_job, self._local.copying = True, False
+        try:
+            destination = move_func(*job)
+        except Exception as e:
+            logging.error(f"Error moving {source}: {e}")
+            self._failed(source, e)
+        else:
+            # Cross-device copies are recorded by finish() once finalized
+            if not self._local.copying:
+                self._succeeded(source, destination)
+        finally:
+            self._local.in_job = False
+
+    def _succeeded(self, source, destination):
+        """
+        Counts a finished move, records it for undo and reports progress.
+
+        Returns:
+            None
+        """
+        with self._result_lock:
+            self.moved += 1
+            done = self.moved + len(self.errors)
+            if self.undo_manager is not None and self.sort_type:
+                self.undo_manager.record_move(self.sort_type, source, destination)
+        if self.progress is not None:
+            self.progress(done, self.total)
+
+    def _failed(self, source, error):
+        """
+        Reports a failed move and its progress.
+
+        Returns:
+            None
+        """
+        with self._result_lock:
+            self.errors.append((source, str(error)))
+            done = self.moved + len(self.errors)
+        if self.progress is not None:
+            self.progress(done, self.total)
+
+
+def _stream_copy(source, destination):
+    """
+    Copies a file with kernel-side copy_file_range or sendfile, falling back
+    to a buffered copy, then copies its permissions and timestamps. A failed
+    copy leaves no partial destination behind.
+
+    Args:
+        source (str): Full path of the file to copy.
+        destination (str): Full path of the new file.
+
+    Returns:
+        None
+    """
+    with open(source, "rb") as fsrc:
+        try:
+            with open(destination, "wb") as fdst:
+                _copy_contents(fsrc, fdst)
+            shutil.copystat(source, destination)
+        except BaseException:
+            _remove_quietly(destination)
+            raise
+
+
+def _copy_contents(fsrc, fdst):
+    """
+    Copies the contents of one open file into another, kernel-side when the
+    platform allows it.
+
+    Returns:
+        None
+    """
+    in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+    for copy_chunk in _KERNEL_COPIES:
+        try:
+            while copy_chunk(in_fd, out_fd):
+                pass
+            break
+        except OSError as e:
+            # Try the next method only if this one wrote nothing at all
+            written = os.lseek(out_fd, 0, os.SEEK_CUR)
+            if written or e.errno not in _UNSUPPORTED_COPY_ERRORS:
+                raise
+    else:
+        shutil.copyfileobj(fsrc, fdst, COPY_CHUNK_SIZE)
+
+
+def _missing_dirs(path):
+    """
+    Returns:
+        list: path and those of its parents that do not exist yet, deepest first.
+    """
+    missing = []
+    while path and not os.path.isdir(path):
+        missing.append(path)
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return missing
+
+
+def _remove_quietly(path):
+    """
+    Removes a file, ignoring a failure.
+
+    Returns:
+        None
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _copy_file_range_chunk(in_fd, out_fd):
+    return os.copy_file_range(in_fd, out_fd, COPY_CHUNK_SIZE)
+
+
+def _sendfile_chunk(in_fd, out_fd):
+    return os.sendfile(out_fd, in_fd, None, COPY_CHUNK_SIZE)
+
+
+# Kernel copy methods available on this platform, fastest first
+_KERNEL_COPIES = tuple(
+    copy_chunk for name, copy_chunk in (
+        ("copy_file_range", _copy_file_range_chunk),
+        ("sendfile", _sendfile_chunk),
+    ) if hasattr(os, name)
+)
+
+_UNSUPPORTED_COPY_ERRORS = (
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP)
+
+
+def _fsync_path(path):
+    """
+    Flushes a file or directory to disk.
+
+    Args:
+        path (str): File or directory to sync.
+
+    Returns:
+        None
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
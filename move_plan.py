@@ -0,0 +1,59 @@
+import os
+from collections import namedtuple
+
+# One planned file move. The strategy names the sorter that planned it.
+PlannedMove = namedtuple("PlannedMove", ["source", "destination", "strategy"])
+
+# Strategies whose moves replace an existing destination file of the same name
+OVERWRITING_STRATEGIES = frozenset({"year_month"})
+
+
+class MovePlan:
+    """
+    Complete list of moves computed for a folder before anything is touched.
+
+    A plan is produced by a planning function (such as
+    organize_files.plan_by_type) and applied by MoveExecutor.execute. Because
+    every move is known up front, a plan can be inspected as a dry run,
+    counted for progress reporting, or applied in batches and in parallel.
+    """
+
+    __slots__ = ("folder_path", "moves")
+
+    def __init__(self, folder_path, moves=None):
+        """
+        Initializes a plan for a folder.
+
+        Args:
+            folder_path (str): Folder the plan was computed for.
+            moves (list, optional): Existing PlannedMove entries.
+        """
+        self.folder_path = folder_path
+        self.moves = moves if moves is not None else []
+
+    def __len__(self):
+        return len(self.moves)
+
+    def __iter__(self):
+        return iter(self.moves)
+
+    def add(self, source, destination, strategy):
+        """
+        Appends a move to the plan.
+
+        Args:
+            source (str): Full path of the file to move.
+            destination (str): Full destination path of the file.
+            strategy (str): Name of the strategy that planned the move.
+
+        Returns:
+            None
+        """
+        self.moves.append(PlannedMove(source, destination, strategy))
+
+    def target_dirs(self):
+        """
+        Returns:
+            set: Every folder the plan moves files into.
+        """
+        return {os.path.dirname(move.destination) for move in self.moves}
@@ -1,8 +1,17 @@
 import os
-import shutil
 import logging
 from datetime import datetime
 from undo_manager import UndoManager
+from scanner import ScanStats, scan_files
+from category_index import CategoryIndex
+from rule_engine import RuleSet, load_rules
+from move_executor import MoveExecutor
+from move_plan import MovePlan, PlannedMove
+from tree_walker import iter_tree_moves
+from dedup import DUPLICATES_FOLDER, route_duplicates, link_duplicates
+from content_sniffer import SNIFF_BATCH_SIZE
+from log_pipeline import log_file
+import instrumentation
 
 # Configure logging for tracking file organization activities
 logging.basicConfig(
@@ -13,44 +22,237 @@ logging.basicConfig(
 
 undo_manager = UndoManager()
 
+# File type categorization based on extensions
+EXTENSIONS = {
+    "Documents": [".pdf", ".docx", ".txt", ".xls", ".xlsx"],
+    "Images": [".jpg", ".jpeg", ".png", ".gif"],
+    "Videos": [".mp4", ".avi", ".mkv"],
+    "Archives": [".zip", ".rar"],
+}
 
-def organize_files(folder_path):
+# Rules file replacing EXTENSIONS, see rule_engine.load_rules
+DEFAULT_RULES_PATH = os.environ.get("FILEZEN_RULES")
+
+# Compiled on first use and shared by every organize_files call
+_category_index = None
+
+
+def default_category_index():
+    """
+    Returns the rules used when none are given: those of the DEFAULT_RULES_PATH
+    file if set, else EXTENSIONS. They are compiled on the first call, so
+    an invalid rules file only fails the sorts that need it.
+
+    Raises:
+        ValueError: If the rules file cannot be read or is invalid.
+
+    Returns:
+        CategoryIndex or RuleSet: The compiled default rules.
+    """
+    global _category_index
+    if _category_index is None:
+        if DEFAULT_RULES_PATH:
+            try:
+                _category_index = load_rules(DEFAULT_RULES_PATH)
+            except (OSError, ValueError) as e:
+                raise ValueError(f"FILEZEN_RULES: {e}") from e
+        else:
+            _category_index = CategoryIndex(EXTENSIONS)
+    return _category_index
+
+
+@instrumentation.instrumented("organize_files", MoveExecutor.totals, folder="folder_path")
+def organize_files(folder_path, category_index=None, workers=1, streaming=False,
+                   recursive=False, flatten=False, progress=None, cancel_flag=None,
+                   checkpoint=False, dedup=None, sniffer=None):
     """
     Organizes files in the specified folder into subfolders based on their types.
 
     Args:
         folder_path (str): Path to the folder containing files to organize.
+        category_index (CategoryIndex or RuleSet, optional): Compiled rules.
+            Defaults to default_category_index().
+        workers (int): Number of concurrent moves. Values above 1 enable the
+            thread pool executor, which helps on latency-bound volumes.
+        streaming (bool): Move files while the folder is still being scanned
+            instead of planning every move first. Memory stays bounded for
+            huge folders, at the cost of creating folders on first use.
+        recursive (bool): Also organize every subfolder, walking subtrees in
+            parallel. Category folders created by FileZen are left alone.
+        flatten (bool): With recursive, move files from every level into the
+            category folders of folder_path instead of organizing each
+            level in place.
+        progress (function, optional): Called as progress(done, total) after
+            every move, see MoveExecutor.
+        cancel_flag (Event, optional): Stops the run between files when set.
+        checkpoint (bool): Store the plan in the undo journal so a cancelled
+            or interrupted run can be continued with resume.resume_sort().
+            Ignored when streaming, since no plan exists up front.
+        dedup (str, optional): Duplicate handling before anything moves.
+            "move" sends every copy but one into a Duplicates folder, "link"
+            replaces the copies with hard links to the first one. Requires a
+            planned run, since all files must be known to find duplicates.
+        sniffer (ContentSniffer, optional): Classifies files by their content
+            when their extension is unknown or missing, instead of sending
+            them to the default category.
+
+    Raises:
+        FileNotFoundError: If the specified folder does not exist.
+        ValueError: If dedup is unknown or combined with streaming.
+
+    Returns:
+        MoveExecutor: The finished run, with its counters and summary().
+    """
+    if dedup not in (None, "move", "link"):
+        raise ValueError(f"Unknown duplicate handling: {dedup}")
+    if dedup and streaming:
+        raise ValueError("Duplicate detection requires a planned run, not streaming")
+
+    moves = iter_moves_by_type(folder_path, category_index,
+                               recursive=recursive, flatten=flatten, sniffer=sniffer)
+    executor = MoveExecutor(workers, undo_manager, "organize_files",
+                            progress=progress, cancel_flag=cancel_flag)
+
+    def move(file_path, destination, strategy):
+        target_folder = os.path.dirname(destination)
+        return _move_file(file_path, target_folder,
+                          os.path.basename(target_folder), executor)
+
+    if streaming:
+        executor.execute_stream(moves, move)
+    else:
+        plan = MovePlan(folder_path, list(moves))
+        if dedup == "move":
+            plan = route_duplicates(plan)
+        elif dedup == "link":
+            link_duplicates(plan, undo_manager=undo_manager, sort_type="organize_files")
+        executor.execute(plan, move, checkpoint)
+    logging.info(executor.summary())
+    return executor
+
+
+def plan_by_type(folder_path, category_index=None, stats=None):
+    """
+    Computes the move plan for organizing a folder by file type.
+
+    Args:
+        folder_path (str): Path to the folder containing files to organize.
+        category_index (CategoryIndex or RuleSet, optional): Compiled rules.
+            Defaults to default_category_index().
+        stats (ScanStats, optional): Collector for scan throughput.
 
     Raises:
         FileNotFoundError: If the specified folder does not exist.
 
     Returns:
-        None
+        MovePlan: One "type" move per file in the folder.
+    """
+    moves = iter_moves_by_type(folder_path, category_index, stats)
+    return MovePlan(folder_path, list(moves))
+
+
+def iter_moves_by_type(folder_path, category_index=None, stats=None,
+                       recursive=False, flatten=False, sniffer=None):
+    """
+    Lazily yields the moves for organizing a folder by file type.
+
+    Args:
+        folder_path (str): Path to the folder containing files to organize.
+        category_index (CategoryIndex or RuleSet, optional): Compiled rules.
+            Defaults to default_category_index().
+        stats (ScanStats, optional): Collector for scan throughput.
+        recursive (bool): Include files of every subfolder, skipping the
+            category folders themselves.
+        flatten (bool): With recursive, target the category folders of
+            folder_path instead of those of each file's own folder.
+        sniffer (ContentSniffer, optional): Content classifier for files
+            whose extension is unknown or missing.
+
+    Raises:
+        FileNotFoundError: If the specified folder does not exist. Raised
+            immediately, not on first iteration.
+
+    Returns:
+        generator: PlannedMove entries with the "type" strategy.
     """
     if not os.path.exists(folder_path):
         logging.error(f"Folder does not exist: {folder_path}")
         raise FileNotFoundError(f"Folder does not exist: {folder_path}")
 
-    # File type categorization based on extensions
-    extensions = {
-        "Documents": [".pdf", ".docx", ".txt", ".xls", ".xlsx"],
-        "Images": [".jpg", ".jpeg", ".png", ".gif"],
-        "Videos": [".mp4", ".avi", ".mkv"],
-        "Archives": [".zip", ".rar"],
-    }
+    if category_index is None:
+        category_index = default_category_index()
+    if stats is None:
+        stats = ScanStats()
+
+    def plan_entries(entries, target_root):
+        return _type_moves(entries, target_root, category_index, sniffer)
 
-    processed_files = set()  # Tracks already organized files
+    def moves():
+        if recursive:
+            output_folders = category_index.categories() | {DUPLICATES_FOLDER}
+            if sniffer is not None:
+                output_folders |= sniffer.table.categories()
+            yield from iter_tree_moves(folder_path, plan_entries,
+                                       output_folders.__contains__, flatten,
+                                       stats=stats)
+        else:
+            # File type comes from the cached scandir entry, so no stat is needed
+            yield from plan_entries(scan_files(folder_path, stats), folder_path)
+        logging.info(stats.summary())
 
-    for file_name in os.listdir(folder_path):
-        if file_name in processed_files:
-            continue  # Skip files already processed
+    return moves()
 
-        file_path = os.path.join(folder_path, file_name)
-        if os.path.isfile(file_path):
-            category = _get_file_category(file_name, extensions)
-            target_folder = os.path.join(folder_path, category)
-            _move_file(file_path, target_folder, category)
-            processed_files.add(file_name)
+
+def _type_moves(entries, target_root, category_index, sniffer=None):
+    """
+    Plans the type moves of scanned file entries.
+
+    Args:
+        entries (iterable): os.DirEntry objects of regular files.
+        target_root (str): Folder receiving the category subfolders.
+        category_index (CategoryIndex or RuleSet): Compiled rules.
+        sniffer (ContentSniffer, optional): Classifies the files that no
+            extension rule matches by their content. Only those files are read.
+
+    Yields:
+        PlannedMove: One "type" move per entry.
+    """
+    lookup = instrumentation.timed("classify", category_index.lookup_entry)
+    unknown = []
+    for entry in entries:
+        category = lookup(entry)
+        if sniffer is not None and category == category_index.default:
+            unknown.append(entry)
+            # Sniffed in batches, so streaming runs keep bounded memory
+            if len(unknown) >= SNIFF_BATCH_SIZE:
+                yield from _sniffed_moves(unknown, target_root, category_index, sniffer)
+                unknown = []
+            continue
+        yield PlannedMove(
+            entry.path, os.path.join(target_root, category, entry.name), "type")
+
+    if unknown:
+        yield from _sniffed_moves(unknown, target_root, category_index, sniffer)
+
+
+def _sniffed_moves(entries, target_root, category_index, sniffer):
+    """
+    Plans the type moves of entries classified by their content.
+
+    Args:
+        entries (list): os.DirEntry objects no extension rule matched.
+        target_root (str): Folder receiving the category subfolders.
+        category_index (CategoryIndex or RuleSet): Provides the default category for
+            unrecognized content.
+        sniffer (ContentSniffer): Content classifier.
+
+    Yields:
+        PlannedMove: One "type" move per entry.
+    """
+    for entry, category in sniffer.sniff_entries(entries):
+        category = category or category_index.default
+        yield PlannedMove(
+            entry.path, os.path.join(target_root, category, entry.name), "type")
 
 
 def sort_by_type(folder_path, progress_var=None, cancel_flag=None, app=None, show_message=None):
@@ -65,14 +267,19 @@ def sort_by_type(folder_path, progress_var=None, cancel_flag=None, app=None, sho
         show_message (function, optional): Function to show messages in the GUI.
 
     Returns:
-        None
+        MoveExecutor: The finished run, with its counters and summary().
     """
     logging.info("Sorting files by type...")
-    organize_files(folder_path)
+    executor = organize_files(folder_path, progress=_percent_progress(progress_var),
+                              cancel_flag=cancel_flag)
     logging.info("Files sorted by type successfully!")
+    if show_message:
+        show_message(executor.summary())
+    return executor
 
 
-def sort_by_date(folder_path, progress_var=None, cancel_flag=None, app=None, show_message=None):
+def sort_by_date(folder_path, progress_var=None, cancel_flag=None, app=None, show_message=None,
+                 streaming=False):
     """
     Organizes files into subfolders based on their creation date.
 
@@ -82,34 +289,98 @@ def sort_by_date(folder_path, progress_var=None, cancel_flag=None, app=None, sho
         cancel_flag (Event, optional): Flag to cancel sorting.
         app (Tk, optional): Tkinter instance for GUI updates.
         show_message (function, optional): Function to show messages in the GUI.
+        streaming (bool): Move files while the folder is still being scanned,
+            keeping memory bounded for huge folders.
 
     Raises:
         FileNotFoundError: If the specified folder does not exist.
 
     Returns:
-        None
+        MoveExecutor: The finished run, with its counters and summary().
+    """
+    moves = iter_moves_by_date(folder_path)
+    executor = MoveExecutor(undo_manager=undo_manager, sort_type="sort_by_date",
+                            progress=_percent_progress(progress_var),
+                            cancel_flag=cancel_flag)
+    if streaming:
+        executor.execute_stream(moves)
+    else:
+        executor.execute(MovePlan(folder_path, list(moves)))
+    logging.info(executor.summary())
+    if show_message:
+        show_message(executor.summary())
+    return executor
+
+
+def plan_by_date(folder_path):
+    """
+    Computes the move plan for organizing a folder into UTC year/month folders.
+
+    Args:
+        folder_path (str): Path to the folder containing files.
+
+    Raises:
+        FileNotFoundError: If the specified folder does not exist.
+
+    Returns:
+        MovePlan: One "date" move per file in the folder.
+    """
+    return MovePlan(folder_path, list(iter_moves_by_date(folder_path)))
+
+
+def iter_moves_by_date(folder_path):
+    """
+    Lazily yields the moves for organizing a folder into UTC year/month folders.
+
+    Entry names within a folder are unique, so no set of processed names is
+    kept and memory does not grow with the folder size.
+
+    Args:
+        folder_path (str): Path to the folder containing files.
+
+    Raises:
+        FileNotFoundError: If the specified folder does not exist. Raised
+            immediately, not on first iteration.
+
+    Returns:
+        generator: PlannedMove entries with the "date" strategy.
     """
     if not os.path.exists(folder_path):
         logging.error(f"Folder does not exist: {folder_path}")
         raise FileNotFoundError(f"Folder does not exist: {folder_path}")
 
-    files = os.listdir(folder_path)
-    processed_files = set()  # Tracks already organized files
-
-    for file_name in files:
-        if file_name in processed_files:
-            continue  # Skip files already processed
-
-        file_path = os.path.join(folder_path, file_name)
-        if os.path.isfile(file_path):
-            creation_time = os.path.getmtime(file_path)
+    def moves():
+        for entry in scan_files(folder_path):
+            # The stat result is cached on the entry, one syscall per file
+            creation_time = entry.stat().st_mtime
             year, month = datetime.utcfromtimestamp(
                 creation_time).strftime('%Y-%m').split('-')
-            target_folder = os.path.join(folder_path, year, month)
-            os.makedirs(target_folder, exist_ok=True)
-            shutil.move(file_path, target_folder)
-            processed_files.add(file_name)
-            logging.info(f"Moved {file_name} to {year}/{month}")
+            yield PlannedMove(
+                entry.path, os.path.join(folder_path, year, month, entry.name), "date")
+
+    return moves()
+
+
+def _percent_progress(progress_var):
+    """
+    Adapts a progress variable to the progress callback of MoveExecutor.
+
+    Args:
+        progress_var (DoubleVar, optional): Receives the completed percentage.
+            Must be safe to set from worker threads, such as a ProgressRelay.
+
+    Returns:
+        function: progress(done, total) callback, or None without a variable.
+    """
+    if progress_var is None:
+        return None
+
+    def progress(done, total):
+        # Streaming runs do not know their total until they finish
+        if total:
+            progress_var.set(min(100.0, 100.0 * done / total))
+
+    return progress
 
 
 def _get_file_category(file_name, extensions):
@@ -118,29 +389,42 @@ def _get_file_category(file_name, extensions):
 
     Args:
         file_name (str): Name of the file.
-        extensions (dict): Dictionary mapping categories to file extensions.
+        extensions (CategoryIndex, RuleSet or dict): Compiled rules, or a
+            dictionary mapping categories to file extensions. A dictionary is
+            compiled on every call, so hot loops should pass compiled rules.
 
     Returns:
         str: Category name for the file.
     """
-    for category, exts in extensions.items():
-        if any(file_name.lower().endswith(ext) for ext in exts):
-            return category
-    return "Others"
+    if not isinstance(extensions, (CategoryIndex, RuleSet)):
+        extensions = CategoryIndex(extensions)
+    return extensions.lookup(file_name)
 
 
-def _move_file(file_path, target_folder, category):
+def _move_file(file_path, target_folder, category, executor=None):
     """
     Moves a file to the specified folder based on its category.
 
     Args:
         file_path (str): Full path to the file being moved.
         target_folder (str): Destination folder path.
-        category (str): Category name for logging.
+        category (str): Category of the file.
+        executor (MoveExecutor, optional): Run-scoped executor whose directory
+            cache already holds target_folder. When omitted, a one-off
+            executor is used and creates the folder itself.
 
     Returns:
-        None
+        str: Path of the moved file.
     """
-    os.makedirs(target_folder, exist_ok=True)
-    shutil.move(file_path, target_folder)
-    logging.info(f"Moved {os.path.basename(file_path)} to {category}")
+    own_executor = executor is None
+    if own_executor:
+        executor = MoveExecutor()
+        executor.ensure_dir(target_folder)
+
+    destination = os.path.join(target_folder, os.path.basename(file_path))
+    executor.move(file_path, destination)
+    if own_executor:
+        executor.finish()
+
+    log_file("Moved", file_path, destination)
+    return destination
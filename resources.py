@@ -1,7 +1,7 @@
 import os
 import json
 import logging
-from PIL import Image, ImageTk
+import threading
 
 # Configure logging for debugging and tracking application state
 logging.basicConfig(
@@ -11,6 +11,20 @@ logging.basicConfig(
 )
 
 
+def __getattr__(name):
+    """
+    Imports Pillow on first access to resources.Image or resources.ImageTk.
+
+    Loading translations or the icon never needs Pillow, so importing this
+    module stays cheap and the window can appear before any image is decoded.
+    """
+    if name in ("Image", "ImageTk"):
+        from PIL import Image, ImageTk
+        globals().update(Image=Image, ImageTk=ImageTk)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def load_translations(file_path):
     """
     Loads translation data from a JSON file.
@@ -46,23 +60,23 @@ def load_translations(file_path):
         return {}
 
 
-def load_background(file_path):
+def load_background(file_path, size=None):
     """
     Loads a background image for the application.
 
     Args:
         file_path (str): The path to the background image file.
+        size (tuple, optional): (width, height) to resize the image to.
 
     Returns:
         PhotoImage or None: The loaded image as a PhotoImage object, or None if an error occurs.
     """
-    if not os.path.exists(file_path):
-        logging.error(
-            f"Background image not found at {file_path}. Returning None.")
+    background_img = decode_background(file_path, size)
+    if background_img is None:
         return None
 
     try:
-        background_img = Image.open(file_path)
+        from PIL import ImageTk
         background_photo = ImageTk.PhotoImage(background_img)
         logging.info(f"Background image loaded successfully from {file_path}")
         return background_photo
@@ -72,6 +86,81 @@ def load_background(file_path):
         return None
 
 
+def decode_background(file_path, size=None):
+    """
+    Decodes the background image without touching Tk, so it can run on a
+    worker thread while the window is already visible.
+
+    For JPEG files the decoder is asked for a reduced-scale draft first, so a
+    large photo is never fully decoded just to be shrunk to the canvas size.
+
+    Args:
+        file_path (str): The path to the background image file.
+        size (tuple, optional): (width, height) to resize the image to.
+
+    Returns:
+        Image or None: The decoded PIL image, or None if an error occurs.
+    """
+    if not os.path.exists(file_path):
+        logging.error(
+            f"Background image not found at {file_path}. Returning None.")
+        return None
+
+    try:
+        from PIL import Image
+        background_img = Image.open(file_path)
+        if size is not None:
+            background_img.draft("RGB", size)
+            background_img = background_img.convert("RGB").resize(size, Image.LANCZOS)
+        return background_img
+    except Exception as e:
+        logging.error(
+            f"Unexpected error decoding background image from {file_path}: {e}")
+        return None
+
+
+def load_background_async(app, file_path, on_loaded, size=None, poll_ms=20):
+    """
+    Decodes the background image on a worker thread and hands the finished
+    PhotoImage to on_loaded on the Tk main thread.
+
+    Args:
+        app (Tk): The main Tkinter application instance.
+        file_path (str): The path to the background image file.
+        on_loaded (function): Called with the PhotoImage once it is ready.
+            Not called if the image cannot be loaded.
+        size (tuple, optional): (width, height) to resize the image to.
+        poll_ms (int): Interval at which the main loop checks for the result.
+
+    Returns:
+        Thread: The worker thread decoding the image.
+    """
+    result = {}
+
+    def decode():
+        result["image"] = decode_background(file_path, size)
+
+    def deliver():
+        # Tk objects may only be created on the main thread, so poll from it
+        if worker.is_alive():
+            app.after(poll_ms, deliver)
+            return
+        if result.get("image") is None:
+            return
+        try:
+            from PIL import ImageTk
+            on_loaded(ImageTk.PhotoImage(result["image"]))
+            logging.info(f"Background image loaded successfully from {file_path}")
+        except Exception as e:
+            logging.error(
+                f"Unexpected error loading background image from {file_path}: {e}")
+
+    worker = threading.Thread(target=decode, daemon=True)
+    worker.start()
+    app.after(poll_ms, deliver)
+    return worker
+
+
 def load_icon(app, file_path):
     """
     Sets the application icon.
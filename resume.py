@@ -0,0 +1,43 @@
+import logging
+from move_plan import MovePlan
+from move_executor import MoveExecutor
+from undo_manager import UndoManager
+
+
+def resume_sort(sort_type, undo_manager=None, workers=1, progress=None, cancel_flag=None):
+    """
+    Continues the latest run of a sorting type from its checkpoint.
+
+    The remaining moves are read from the plan stored in the undo journal
+    (see MoveExecutor.execute with checkpoint=True), so the folder is not
+    scanned again. The resumed moves join the original undo run.
+
+    Args:
+        sort_type (str): The type of sorting operation to resume, such as
+            "organize_files" or "sort_by_year_and_month".
+        undo_manager (UndoManager, optional): Journal holding the checkpoint.
+            Defaults to a manager on the default journal.
+        workers (int): Number of concurrent moves.
+        progress (function, optional): Called as progress(done, total) after
+            every move, see MoveExecutor.
+        cancel_flag (Event, optional): Stops the run between files when set;
+            it can then be resumed again.
+
+    Returns:
+        MoveExecutor: The finished run, or None if there was nothing to resume.
+    """
+    if undo_manager is None:
+        undo_manager = UndoManager()
+
+    checkpoint = undo_manager.resume(sort_type)
+    if checkpoint is None:
+        return None
+
+    executor = MoveExecutor(workers, undo_manager, sort_type,
+                            overwrite=checkpoint.overwrite, progress=progress,
+                            cancel_flag=cancel_flag, resume=True)
+    executor.execute(MovePlan(checkpoint.folder_path, checkpoint.moves))
+    if not executor.cancelled:
+        undo_manager.complete_plan(sort_type)
+    logging.info(executor.summary())
+    return executor
@@ -0,0 +1,399 @@
+import re
+import json
+import time
+import fnmatch
+from itertools import groupby
+from collections import namedtuple
+from category_index import CategoryIndex
+
+# Keys a rule may have in a rules file, besides "category"
+RULE_KEYS = ("extensions", "glob", "regex", "min_size", "max_size",
+             "min_age_days", "max_age_days")
+
+# Flags of a regex without inline flags
+_PLAIN_FLAGS = re.compile("").flags
+
+# One classification rule. A file matches when every condition that is set
+# holds: extensions (lowercase suffixes), glob (patterns on the name, case
+# insensitive), regex (searched in the name), size in bytes and age in days
+# of the modification time, with inclusive bounds.
+Rule = namedtuple("Rule", ["category"] + list(RULE_KEYS), defaults=[None] * len(RULE_KEYS))
+
+
+class RuleSet:
+    """
+    Ordered classification rules compiled into a tiered decision structure.
+
+    A file takes the category of the first rule it matches, except that among
+    rules on extensions only, the longest matching suffix wins, as in
+    CategoryIndex. Each tier is consulted only if it can still produce an
+    earlier rule than the ones found so far:
+
+    1. Rules on extensions only: one suffix hash probe (CategoryIndex).
+    2. Rules on name patterns only: one combined regular expression per
+       literal name prefix of the globs, found by a hash probe per distinct
+       prefix length, plus one for globs starting with a wildcard and for
+       regexes. Python tries alternatives in order, so the match is the
+       earliest rule of the expression.
+    3. Any other rule (size or age bounds, mixed conditions, or regexes
+       with groups or global inline flags, which cannot be embedded in an
+       alternation), checked in order; the file is stated at most once, and
+       only if such a rule is reached.
+
+    Rule sets with many extension rules and prefixed globs therefore decide a
+    file in about constant time, whatever their length.
+    """
+
+    def __init__(self, rules, default="Others"):
+        """
+        Compiles rules.
+
+        Args:
+            rules (iterable): Rule entries, in priority order.
+            default (str): Category of files no rule matches.
+
+        Raises:
+            ValueError: If a rule has no condition or an invalid pattern.
+        """
+        self.rules = [_normalized(rule) for rule in rules]
+        self.default = default
+        self._none = len(self.rules)  # Index standing for "no rule matched"
+
+        suffix_rules = {}
+        buckets, anywhere = {}, []  # Literal prefix -> [(index, regex)], and the rest
+        self._general = []  # (index, Rule, name expression) of other rules
+        for index, rule in enumerate(self.rules):
+            kind = _kind(rule)
+            if kind == "suffix":
+                suffix_rules[index] = rule.extensions
+            elif kind == "pattern":
+                for prefix, expression in _pattern_expressions(rule):
+                    if prefix:
+                        buckets.setdefault(prefix, []).append((index, expression))
+                    else:
+                        anywhere.append((index, expression))
+            else:
+                self._general.append((index, rule, _name_expression(rule)))
+
+        self._suffixes = CategoryIndex(suffix_rules, default=None)
+        self._buckets = {}  # Prefix length -> {prefix: combined expression}
+        for prefix, patterns in buckets.items():
+            self._buckets.setdefault(len(prefix), {})[prefix] = _combined(patterns)
+        self._buckets = sorted(self._buckets.items())
+        self._anywhere = _combined(anywhere) if anywhere else None
+        # Earliest rule each pattern tier can produce, to skip it when a
+        # suffix rule already matched before it
+        self._first_bucketed = min((index for patterns in buckets.values()
+                                    for index, _ in patterns), default=self._none)
+        self._first_anywhere = min((index for index, _ in anywhere), default=self._none)
+        self._needs_stat = any(_needs_stat(rule) for _, rule, _ in self._general)
+
+    def __len__(self):
+        return len(self.rules)
+
+    @classmethod
+    def from_extensions(cls, extensions, default="Others"):
+        """
+        Builds a rule set equivalent to a category -> extensions dictionary.
+
+        Args:
+            extensions (dict): Dictionary mapping categories to file extensions.
+            default (str): Category of files no rule matches.
+
+        Returns:
+            RuleSet: One extension rule per category.
+        """
+        return cls([Rule(category, extensions=exts) for category, exts in extensions.items()],
+                   default)
+
+    def categories(self):
+        """
+        Returns:
+            set: Every category the rules can produce, including the default.
+        """
+        return {rule.category for rule in self.rules} | {self.default}
+
+    def lookup(self, file_name):
+        """
+        Determines the category of a file from its name alone. Rules on size
+        or age never match here, since no metadata is available.
+
+        Args:
+            file_name (str): Name of the file.
+
+        Returns:
+            str: Category name for the file.
+        """
+        return self._decide(file_name, None)
+
+    def lookup_entry(self, entry):
+        """
+        Determines the category of a scanned file.
+
+        Args:
+            entry (os.DirEntry): Entry of the file; its cached stat() is used
+                for size and age rules.
+
+        Returns:
+            str: Category name for the file.
+        """
+        return self._decide(entry.name, entry.stat if self._needs_stat else None)
+
+    def _decide(self, file_name, stat):
+        best = self._suffixes.lookup(file_name)
+        if best is None:
+            best = self._none
+
+        if self._first_bucketed < best:
+            for length, expressions in self._buckets:
+                expression = expressions.get(file_name[:length].lower())
+                if expression is not None:
+                    match = expression.match(file_name)
+                    if match is not None:
+                        best = min(best, int(match.lastgroup[1:]))
+        if self._first_anywhere < best:
+            match = self._anywhere.match(file_name)
+            if match is not None:
+                best = min(best, int(match.lastgroup[1:]))
+
+        metadata = None
+        for index, rule, name_expression in self._general:
+            if index >= best:
+                break
+            if _needs_stat(rule):
+                if stat is None:
+                    continue
+                if metadata is None:
+                    try:
+                        metadata = stat()
+                    except OSError:
+                        stat = None
+                        continue
+            if _holds(rule, name_expression, file_name, metadata):
+                best = index
+                break
+
+        if best == self._none:
+            return self.default
+        return self.rules[best].category
+
+
+def load_rules(path):
+    """
+    Reads and compiles a JSON rules file.
+
+    The file holds an object with an optional "default" category and a
+    "rules" list, tried in order. Each rule names its "category" and any of
+    RULE_KEYS; "glob" and "extensions" may be a string or a list:
+
+        {"default": "Others", "rules": [
+            {"category": "Large", "min_size": 1073741824},
+            {"category": "Screenshots", "glob": "Screenshot*.png"},
+            {"category": "Documents", "extensions": [".pdf", ".docx"]}]}
+
+    Args:
+        path (str): Path of the rules file.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not valid JSON or a rule is invalid.
+
+    Returns:
+        RuleSet: The compiled rules.
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"{path}: needs an object with a \"rules\" list")
+    entries, default = config.get("rules", []), config.get("default", "Others")
+    if not isinstance(entries, list) or not isinstance(default, str):
+        raise ValueError(f"{path}: \"rules\" must be a list and \"default\" a string")
+
+    rules = []
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or set(entry) - {"category", *RULE_KEYS} \
+                or not isinstance(entry.get("category"), str):
+            raise ValueError(f"Rule {number} in {path}: needs a category and only "
+                             f"{', '.join(RULE_KEYS)}")
+        problem = _type_problem(entry)
+        if problem:
+            raise ValueError(f"Rule {number} in {path}: {problem}")
+        rules.append(Rule(**entry))
+    return RuleSet(rules, default)
+
+
+def _type_problem(entry):
+    """
+    Returns:
+        str: What is wrong with the types of the conditions of a rules file
+            entry, or None if they are all valid.
+    """
+    for key in ("extensions", "glob"):
+        value = entry.get(key)
+        if value is not None and not isinstance(value, str) and not (
+                isinstance(value, list) and all(isinstance(item, str) for item in value)):
+            return f"{key} must be a string or a list of strings"
+    if not isinstance(entry.get("regex", ""), str):
+        return "regex must be a string"
+    for key in ("min_size", "max_size", "min_age_days", "max_age_days"):
+        value = entry.get(key)
+        if value is not None and (isinstance(value, bool)
+                                  or not isinstance(value, (int, float))):
+            return f"{key} must be a number"
+    return None
+
+
+def _normalized(rule):
+    """
+    Returns:
+        Rule: The rule with list conditions as tuples and lowercase,
+            dot-prefixed extensions.
+
+    Raises:
+        ValueError: If the rule has no condition.
+    """
+    extensions, globs = rule.extensions, rule.glob
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    if extensions is not None:
+        extensions = tuple(ext.lower() if ext.startswith(".") else "." + ext.lower()
+                           for ext in extensions)
+    if isinstance(globs, str):
+        globs = [globs]
+    if globs is not None:
+        globs = tuple(globs)
+    rule = rule._replace(extensions=extensions, glob=globs)
+    if all(getattr(rule, key) is None for key in RULE_KEYS):
+        raise ValueError(f"Rule for {rule.category} has no condition")
+    return rule
+
+
+def _kind(rule):
+    """
+    Returns:
+        str: "suffix" for rules on extensions only, "pattern" for rules on
+            the name only, "general" for everything else.
+    """
+    conditions = {key for key in RULE_KEYS if getattr(rule, key) is not None}
+    if conditions == {"extensions"}:
+        return "suffix"
+    if conditions and conditions <= {"glob", "regex"} and not (
+            rule.glob and rule.regex is not None):
+        if rule.regex is None or _combinable(_checked(rule.regex)):
+            return "pattern"
+    return "general"
+
+
+def _combinable(expression):
+    """
+    Returns:
+        bool: Whether a compiled regex can be embedded in an alternation
+            with others: it has no groups, hence no backreferences and no
+            group names that could clash, and no global inline flags such
+            as (?i), which are only allowed at the start of an expression.
+    """
+    return expression.groups == 0 and expression.flags == _PLAIN_FLAGS
+
+
+def _pattern_expressions(rule):
+    """
+    Yields:
+        tuple: (lowercase literal prefix, regular expression) per alternative
+            of a name pattern rule. Glob patterns match the whole name,
+            regexes anywhere in it.
+    """
+    if rule.regex is not None:
+        _checked(rule.regex)
+        yield "", f"(?:.*?(?:{rule.regex}))"
+        return
+    for pattern in rule.glob:
+        prefix = re.split(r"[*?\[]", pattern, maxsplit=1)[0].lower()
+        yield prefix, f"(?i:{fnmatch.translate(pattern)})"
+
+
+def _name_expression(rule):
+    """
+    Returns:
+        re.Pattern: Expression for the glob or regex condition of a rule,
+            matched with search(), or None if the rule has neither.
+    """
+    if rule.regex is not None:
+        return _checked(rule.regex)
+    if rule.glob is not None:
+        return re.compile("|".join(f"(?i:^{fnmatch.translate(pattern)})"
+                                   for pattern in rule.glob))
+    return None
+
+
+def _combined(patterns):
+    """
+    Joins (rule index, expression) pairs into one alternation whose matching
+    group name is "r" followed by the rule index. Consecutive expressions of
+    the same rule, such as the globs of one rule sharing a prefix, share
+    its group.
+
+    Returns:
+        re.Pattern: The compiled expression.
+
+    Raises:
+        ValueError: If the expressions cannot be combined.
+    """
+    try:
+        return re.compile("|".join(
+            f"(?P<r{index}>{'|'.join(expression for _, expression in group)})"
+            for index, group in groupby(patterns, key=lambda pattern: pattern[0])),
+            re.DOTALL)
+    except re.error as e:
+        raise ValueError(f"Cannot combine name patterns of rules "
+                         f"{', '.join(str(index + 1) for index, _ in patterns)}: {e}") from e
+
+
+def _checked(regex):
+    """
+    Compiles a regex from a rule on its own, for a clear error message.
+
+    Raises:
+        ValueError: If the expression is invalid.
+    """
+    try:
+        return re.compile(regex)
+    except re.error as e:
+        raise ValueError(f"Invalid regex {regex!r}: {e}") from e
+
+
+def _needs_stat(rule):
+    return (rule.min_size is not None or rule.max_size is not None
+            or rule.min_age_days is not None or rule.max_age_days is not None)
+
+
+def _holds(rule, name_expression, file_name, metadata):
+    """
+    Checks every condition of a general rule.
+
+    Args:
+        rule (Rule): The rule.
+        name_expression (re.Pattern): Compiled glob or regex condition, or None.
+        file_name (str): Name of the file.
+        metadata (os.stat_result): Metadata, required for size and age rules.
+
+    Returns:
+        bool: True if the file matches the rule.
+    """
+    if rule.extensions is not None and not file_name.lower().endswith(rule.extensions):
+        return False
+    if name_expression is not None and name_expression.search(file_name) is None:
+        return False
+    if metadata is None:
+        return True
+
+    size = metadata.st_size
+    if rule.min_size is not None and size < rule.min_size:
+        return False
+    if rule.max_size is not None and size > rule.max_size:
+        return False
+    age_days = (time.time() - metadata.st_mtime) / 86400
+    if rule.min_age_days is not None and age_days < rule.min_age_days:
+        return False
+    if rule.max_age_days is not None and age_days > rule.max_age_days:
+        return False
+    return True
@@ -1,8 +1,16 @@
 from genericpath import getctime
 from undo_manager import UndoManager
+from scanner import ScanStats, scan_files
+from move_executor import MoveExecutor
+from move_plan import MovePlan, PlannedMove
+from tree_walker import iter_tree_moves
+from metadata_index import MetadataIndex
+from media_dates import MediaDateReader, media_timestamp, is_media_file
+from date_buckets import MONTH_BUCKETS
+from log_pipeline import FILE_LOG
+import instrumentation
 import os
 import datetime
-import shutil
 import logging
 
 # Configure logging for file sorting operations
@@ -14,6 +22,13 @@ logging.basicConfig(
 
 undo_manager = UndoManager()
 
+# Where a file's date comes from: its modification time, or the capture date
+# in its photo/video metadata with the modification time as fallback
+DATE_SOURCES = ("mtime", "media")
+
+# Files bucketed per batch when planning year/month moves
+BUCKET_BATCH_SIZE = 1024
+
 
 def sort_by_date(files):
     """
@@ -32,65 +47,312 @@ def sort_by_date(files):
     logging.info("Sorting by date is complete.")
 
 
-def sort_by_year_and_month(folder_path):
+@instrumentation.instrumented("sort_by_year_and_month", MoveExecutor.totals,
+                              folder="folder_path")
+def sort_by_year_and_month(folder_path, workers=1, streaming=False,
+                           recursive=False, flatten=False, progress=None,
+                           cancel_flag=None, checkpoint=False, index=None,
+                           date_source="mtime"):
     """
     Sorts files into subfolders by year and month based on their modification time.
 
     Args:
         folder_path (str): Path to the folder containing files to be sorted.
+        workers (int): Number of concurrent moves. Values above 1 enable the
+            thread pool executor, which helps on latency-bound volumes.
+        streaming (bool): Move files while the folder is still being scanned
+            instead of planning every move first, keeping memory bounded.
+        recursive (bool): Also sort every subfolder, walking subtrees in
+            parallel. Year folders created by FileZen are left alone.
+        flatten (bool): With recursive, move files from every level into the
+            year/month folders of folder_path. Files never replace each other
+            in this mode, since different folders may hold equal names.
+        progress (function, optional): Called as progress(done, total) after
+            every move, see MoveExecutor.
+        cancel_flag (Event, optional): Stops the run between files when set.
+        checkpoint (bool): Store the plan in the undo journal so a cancelled
+            or interrupted run can be continued with resume.resume_sort().
+            Ignored when streaming, since no plan exists up front.
+        index (MetadataIndex or bool, optional): Persistent metadata index
+            from year_month_index(). Unchanged folders are then planned
+            without reading them. True uses the default index file.
+        date_source (str): One of DATE_SOURCES. "media" dates photos and
+            videos by the capture date in their EXIF or container header,
+            read on a process pool, and other files by modification time.
 
     Raises:
         FileNotFoundError: If the specified folder does not exist.
+        ValueError: If date_source is unknown.
 
     Returns:
-        None
+        MoveExecutor: The finished run, with its counters and summary().
+    """
+    if date_source not in DATE_SOURCES:
+        raise ValueError(f"Unknown date source: {date_source}")
+    own_index = index is True
+    if own_index:
+        index = year_month_index(date_source=date_source)
+    date_reader = MediaDateReader() if date_source == "media" else None
+
+    moves = iter_moves_by_year_and_month(folder_path, recursive=recursive,
+                                         flatten=flatten, index=index or None,
+                                         date_reader=date_reader)
+    executor = MoveExecutor(workers, undo_manager, "sort_by_year_and_month",
+                            overwrite=not flatten, progress=progress,
+                            cancel_flag=cancel_flag)
+    try:
+        if streaming:
+            executor.execute_stream(moves)
+        else:
+            executor.execute(MovePlan(folder_path, list(moves)), checkpoint=checkpoint)
+    finally:
+        if date_reader is not None:
+            date_reader.close()
+    if own_index:
+        index.close()
+    elif index:
+        index.commit()
+    logging.info(executor.summary())
+    logging.info("Sorting by year and month completed successfully.")
+    return executor
+
+
+def plan_by_year_and_month(folder_path, stats=None):
+    """
+    Computes the year/month move plan for a folder without moving anything.
+
+    Args:
+        folder_path (str): Path to the folder containing files to be sorted.
+        stats (ScanStats, optional): Collector for scan throughput.
+
+    Raises:
+        FileNotFoundError: If the specified folder does not exist.
+
+    Returns:
+        MovePlan: One "year_month" move per file in the folder.
+    """
+    moves = iter_moves_by_year_and_month(folder_path, stats)
+    return MovePlan(folder_path, list(moves))
+
+
+def year_month_index(index_path=None, date_source="mtime"):
+    """
+    Opens the persistent metadata index of the year/month sorter.
+
+    Args:
+        index_path (str, optional): Path of the index database. Defaults to
+            metadata_index.DEFAULT_INDEX_PATH.
+        date_source (str): One of DATE_SOURCES. Each source is indexed
+            separately; with "media", capture dates are read once per file
+            and then served from the index.
+
+    Returns:
+        MetadataIndex: Index storing the year/month folder of every file.
+    """
+    if date_source == "media":
+        return MetadataIndex("year_month_media", _classify_media_year_month, index_path)
+    return MetadataIndex("year_month", _classify_year_month, index_path)
+
+
+def iter_moves_by_year_and_month(folder_path, stats=None, recursive=False, flatten=False,
+                                 index=None, date_reader=None):
+    """
+    Lazily yields the year/month moves for a folder.
+
+    Args:
+        folder_path (str): Path to the folder containing files to be sorted.
+        stats (ScanStats, optional): Collector for scan throughput.
+        recursive (bool): Include files of every subfolder, skipping the
+            year folders themselves.
+        flatten (bool): With recursive, target the year folders of
+            folder_path instead of those of each file's own folder.
+        index (MetadataIndex, optional): Index from year_month_index().
+            Unchanged folders are served from it, and only new or changed
+            files are stated. Call index.commit() once the moves are done.
+        date_reader (MediaDateReader, optional): Dates photos and videos by
+            their capture date. Not used for folders served from an index,
+            which stores the dates of its own date source.
+
+    Raises:
+        FileNotFoundError: If the specified folder does not exist. Raised
+            immediately, not on first iteration.
+
+    Returns:
+        generator: PlannedMove entries with the "year_month" strategy.
     """
     if not os.path.exists(folder_path):
         logging.error(f"Folder does not exist: {folder_path}")
         raise FileNotFoundError(f"Folder does not exist: {folder_path}")
 
-    processed_files = set()  # Tracks files that have been processed
-    created_folders = set()  # Caches folders that have already been created
+    if stats is None:
+        stats = ScanStats()
 
-    for file_name in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, file_name)
+    def plan_entries(entries, target_root):
+        if index is not None:
+            return _indexed_moves(entries, target_root)
+        return _year_month_moves(entries, target_root, date_reader)
 
-        # Skip items that are not files
-        if not os.path.isfile(file_path):
-            logging.warning(f"Skipping non-file: {file_path}")
-            continue
+    def moves():
+        if recursive:
+            yield from iter_tree_moves(folder_path, plan_entries, _is_year_folder,
+                                       flatten, stats=stats,
+                                       scan=index.scan if index else None)
+        elif index is not None:
+            _, records, _, entries, elapsed = index.scan(folder_path)
+            stats.entries += entries
+            stats.files += len(records)
+            stats.elapsed += elapsed
+            yield from _indexed_moves(records, folder_path)
+        else:
+            # Non-file items are skipped by the scanner using cached entry types
+            entries = scan_files(folder_path, stats, warn_skipped=True)
+            yield from _year_month_moves(entries, folder_path, date_reader)
+        logging.info(stats.summary())
 
-        try:
-            # Use modification time instead of creation time for file sorting
-            creation_time = os.stat(file_path).st_mtime
-            creation_date = datetime.datetime.fromtimestamp(creation_time)
+    return moves()
 
-            # Log modification time for debugging purposes
-            logging.info(
-                f"File {file_name} has modification time: {creation_date.strftime('%Y-%m-%d')}")
-
-            # Construct the target folder path based on year and month
-            year_folder = os.path.join(folder_path, str(creation_date.year))
-            month_folder = os.path.join(
-                year_folder, creation_date.strftime('%m-%B'))
-
-            # Create folders if they don't already exist
-            if month_folder not in created_folders:
-                logging.info(f"Creating folder: {month_folder}")
-                os.makedirs(month_folder, exist_ok=True)
-                created_folders.add(month_folder)
-
-            # Move the file to its corresponding folder
-            destination_path = os.path.join(month_folder, file_name)
-            shutil.move(file_path, destination_path)
-
-            # Mark file as processed and log its movement
-            processed_files.add(file_name)
-            logging.info(f"Moved {file_name} to {destination_path}")
-
-        except Exception as e:
-            logging.error(
-                f"Unexpected error while processing file {file_name}: {e}")
+
+def _year_month_moves(entries, target_root, date_reader=None):
+    """
+    Plans the year/month moves of scanned file entries.
+
+    Entries are bucketed in batches through the shared month table, so no
+    datetime is built or formatted per file and each year/month folder path
+    is joined once per target folder.
+
+    Args:
+        entries (iterable): os.DirEntry objects of regular files.
+        target_root (str): Folder receiving the year subfolders.
+        date_reader (MediaDateReader, optional): Reads capture dates of
+            photos and videos; other files keep their modification time.
+
+    Yields:
+        PlannedMove: One "year_month" move per entry that could be read.
+    """
+    if date_reader is not None:
+        dated = date_reader.with_dates(entries)
+    else:
+        dated = ((entry, None) for entry in entries)
+
+    month_folders = {}  # Relative year/month folder -> its path in target_root
+    batch = []
+    for item in dated:
+        batch.append(item)
+        if len(batch) >= BUCKET_BATCH_SIZE:
+            yield from _bucket_batch(batch, target_root, month_folders)
+            batch = []
+    if batch:
+        yield from _bucket_batch(batch, target_root, month_folders)
+
+
+def _bucket_batch(batch, target_root, month_folders):
+    """
+    Plans the moves of one batch of dated entries.
+
+    Args:
+        batch (list): (entry, capture timestamp or None) pairs.
+        target_root (str): Folder receiving the year subfolders.
+        month_folders (dict): Cache of joined month folder paths, updated.
+
+    Yields:
+        PlannedMove: One "year_month" move per entry that could be read.
+    """
+    entries, times = [], []
+    with instrumentation.phase("stat", len(batch)):
+        for entry, media_time in batch:
+            try:
+                # Use modification time instead of creation time for file sorting
+                times.append(media_time if media_time is not None else entry.stat().st_mtime)
+            except OSError as e:
+                logging.error(f"Unexpected error while processing file {entry.name}: {e}")
+                continue
+            entries.append(entry)
+    with instrumentation.phase("classify", len(times)):
+        folders = MONTH_BUCKETS.folders(times)
+
+    log_each = FILE_LOG.isEnabledFor(logging.INFO)
+    for entry, folder, modified in zip(entries, folders, times):
+        if folder is None:
+            logging.error(f"Invalid modification time for file {entry.name}: {modified}")
             continue
+        month_folder = month_folders.get(folder)
+        if month_folder is None:
+            month_folder = month_folders[folder] = os.path.join(target_root, folder)
 
-    logging.info("Sorting by year and month completed successfully.")
+        if log_each:
+            # Log modification time for debugging purposes
+            FILE_LOG.info("File %s has modification time: %s",
+                          entry.name, datetime.date.fromtimestamp(modified))
+
+        yield PlannedMove(
+            entry.path, os.path.join(month_folder, entry.name), "year_month")
+
+
+def _indexed_moves(records, target_root):
+    """
+    Plans the year/month moves of files listed by a metadata index.
+
+    Args:
+        records (iterable): FileRecord entries with their year/month folder
+            as category.
+        target_root (str): Folder receiving the year subfolders.
+
+    Yields:
+        PlannedMove: One "year_month" move per record.
+    """
+    for record in records:
+        yield PlannedMove(
+            record.path, os.path.join(target_root, record.category, record.name),
+            "year_month")
+
+
+def _classify_year_month(path, stat):
+    """
+    Decides the year/month folder of a file for the metadata index.
+
+    Args:
+        path (str): Path of the file.
+        stat (os.stat_result): Metadata of the file.
+
+    Raises:
+        ValueError: If the modification time is not a valid local date.
+
+    Returns:
+        str: Relative folder such as "2025/03-March".
+    """
+    folder = MONTH_BUCKETS.folder(stat.st_mtime)
+    if folder is None:
+        raise ValueError(f"invalid modification time {stat.st_mtime}")
+    return folder
+
+
+def _classify_media_year_month(path, stat):
+    """
+    Decides the year/month folder of a file by its capture date, falling
+    back to its modification time, for the metadata index.
+
+    Args:
+        path (str): Path of the file.
+        stat (os.stat_result): Metadata of the file.
+
+    Returns:
+        str: Relative folder such as "2025/03-March".
+    """
+    captured = media_timestamp(path) if is_media_file(path) else None
+    folder = MONTH_BUCKETS.folder(captured) if captured is not None else None
+    if folder is None:
+        return _classify_year_month(path, stat)
+    return folder
+
+
+def _is_year_folder(name):
+    """
+    Tells whether a folder name looks like a year folder created by the sorter.
+
+    Args:
+        name (str): Folder name.
+
+    Returns:
+        bool: True for four-digit names such as "2025".
+    """
+    return len(name) == 4 and name.isdigit()
@@ -0,0 +1,168 @@
+import time
+import queue
+import logging
+import threading
+
+# Minimum seconds between two progress updates sent to the GUI
+PROGRESS_INTERVAL = 0.05
+
+# Milliseconds between two checks of the update queue on the Tk main loop
+POLL_MS = 50
+
+
+class ProgressRelay:
+    """
+    Carries progress and callbacks from a worker thread to the Tk main loop.
+
+    Tk variables and widgets may only be touched from the main thread, so the
+    worker puts updates on a queue that the main loop drains with app.after.
+    Progress updates are throttled: a run moving thousands of files per second
+    sends at most one value every PROGRESS_INTERVAL seconds, and the final
+    value is always delivered.
+    """
+
+    def __init__(self, app, progress_var=None, min_interval=PROGRESS_INTERVAL,
+                 poll_ms=POLL_MS):
+        """
+        Initializes a relay for an application window.
+
+        Args:
+            app (Tk): The main Tkinter application instance.
+            progress_var (DoubleVar, optional): Variable receiving the progress
+                percentage on the main thread.
+            min_interval (float): Minimum seconds between progress updates.
+            poll_ms (int): Milliseconds between two drains of the queue.
+        """
+        self.app = app
+        self.progress_var = progress_var
+        self.min_interval = min_interval
+        self.poll_ms = poll_ms
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._last_sent = None
+        self._closed = False
+
+    def set(self, value):
+        """
+        Reports a progress percentage. Safe to call from any thread, so the
+        relay can be passed wherever a DoubleVar is expected.
+
+        Args:
+            value (float): Progress percentage between 0 and 100.
+
+        Returns:
+            None
+        """
+        now = time.monotonic()
+        with self._lock:
+            if (value < 100 and self._last_sent is not None
+                    and now - self._last_sent < self.min_interval):
+                return
+            self._last_sent = now
+        self._queue.put((self._set_progress, (value,)))
+
+    def report(self, done, total):
+        """
+        Reports progress as a number of finished items.
+
+        Args:
+            done (int): Items finished so far.
+            total (int): Total number of items, or None if unknown.
+
+        Returns:
+            None
+        """
+        if total:
+            self.set(min(100.0, 100.0 * done / total))
+
+    def post(self, func, *args):
+        """
+        Schedules a function to run on the main thread.
+
+        Args:
+            func (function): Function to call.
+            *args: Positional arguments for func.
+
+        Returns:
+            None
+        """
+        self._queue.put((func, args))
+
+    def start(self):
+        """
+        Starts draining the queue on the main loop.
+
+        Returns:
+            None
+        """
+        self.app.after(self.poll_ms, self.drain)
+
+    def close(self):
+        """
+        Stops polling once the queue has been drained.
+
+        Returns:
+            None
+        """
+        self._closed = True
+
+    def drain(self):
+        """
+        Runs every queued update. Called on the main thread by app.after and
+        reschedules itself until the relay is closed.
+
+        Returns:
+            None
+        """
+        # Read before draining, so updates queued just before close() are kept
+        closed = self._closed
+        while True:
+            try:
+                func, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                logging.error(f"Error updating the interface: {e}")
+        if not closed:
+            self.app.after(self.poll_ms, self.drain)
+
+    def _set_progress(self, value):
+        if self.progress_var is not None:
+            self.progress_var.set(value)
+
+
+def run_in_background(app, task, progress_var=None, on_done=None):
+    """
+    Runs a long task on a daemon thread without blocking the Tk main loop.
+
+    Args:
+        app (Tk): The main Tkinter application instance.
+        task (function): Called on the worker as task(relay, cancel_flag).
+            It reports progress through relay.set or relay.report and should
+            stop between items once cancel_flag is set.
+        progress_var (DoubleVar, optional): Variable showing the progress.
+        on_done (function, optional): Called on the main thread as
+            on_done(result, error) when the task returns or raises.
+
+    Returns:
+        Event: The cancel flag of the task; set it to request cancellation.
+    """
+    cancel_flag = threading.Event()
+    relay = ProgressRelay(app, progress_var)
+
+    def worker():
+        result, error = None, None
+        try:
+            result = task(relay, cancel_flag)
+        except Exception as e:
+            logging.error(f"Background task failed: {e}")
+            error = e
+        if on_done is not None:
+            relay.post(on_done, result, error)
+        relay.close()
+
+    relay.start()
+    threading.Thread(target=worker, name="FileZen-task", daemon=True).start()
+    return cancel_flag
@@ -0,0 +1,12 @@
+import os
+import atexit
+import shutil
+import tempfile
+
+# Keep the undo journal, metadata index and sniffing cache of the test runs
+# out of the user's state folder
+_state_dir = tempfile.mkdtemp(prefix="filezen-tests-")
+atexit.register(shutil.rmtree, _state_dir, True)
+os.environ.setdefault("FILEZEN_UNDO_JOURNAL", os.path.join(_state_dir, "undo_journal.sqlite3"))
+os.environ.setdefault("FILEZEN_METADATA_INDEX", os.path.join(_state_dir, "metadata_index.sqlite3"))
+os.environ.setdefault("FILEZEN_SNIFF_CACHE", os.path.join(_state_dir, "sniff_cache.sqlite3"))
@@ -0,0 +1,135 @@
+import unittest
+from batch import sort_batch, _folder_size, _ParentLogHandler, WORKER_JOURNAL_SECONDS
+from undo_manager import UndoManager
+import os
+import json
+import shutil
+import time
+import logging
+import instrumentation
+import log_pipeline
+
+# Created by the first worker to report progress, and when it dies
+SLOW_FLAG = os.path.join("test_batch_folder", "slow")
+CRASH_FLAG = os.path.join("test_batch_folder", "crashed")
+
+
+def _die_once(done, total):
+    """
+    Progress callback that kills the first worker process calling it, after
+    its second move, once the first one had time to reach its journal.
+    """
+    if done == 1 and not os.path.exists(SLOW_FLAG):
+        open(SLOW_FLAG, "w").close()
+        time.sleep(WORKER_JOURNAL_SECONDS)
+    elif done == 2 and not os.path.exists(CRASH_FLAG):
+        open(CRASH_FLAG, "w").close()
+        os._exit(1)
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        """Set up three inbox folders of different sizes and a journal."""
+        self.test_folder = "test_batch_folder"
+        self.journal_path = os.path.join(self.test_folder, "journal.sqlite3")
+        self.report_path = os.path.join(self.test_folder, "report.jsonl")
+        self.inboxes = [os.path.join(self.test_folder, f"inbox{i}") for i in range(3)]
+        for count, inbox in zip((2, 6, 4), self.inboxes):
+            os.makedirs(inbox)
+            for i in range(count):
+                for extension in (".txt", ".jpg"):
+                    with open(os.path.join(inbox, f"file{i}{extension}"), "w") as f:
+                        f.write("data")
+
+    def tearDown(self):
+        """Clean up after tests."""
+        instrumentation.configure(None, None)
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def test_sorts_every_folder_and_merges_undo(self):
+        """Test a batch across processes and a single undo of all of it."""
+        missing = os.path.join(self.test_folder, "missing")
+        undo_manager = UndoManager(self.journal_path)
+        report = sort_batch(self.inboxes + [missing], processes=2,
+                            undo_manager=undo_manager)
+
+        self.assertEqual(report.moved, 24)
+        self.assertEqual(report.merged_moves, 24)
+        # The missing folder fails alone
+        self.assertEqual([result.folder_path for result in report.failed_folders], [missing])
+        for inbox in self.inboxes:
+            self.assertTrue(os.path.isfile(os.path.join(inbox, "Documents", "file0.txt")))
+            self.assertTrue(os.path.isfile(os.path.join(inbox, "Images", "file0.jpg")))
+
+        undo_report = undo_manager.undo("organize_files")
+        undo_manager.close()
+        self.assertEqual(undo_report.restored, 24)
+        self.assertEqual(sorted(os.listdir(self.inboxes[0])),
+                         ["file0.jpg", "file0.txt", "file1.jpg", "file1.txt"])
+
+    def test_merges_run_reports(self):
+        """Test that worker run reports and the batch totals are written."""
+        instrumentation.configure(self.report_path)
+        undo_manager = UndoManager(self.journal_path)
+        sort_batch(self.inboxes, strategy="date", processes=2, undo_manager=undo_manager)
+        undo_manager.close()
+
+        with open(self.report_path, encoding="utf-8") as f:
+            reports = [json.loads(line) for line in f]
+        self.assertEqual(sorted(r["folder"] for r in reports[:-1]), sorted(self.inboxes))
+        self.assertEqual(reports[-1]["run"], "batch")
+        self.assertEqual(reports[-1]["moved"], 24)
+
+    def test_crashed_worker_keeps_its_moves_undoable(self):
+        """Test that a dead worker's moves are merged and its folder is retried."""
+        undo_manager = UndoManager(self.journal_path)
+        report = sort_batch(self.inboxes, processes=1, undo_manager=undo_manager,
+                            progress=_die_once)
+
+        self.assertEqual(report.failed_folders, [])
+        self.assertEqual(sorted(result.folder_path for result in report.results),
+                         sorted(self.inboxes))
+        # The moves committed before the crash are merged with the retried rest
+        self.assertEqual(report.moved, 22)
+        self.assertEqual(report.merged_moves, 24)
+
+        undo_report = undo_manager.undo("organize_files")
+        undo_manager.close()
+        self.assertEqual(undo_report.restored, 24)
+
+    def test_summary_mode_reaches_workers(self):
+        """Test that workers log per-folder summaries instead of per-file lines."""
+        undo_manager = UndoManager(self.journal_path)
+        with self.assertLogs(level="INFO") as logs:
+            with log_pipeline.async_logging(summary=True):
+                sort_batch(self.inboxes[:1], processes=1, undo_manager=undo_manager)
+        undo_manager.close()
+
+        self.assertFalse(any("Moved file0.txt" in line for line in logs.output))
+        self.assertTrue(any("Moved 2 files from" in line for line in logs.output))
+
+    def test_worker_records_respect_logger_level(self):
+        """Test that records below the level of their logger are dropped."""
+        logger = logging.getLogger("filezen.test_batch")
+        with self.assertLogs(logger, level="INFO") as logs:
+            logger.setLevel(logging.WARNING)
+            for level in (logging.INFO, logging.ERROR):
+                _ParentLogHandler().emit(logger.makeRecord(
+                    logger.name, level, __file__, 0, "message", None, None))
+        self.assertEqual([record.levelno for record in logs.records], [logging.ERROR])
+
+    def test_largest_folder_first(self):
+        """Test the size estimate used for scheduling."""
+        self.assertEqual(sorted(self.inboxes, key=_folder_size, reverse=True),
+                         [self.inboxes[1], self.inboxes[2], self.inboxes[0]])
+
+    def test_unknown_strategy(self):
+        """Test that an unknown strategy is rejected before any work starts."""
+        with self.assertRaises(ValueError):
+            sort_batch(self.inboxes, strategy="size")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from category_index import CategoryIndex
+from organize_files import _get_file_category
+
+
+class TestCategoryIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a compiled index with single and multi-part suffixes."""
+        self.extensions = {
+            "Documents": [".pdf", ".txt", ".xls", ".xlsx"],
+            "Images": [".jpg", ".jpeg"],
+            "Compressed": [".gz"],
+            "Archives": [".zip", ".tar.gz"],
+        }
+        self.index = CategoryIndex(self.extensions)
+
+    def test_lookup_single_suffix(self):
+        """Test that plain extensions resolve to their category."""
+        self.assertEqual(self.index.lookup("report.pdf"), "Documents")
+        self.assertEqual(self.index.lookup("sheet.xlsx"), "Documents")
+        self.assertEqual(self.index.lookup("photo.jpeg"), "Images")
+
+    def test_lookup_is_case_insensitive(self):
+        """Test that upper-case names match lower-case rules."""
+        self.assertEqual(self.index.lookup("PHOTO.JPG"), "Images")
+        self.assertEqual(self.index.lookup("Backup.TAR.GZ"), "Archives")
+
+    def test_lookup_prefers_longest_suffix(self):
+        """Test that multi-part suffixes win over their last part."""
+        self.assertEqual(self.index.lookup("backup.tar.gz"), "Archives")
+        self.assertEqual(self.index.lookup("log.gz"), "Compressed")
+        self.assertEqual(self.index.lookup("data.2024.gz"), "Compressed")
+
+    def test_lookup_default(self):
+        """Test that unknown or missing extensions fall back to Others."""
+        self.assertEqual(self.index.lookup("example.unknown"), "Others")
+        self.assertEqual(self.index.lookup("Makefile"), "Others")
+        self.assertEqual(self.index.lookup("xpdf"), "Others")
+
+    def test_get_file_category_accepts_index(self):
+        """Test that _get_file_category works with a compiled index."""
+        self.assertEqual(_get_file_category("a.zip", self.index), "Archives")
+
+
+if __name__ == "__main__":
+    unittest.main()
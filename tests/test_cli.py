@@ -0,0 +1,130 @@
+import unittest
+from cli import main
+import os
+import sys
+import time
+import shutil
+import subprocess
+
+# Upper bound for a cold `python -m filezen` dry run, in seconds. Importing
+# Tk and PIL alone costs more than this on a typical machine.
+COLD_START_BUDGET = 0.5
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        """Set up two folders for a batch run."""
+        self.test_folders = ["test_cli_folder1", "test_cli_folder2"]
+        self.journal_path = "test_cli_journal.sqlite3"
+        for folder in self.test_folders:
+            os.makedirs(folder, exist_ok=True)
+            for file_name in ["file1.pdf", "file2.jpg"]:
+                open(os.path.join(folder, file_name), "w").close()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        for folder in self.test_folders:
+            if os.path.exists(folder):
+                shutil.rmtree(folder)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def _run_module(self, *args):
+        env = dict(os.environ, FILEZEN_UNDO_JOURNAL=self.journal_path)
+        return subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "filezen", *args],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+
+    def test_batch_run_sorts_every_folder(self):
+        """Test that several folders are sorted in one invocation."""
+        exit_code = main(["--strategy", "type"] + self.test_folders)
+        self.assertEqual(exit_code, 0)
+        for folder in self.test_folders:
+            self.assertEqual(sorted(os.listdir(folder)), ["Documents", "Images"])
+
+    def test_undo_reverts_every_folder_of_a_run(self):
+        """Test that one undo restores all the folders of one invocation."""
+        self.assertEqual(main(["--strategy", "type"] + self.test_folders), 0)
+        self.assertEqual(main(["--undo", "--strategy", "type"]), 0)
+        for folder in self.test_folders:
+            self.assertEqual(sorted(os.listdir(folder)), ["file1.pdf", "file2.jpg"])
+
+    def test_failing_folder_does_not_stop_batch(self):
+        """Test that a missing folder is reported and the rest still runs."""
+        exit_code = main(["non_existent_folder", self.test_folders[0]])
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(sorted(os.listdir(self.test_folders[0])),
+                         ["Documents", "Images"])
+
+    def test_runs_from_another_directory(self):
+        """Test that the entry point finds the engines outside the repository root."""
+        env = dict(os.environ, FILEZEN_UNDO_JOURNAL=os.path.abspath(self.journal_path))
+        result = subprocess.run(
+            [sys.executable, os.path.join(REPO_ROOT, "filezen"), "--dry-run", "."],
+            cwd=self.test_folders[0], env=env, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(sorted(os.listdir(self.test_folders[0])), ["file1.pdf", "file2.jpg"])
+
+    def test_invalid_rules_variable(self):
+        """Test that a bad FILEZEN_RULES is a usage error, and only for --strategy type."""
+        env = dict(os.environ, FILEZEN_UNDO_JOURNAL=os.path.abspath(self.journal_path),
+                   FILEZEN_RULES="missing_rules.json")
+        results = {strategy: subprocess.run(
+            [sys.executable, "-m", "filezen", "--dry-run", "--strategy", strategy,
+             os.path.abspath(self.test_folders[0])],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+            for strategy in ("type", "date")}
+        self.assertEqual(results["type"].returncode, 2)
+        self.assertIn("FILEZEN_RULES: ", results["type"].stderr)
+        self.assertEqual(results["date"].returncode, 0, results["date"].stderr)
+
+    def test_jobs_sort_folders_in_processes(self):
+        """Test that --jobs sorts every folder and one undo reverts them all."""
+        folders = [os.path.abspath(folder) for folder in self.test_folders]
+        result = self._run_module("--jobs", "2", *folders)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        for folder in self.test_folders:
+            self.assertEqual(sorted(os.listdir(folder)), ["Documents", "Images"])
+
+        result = self._run_module("--undo")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        for folder in self.test_folders:
+            self.assertEqual(sorted(os.listdir(folder)), ["file1.pdf", "file2.jpg"])
+
+    def test_dry_run_touches_nothing(self):
+        """Test that a dry run lists moves without moving files."""
+        result = self._run_module("--dry-run", os.path.abspath(self.test_folders[0]))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(len(result.stdout.splitlines()), 2)
+        self.assertEqual(sorted(os.listdir(self.test_folders[0])),
+                         ["file1.pdf", "file2.jpg"])
+
+    def test_cold_start_skips_gui_imports(self):
+        """Test that the CLI never imports tkinter or PIL."""
+        result = self._run_module("--dry-run", os.path.abspath(self.test_folders[0]))
+        imported = {line.rsplit("|", 1)[-1].strip().split(".")[0]
+                    for line in result.stderr.splitlines()
+                    if line.startswith("import time:")}
+        self.assertNotIn("tkinter", imported)
+        self.assertNotIn("_tkinter", imported)
+        self.assertNotIn("PIL", imported)
+
+    def test_cold_start_within_budget(self):
+        """Test that a cold dry run finishes within the startup budget."""
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "-m", "filezen", "--dry-run",
+                 os.path.abspath(self.test_folders[0])],
+                cwd=REPO_ROOT, capture_output=True)
+            timings.append(time.perf_counter() - started)
+            self.assertEqual(result.returncode, 0)
+        self.assertLess(min(timings), COLD_START_BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
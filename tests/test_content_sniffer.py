@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch
+from content_sniffer import ContentSniffer, SignatureTable
+import organize_files
+import os
+import shutil
+
+
+class TestContentSniffer(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a folder with mislabeled and extensionless files."""
+        self.test_folder = "test_sniffer_folder"
+        os.makedirs(self.test_folder, exist_ok=True)
+        self.files = {
+            "report": b"%PDF-1.7\n...",
+            "photo.download": b"\x89PNG\r\n\x1a\n....",
+            "backup.bin": b"\x1f\x8b\x08\x00....",
+            "notes": b"just some text",
+        }
+        for file_name, data in self.files.items():
+            with open(os.path.join(self.test_folder, file_name), "wb") as f:
+                f.write(data)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def test_signature_table(self):
+        """Test that headers map to the most specific matching category."""
+        table = SignatureTable()
+        zip_header = b"PK\x03\x04" + b"\x00" * 26
+        self.assertEqual(table.match(b"%PDF-1.4"), "Documents")
+        self.assertEqual(table.match(zip_header + b"word/document.xml"), "Documents")
+        self.assertEqual(table.match(zip_header + b"photos/a.jpg"), "Archives")
+        self.assertEqual(table.match(b"\x00\x00\x00\x18ftypheic"), "Images")
+        self.assertEqual(table.match(b"\x00\x00\x00\x18ftypisom"), "Videos")
+        self.assertEqual(table.match(b"\x00" * 257 + b"ustar\x0000"), "Archives")
+        self.assertIsNone(table.match(b"plain text"))
+        self.assertIsNone(table.match(b""))
+
+    def test_results_are_cached(self):
+        """Test that a file is read once while its inode and mtime are unchanged."""
+        sniffer = ContentSniffer()
+        path = os.path.join(self.test_folder, "report")
+        self.assertEqual(sniffer.sniff(path), "Documents")
+        self.assertEqual(sniffer.sniff(path), "Documents")
+        self.assertEqual(sniffer.reads, 1)
+
+    def test_results_are_cached_between_runs(self):
+        """Test that a new sniffer reuses the results saved by an earlier one."""
+        cache_path = os.path.join(self.test_folder, "cache.sqlite3")
+        path = os.path.join(self.test_folder, "report")
+        first = ContentSniffer(cache_path=cache_path)
+        self.assertEqual(first.sniff(path), "Documents")
+        first.close()
+
+        second = ContentSniffer(cache_path=cache_path)
+        self.assertEqual(second.sniff(path), "Documents")
+        self.assertEqual(second.reads, 0)
+
+        # A rewritten file is read again
+        with open(path, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n, now an image")
+        self.assertEqual(second.sniff(path), "Images")
+        self.assertEqual(second.reads, 1)
+        second.close()
+
+    def test_organize_sniffs_only_unknown_extensions(self):
+        """Test that unknown files are classified by content when sniffing."""
+        with patch.object(organize_files, "undo_manager", None):
+            organize_files.organize_files(self.test_folder, sniffer=ContentSniffer())
+
+        self.assertEqual(os.listdir(os.path.join(self.test_folder, "Documents")), ["report"])
+        self.assertEqual(os.listdir(os.path.join(self.test_folder, "Images")),
+                         ["photo.download"])
+        self.assertEqual(os.listdir(os.path.join(self.test_folder, "Archives")),
+                         ["backup.bin"])
+        self.assertEqual(os.listdir(os.path.join(self.test_folder, "Others")), ["notes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
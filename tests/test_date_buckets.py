@@ -0,0 +1,60 @@
+import unittest
+from date_buckets import MonthBuckets, MONTH_BUCKETS
+import os
+import time
+import random
+import datetime
+
+
+def reference_folder(timestamp):
+    date = datetime.datetime.fromtimestamp(timestamp)
+    return os.path.join(str(date.year), date.strftime('%m-%B'))
+
+
+class TestDateBuckets(unittest.TestCase):
+
+    def test_matches_datetime_formatting(self):
+        """Test that bucketed folders equal the per-file datetime names."""
+        rng = random.Random(7)
+        timestamps = [rng.uniform(0, 4102444800) for _ in range(5000)]
+        timestamps += [1700000000, 1700000000.5, 0, 951782400, 951868800]
+
+        self.assertEqual(MONTH_BUCKETS.folders(timestamps),
+                         [reference_folder(t) for t in timestamps])
+
+    def test_month_boundaries(self):
+        """Test the last second of a month and the first of the next."""
+        for year, month in [(2000, 2), (2024, 3), (2024, 10), (2025, 12)]:
+            start = time.mktime((year, month, 1, 0, 0, 0, 0, 0, -1))
+            for timestamp in (start - 1, start, start + 0.5):
+                self.assertEqual(MONTH_BUCKETS.folder(timestamp), reference_folder(timestamp))
+
+    def test_outside_table_uses_fallback(self):
+        """Test dates outside the precomputed years and invalid timestamps."""
+        buckets = MonthBuckets(2000, 2001)
+        early, late = 500000000, 1700000000  # 1985 and 2023
+        self.assertEqual(buckets.folders([early, late]),
+                         [reference_folder(early), reference_folder(late)])
+        self.assertIsNone(buckets.folder(1e20))
+
+    def test_follows_time_zone(self):
+        """Test that a table built under another time zone uses its local months."""
+        previous = os.environ.get("TZ")
+        try:
+            os.environ["TZ"] = "America/Sao_Paulo"
+            time.tzset()
+            buckets = MonthBuckets(2015, 2020)
+            rng = random.Random(3)
+            timestamps = [rng.uniform(1420070400, 1609459200) for _ in range(2000)]
+            self.assertEqual(buckets.folders(timestamps),
+                             [reference_folder(t) for t in timestamps])
+        finally:
+            if previous is None:
+                os.environ.pop("TZ", None)
+            else:
+                os.environ["TZ"] = previous
+            time.tzset()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+from unittest.mock import patch
+from dedup import find_duplicates, PARTIAL_HASH_SIZE
+from undo_manager import UndoManager
+import organize_files
+import os
+import shutil
+
+
+class TestDedup(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a folder with duplicate and near-duplicate files."""
+        self.test_folder = "test_dedup_folder"
+        self.journal_path = "test_dedup_journal.sqlite3"
+        os.makedirs(self.test_folder, exist_ok=True)
+
+        large = os.urandom(PARTIAL_HASH_SIZE * 2)
+        self.contents = {
+            "a.pdf": b"report",
+            "b.pdf": b"report",  # Duplicate of a.pdf
+            "c.pdf": b"Report",  # Same size, different content
+            "big1.zip": large,
+            "big2.zip": large,  # Duplicate of big1.zip
+            "big3.zip": large[:-1] + bytes([large[-1] ^ 1]),  # Differs at the end
+            "empty1.txt": b"",
+            "empty2.txt": b"",
+        }
+        for file_name, data in self.contents.items():
+            with open(self._path(file_name), "wb") as f:
+                f.write(data)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def _path(self, *parts):
+        return os.path.join(self.test_folder, *parts)
+
+    def test_find_duplicates(self):
+        """Test that only files with identical, non-empty content are grouped."""
+        paths = [self._path(name) for name in self.contents]
+        self.assertEqual(find_duplicates(paths, workers=1), [
+            [self._path("a.pdf"), self._path("b.pdf")],
+            [self._path("big1.zip"), self._path("big2.zip")],
+        ])
+
+    def test_process_pool_gives_same_groups(self):
+        """Test that hashing on a process pool finds the same groups."""
+        paths = [self._path(name) for name in self.contents]
+        with patch("dedup.POOL_THRESHOLD", 0):
+            self.assertEqual(find_duplicates(paths, workers=2),
+                             find_duplicates(paths, workers=1))
+
+    def test_organize_routes_duplicates_and_undo_restores(self):
+        """Test that duplicates go to the Duplicates folder and undo restores them."""
+        manager = UndoManager(self.journal_path)
+        with patch.object(organize_files, "undo_manager", manager):
+            organize_files.organize_files(self.test_folder, dedup="move")
+
+        self.assertEqual(sorted(os.listdir(self._path("Duplicates"))),
+                         ["b.pdf", "big2.zip"])
+        self.assertEqual(sorted(os.listdir(self._path("Documents"))),
+                         ["a.pdf", "c.pdf", "empty1.txt", "empty2.txt"])
+
+        manager.undo("organize_files")
+        manager.close()
+        self.assertEqual(sorted(os.listdir(self.test_folder)), sorted(self.contents))
+
+    def test_link_mode_shares_content(self):
+        """Test that link mode turns duplicates into hard links and still sorts them."""
+        manager = UndoManager(self.journal_path)
+        with patch.object(organize_files, "undo_manager", manager):
+            organize_files.organize_files(self.test_folder, dedup="link")
+        manager.close()
+
+        self.assertFalse(os.path.exists(self._path("Duplicates")))
+        self.assertTrue(os.path.samefile(self._path("Archives", "big1.zip"),
+                                         self._path("Archives", "big2.zip")))
+        self.assertFalse(os.path.samefile(self._path("Archives", "big1.zip"),
+                                          self._path("Archives", "big3.zip")))
+
+    def test_undo_of_link_mode_restores_separate_copies(self):
+        """Test that undo gives linked duplicates their own content again."""
+        manager = UndoManager(self.journal_path)
+        with patch.object(organize_files, "undo_manager", manager):
+            organize_files.organize_files(self.test_folder, dedup="link")
+        report = manager.undo("organize_files")
+        manager.close()
+
+        self.assertEqual(report.separated, 2)
+        self.assertEqual(sorted(os.listdir(self.test_folder)), sorted(self.contents))
+        self.assertFalse(os.path.samefile(self._path("a.pdf"), self._path("b.pdf")))
+        with open(self._path("b.pdf"), "wb") as f:
+            f.write(b"edited")
+        with open(self._path("a.pdf"), "rb") as f:
+            self.assertEqual(f.read(), b"report")
+
+    def test_dedup_rejects_streaming(self):
+        """Test that duplicate detection cannot run on a streaming run."""
+        with self.assertRaises(ValueError):
+            organize_files.organize_files(self.test_folder, streaming=True, dedup="move")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from organize_files import organize_files
+from sort_by_date import sort_by_year_and_month
+from undo_manager import UndoManager
+import instrumentation
+import os
+import json
+import pstats
+import shutil
+import threading
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a folder with mock files and a report path."""
+        self.test_folder = "test_instrumentation_folder"
+        self.report_path = "test_instrumentation_report.jsonl"
+        self.profile_path = "test_instrumentation.prof"
+        os.makedirs(self.test_folder, exist_ok=True)
+        for file_name in ["a.txt", "b.jpg", "c.mp4", "d.zip", "e.unknown"]:
+            with open(os.path.join(self.test_folder, file_name), "w") as f:
+                f.write("data")
+
+    def tearDown(self):
+        """Clean up after tests."""
+        instrumentation.configure(None, None)
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+        for path in (self.report_path, self.profile_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _reports(self):
+        with open(self.report_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_disabled_by_default(self):
+        """Test that nothing is recorded or written when switched off."""
+        self.assertIs(instrumentation.timed("move", os.rename), os.rename)
+        organize_files(self.test_folder)
+        self.assertFalse(os.path.exists(self.report_path))
+
+    def test_report_per_run(self):
+        """Test the phases and totals of a sort and of its undo."""
+        instrumentation.configure(self.report_path)
+        organize_files(self.test_folder, workers=2)
+        UndoManager().undo("organize_files")
+
+        sort_report, undo_report = self._reports()
+        self.assertEqual(sort_report["run"], "organize_files")
+        self.assertEqual(sort_report["folder"], self.test_folder)
+        self.assertEqual(sort_report["totals"]["moved"], 5)
+        for phase in ("list", "classify", "mkdir", "move"):
+            self.assertIn(phase, sort_report["phases"])
+        move = sort_report["phases"]["move"]
+        self.assertEqual(move["samples"], 5)
+        self.assertEqual(sum(move["histogram_us"].values()), 5)
+
+        self.assertEqual(undo_report["run"], "undo")
+        self.assertEqual(undo_report["totals"]["restored"], 5)
+        self.assertEqual(undo_report["phases"]["restore"]["items"], 5)
+
+    def test_date_sort_phases(self):
+        """Test that the date sort records its stat and classify batches."""
+        instrumentation.configure(self.report_path)
+        sort_by_year_and_month(self.test_folder)
+
+        phases = self._reports()[0]["phases"]
+        self.assertEqual(phases["stat"]["items"], 5)
+        self.assertEqual(phases["classify"]["items"], 5)
+
+    def test_concurrent_runs_are_reported_apart(self):
+        """Test that runs on two threads at once do not mix their samples."""
+        instrumentation.configure(self.report_path)
+        both_started = threading.Barrier(2)
+
+        def run(name, samples):
+            with instrumentation.instrumented_run(name):
+                both_started.wait(5)
+                for _ in range(samples):
+                    instrumentation.add("move", 0.001)
+                both_started.wait(5)
+
+        threads = [threading.Thread(target=run, args=("first", 2)),
+                   threading.Thread(target=run, args=("second", 3))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        samples = {report["run"]: report["phases"]["move"]["samples"]
+                   for report in self._reports()}
+        self.assertEqual(samples, {"first": 2, "second": 3})
+
+    def test_profile(self):
+        """Test that the profile hook writes statistics readable by pstats."""
+        instrumentation.configure(profile_path=self.profile_path)
+        organize_files(self.test_folder)
+        stats = pstats.Stats(self.profile_path)
+        self.assertTrue(any(name == "iter_moves_by_type" for _, _, name in stats.stats))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from log_pipeline import async_logging, start_async_logging, stop_async_logging
+from move_executor import MoveExecutor
+from move_plan import MovePlan, PlannedMove
+import io
+import os
+import shutil
+import logging
+import threading
+
+
+class FormattedIn:
+    """Message argument that remembers which thread formatted it."""
+
+    def __init__(self):
+        self.thread = None
+
+    def __str__(self):
+        self.thread = threading.current_thread()
+        return "value"
+
+
+class TestLogPipeline(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a root logger writing to memory and a folder of files."""
+        self.root = logging.getLogger()
+        self.saved = self.root.handlers[:], self.root.level
+        self.stream = io.StringIO()
+        handler = logging.StreamHandler(self.stream)
+        handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+        self.root.handlers = [handler]
+        self.root.setLevel(logging.INFO)
+
+        self.test_folder = "test_log_folder"
+        os.makedirs(os.path.join(self.test_folder, "sorted"), exist_ok=True)
+        for i in range(5):
+            with open(os.path.join(self.test_folder, f"file{i}.txt"), "w") as f:
+                f.write("data")
+
+    def tearDown(self):
+        """Clean up after tests."""
+        stop_async_logging()
+        self.root.handlers, level = self.saved
+        self.root.setLevel(level)
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def _move_all(self):
+        plan = MovePlan(self.test_folder, [
+            PlannedMove(os.path.join(self.test_folder, f"file{i}.txt"),
+                        os.path.join(self.test_folder, "sorted", f"file{i}.txt"),
+                        "category")
+            for i in range(5)])
+        MoveExecutor(workers=2).execute(plan)
+
+    def test_records_are_written_by_the_listener(self):
+        """Test that records are formatted off the calling thread and none are lost."""
+        argument = FormattedIn()
+        with async_logging():
+            logging.info("Formatted %s", argument)
+            for i in range(1000):
+                logging.info("Line %d", i)
+
+        lines = self.stream.getvalue().splitlines()
+        self.assertEqual(lines[0], "INFO - Formatted value")
+        self.assertEqual(len(lines), 1001)
+        self.assertEqual(lines[-1], "INFO - Line 999")
+        self.assertIsNot(argument.thread, threading.current_thread())
+
+    def test_handlers_are_restored(self):
+        """Test that stopping puts the original handlers back."""
+        handlers = self.root.handlers[:]
+        start_async_logging()
+        self.assertNotEqual(self.root.handlers, handlers)
+        stop_async_logging()
+        self.assertEqual(self.root.handlers, handlers)
+
+    def test_per_file_lines(self):
+        """Test that every move is logged without summary mode."""
+        with async_logging():
+            self._move_all()
+        self.assertEqual(self.stream.getvalue().count("INFO - Moved file"), 5)
+
+    def test_summary_mode(self):
+        """Test that summary mode logs one line per pair of folders."""
+        with async_logging(summary=True):
+            self._move_all()
+
+        output = self.stream.getvalue()
+        self.assertNotIn("Moved file", output)
+        self.assertIn(f"Moved 5 files from {self.test_folder} to "
+                      f"{os.path.join(self.test_folder, 'sorted')}", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
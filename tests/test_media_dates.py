@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import patch
+from benchmarks.bench_media_dates import exif_jpeg
+from media_dates import MediaDateReader, media_timestamp
+import sort_by_date
+import os
+import struct
+import shutil
+import datetime
+
+
+def box(kind, payload):
+    return struct.pack(">I", len(payload) + 8) + kind + payload
+
+
+class TestMediaDates(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a folder with a photo, a video and a plain file."""
+        self.test_folder = "test_media_folder"
+        os.makedirs(self.test_folder, exist_ok=True)
+
+        self._write("photo.jpg", exif_jpeg("2019:07:04 12:00:00"))
+        # Movie header after the media data, as many cameras write it
+        created = int(datetime.datetime(2021, 3, 5, tzinfo=datetime.timezone.utc)
+                      .timestamp()) + 2082844800
+        mvhd = box(b"mvhd", b"\x00\x00\x00\x00" + struct.pack(">II", created, created))
+        self._write("clip.mp4", box(b"ftyp", b"isom\x00\x00\x02\x00")
+                    + box(b"mdat", b"\x00" * 4096) + box(b"moov", mvhd))
+        self._write("scan.jpg", b"\xff\xd8\xff\xdb\x00\x04\x00\x00\xff\xd9")
+        self._write("notes.txt", b"text")
+
+        # Every file was copied much later than it was captured
+        for file_name in os.listdir(self.test_folder):
+            os.utime(os.path.join(self.test_folder, file_name), (1700000000, 1700000000))
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def _write(self, file_name, data):
+        with open(os.path.join(self.test_folder, file_name), "wb") as f:
+            f.write(data)
+
+    def _path(self, file_name):
+        return os.path.join(self.test_folder, file_name)
+
+    def test_exif_date_original(self):
+        """Test that DateTimeOriginal is read from the EXIF block."""
+        self.assertEqual(media_timestamp(self._path("photo.jpg")),
+                         datetime.datetime(2019, 7, 4, 12).timestamp())
+
+    def test_container_creation_time(self):
+        """Test that the movie header is found after the media data."""
+        created = datetime.datetime.fromtimestamp(media_timestamp(self._path("clip.mp4")),
+                                                  datetime.timezone.utc)
+        self.assertEqual(created.date(), datetime.date(2021, 3, 5))
+
+    def test_missing_metadata(self):
+        """Test that files without a capture date report None."""
+        self.assertIsNone(media_timestamp(self._path("scan.jpg")))
+        self.assertIsNone(media_timestamp(self._path("notes.txt")))
+
+    def test_process_pool_gives_same_dates(self):
+        """Test that reading on a process pool returns the same dates."""
+        paths = [self._path(name) for name in ("photo.jpg", "clip.mp4", "scan.jpg")]
+        with patch("media_dates.POOL_THRESHOLD", 0), MediaDateReader(2) as reader:
+            self.assertEqual(reader.timestamps(paths),
+                             [media_timestamp(path) for path in paths])
+
+    def test_sort_by_capture_date(self):
+        """Test that media files are sorted by capture date, others by mtime."""
+        with patch.object(sort_by_date, "undo_manager", None):
+            sort_by_date.sort_by_year_and_month(self.test_folder, date_source="media")
+
+        self.assertEqual(os.listdir(os.path.join(self.test_folder, "2019", "07-July")),
+                         ["photo.jpg"])
+        self.assertEqual(os.listdir(os.path.join(self.test_folder, "2021", "03-March")),
+                         ["clip.mp4"])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.test_folder, "2023", "11-November"))),
+                         ["notes.txt", "scan.jpg"])
+
+
+if __name__ == "__main__":
+    unittest.main()
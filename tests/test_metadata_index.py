@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch
+from metadata_index import MetadataIndex
+import sort_by_date
+import os
+import time
+import shutil
+
+
+class TestMetadataIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a folder with old files and a fresh index."""
+        self.test_folder = "test_index_folder"
+        self.index_path = "test_index.sqlite3"
+        self.mock_files = ["file1.pdf", "file2.jpg", "file3.mp4"]
+        self.classified = []
+
+        os.makedirs(os.path.join(self.test_folder, "sub"), exist_ok=True)
+        for file_name in self.mock_files:
+            self._create(file_name)
+        self._age_folder()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+
+    def _create(self, file_name):
+        path = os.path.join(self.test_folder, file_name)
+        open(path, "w").close()
+        os.utime(path, (1700000000, 1700000000))  # 2023-11-14
+
+    def _age_folder(self):
+        """Backdate the folder so its listing is outside the racy window."""
+        past = time.time() - 60
+        os.utime(self.test_folder, (past, past))
+
+    def _classify(self, path, stat):
+        self.classified.append(os.path.basename(path))
+        return "category"
+
+    def test_unchanged_folder_is_served_from_index(self):
+        """Test that a second scan of an unchanged folder reads nothing."""
+        index = MetadataIndex("test", self._classify, self.index_path)
+        _, files, subdirs, _, _ = index.scan(self.test_folder)
+        index.close()
+        self.assertEqual(sorted(self.classified), sorted(self.mock_files))
+
+        index = MetadataIndex("test", self._classify, self.index_path)
+        with patch("os.scandir") as mock_scandir:
+            _, cached_files, cached_subdirs, _, _ = index.scan(self.test_folder)
+        mock_scandir.assert_not_called()
+        self.assertEqual(sorted(cached_files), sorted(files))
+        self.assertEqual(cached_subdirs, subdirs)
+        self.assertEqual((index.hits, index.misses), (1, 0))
+        index.close()
+
+    def test_changed_folder_classifies_only_new_files(self):
+        """Test that only new files are classified after a folder changes."""
+        index = MetadataIndex("test", self._classify, self.index_path)
+        index.scan(self.test_folder)
+        index.close()
+
+        self._create("file4.txt")
+        self._age_folder()
+        self.classified = []
+        index = MetadataIndex("test", self._classify, self.index_path)
+        _, files, _, _, _ = index.scan(self.test_folder)
+        index.close()
+
+        self.assertEqual(self.classified, ["file4.txt"])
+        self.assertEqual(len(files), len(self.mock_files) + 1)
+
+    def test_rerun_sorts_new_arrivals(self):
+        """Test that an indexed year/month rerun picks up new files."""
+        index = sort_by_date.year_month_index(self.index_path)
+        with patch.object(sort_by_date, "undo_manager", None):
+            sort_by_date.sort_by_year_and_month(self.test_folder, index=index)
+            self._create("file4.txt")
+            executor = sort_by_date.sort_by_year_and_month(self.test_folder, index=index)
+        index.close()
+
+        self.assertEqual(executor.moved, 1)
+        month_folder = os.path.join(self.test_folder, "2023", "11-November")
+        self.assertEqual(sorted(os.listdir(month_folder)),
+                         sorted(self.mock_files + ["file4.txt"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
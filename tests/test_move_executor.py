@@ -0,0 +1,184 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from move_executor import MoveExecutor, _stream_copy
+import errno
+import os
+import shutil
+import threading
+
+
+class TestMoveExecutor(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a folder with files to move."""
+        self.test_folder = "test_executor_folder"
+        self.target_folder = os.path.join(self.test_folder, "target")
+        self.mock_files = [f"file{i}.txt" for i in range(20)]
+
+        os.makedirs(self.test_folder, exist_ok=True)
+        for file_name in self.mock_files:
+            open(os.path.join(self.test_folder, file_name), "w").close()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def _jobs(self):
+        for file_name in self.mock_files:
+            yield (os.path.join(self.test_folder, file_name),
+                   os.path.join(self.target_folder, file_name))
+
+    def _move(self, executor):
+        def move(source, destination):
+            executor.ensure_dir(os.path.dirname(destination))
+            return shutil.move(source, destination)
+        return move
+
+    def test_parallel_run_moves_every_file(self):
+        """Test that a thread pool run moves all files."""
+        executor = MoveExecutor(workers=4)
+        executor.run(self._jobs(), self._move(executor))
+
+        self.assertEqual(executor.moved, len(self.mock_files))
+        self.assertEqual(executor.errors, [])
+        self.assertEqual(sorted(os.listdir(self.target_folder)),
+                         sorted(self.mock_files))
+
+    def test_failures_are_reported_per_file(self):
+        """Test that failed moves are reported and not recorded for undo."""
+        undo_manager = MagicMock()
+        executor = MoveExecutor(4, undo_manager, "organize_files")
+        move = self._move(executor)
+
+        def flaky_move(source, destination):
+            if source.endswith("file3.txt"):
+                raise OSError("disk unavailable")
+            return move(source, destination)
+
+        executor.run(self._jobs(), flaky_move)
+
+        self.assertEqual(executor.moved, len(self.mock_files) - 1)
+        self.assertEqual(len(executor.errors), 1)
+        self.assertTrue(executor.errors[0][0].endswith("file3.txt"))
+        undo_manager.start.assert_called_once_with("organize_files")
+        self.assertEqual(undo_manager.record_move.call_count,
+                         len(self.mock_files) - 1)
+
+    def test_progress_reports_each_move(self):
+        """Test that progress is reported after every move with the total."""
+        reports = []
+        executor = MoveExecutor(progress=lambda done, total: reports.append((done, total)))
+        executor.run(list(self._jobs()), self._move(executor))
+
+        self.assertEqual(len(reports), len(self.mock_files))
+        self.assertEqual(reports[-1], (len(self.mock_files), len(self.mock_files)))
+
+    def test_cancel_flag_stops_between_files(self):
+        """Test that setting the cancel flag stops the run cleanly."""
+        cancel_flag = threading.Event()
+        executor = MoveExecutor(cancel_flag=cancel_flag)
+        move = self._move(executor)
+
+        def move_then_cancel(source, destination):
+            if source.endswith("file4.txt"):
+                cancel_flag.set()
+            return move(source, destination)
+
+        executor.run(self._jobs(), move_then_cancel)
+
+        self.assertTrue(executor.cancelled)
+        self.assertEqual(executor.moved, 5)
+        self.assertEqual(len(os.listdir(self.target_folder)), 5)
+        self.assertIn("cancelled", executor.summary())
+
+    def test_ensure_dir_creates_once(self):
+        """Test that directory creation is cached for the run."""
+        executor = MoveExecutor()
+        executor.ensure_dir(self.target_folder)
+        shutil.rmtree(self.target_folder)
+        executor.ensure_dir(self.target_folder)
+        self.assertFalse(os.path.exists(self.target_folder))
+
+    def test_move_renames_on_same_device(self):
+        """Test that a same-device move takes the rename fast path."""
+        executor = MoveExecutor()
+        executor.ensure_dir(self.target_folder)
+        source, destination = next(self._jobs())
+        executor.move(source, destination)
+
+        self.assertTrue(os.path.exists(destination))
+        self.assertEqual((executor.renamed, executor.copied), (1, 0))
+
+    @patch("os.replace", side_effect=OSError(errno.EXDEV, "Cross-device link"))
+    def test_move_copies_across_devices(self, mock_os_replace):
+        """Test that EXDEV falls back to a synced copy and removes the source."""
+        source, destination = next(self._jobs())
+        with open(source, "w") as f:
+            f.write("payload")
+
+        executor = MoveExecutor()
+        executor.ensure_dir(self.target_folder)
+        executor.move(source, destination)
+        # The source is kept until the copy has been synced
+        self.assertTrue(os.path.exists(source))
+        executor.finish()
+
+        self.assertFalse(os.path.exists(source))
+        with open(destination) as f:
+            self.assertEqual(f.read(), "payload")
+        self.assertEqual((executor.renamed, executor.copied), (0, 1))
+        self.assertIn("1 copied across devices", executor.summary())
+
+    @patch("os.replace", side_effect=OSError(errno.EXDEV, "Cross-device link"))
+    def test_copy_counts_only_once_finalized(self, mock_os_replace):
+        """Test that a copy whose source cannot be removed is a failure only."""
+        undo_manager = MagicMock()
+        executor = MoveExecutor(1, undo_manager, "organize_files")
+        executor.ensure_dir(self.target_folder)
+        source, destination = next(self._jobs())
+
+        with patch("move_executor._fsync_path", side_effect=OSError("I/O error")):
+            executor.run([(source, destination)], executor.move)
+
+        self.assertEqual((executor.moved, len(executor.errors)), (0, 1))
+        undo_manager.record_move.assert_not_called()
+        self.assertTrue(os.path.exists(source))
+        self.assertFalse(os.path.exists(destination))
+
+    @patch("os.replace", side_effect=OSError(errno.EXDEV, "Cross-device link"))
+    def test_finalized_copy_is_recorded(self, mock_os_replace):
+        """Test that a finalized copy is counted and recorded for undo."""
+        undo_manager = MagicMock()
+        executor = MoveExecutor(1, undo_manager, "organize_files")
+        executor.ensure_dir(self.target_folder)
+        source, destination = next(self._jobs())
+        executor.run([(source, destination)], executor.move)
+
+        self.assertEqual((executor.moved, executor.copied, executor.errors), (1, 1, []))
+        undo_manager.record_move.assert_called_once_with("organize_files", source, destination)
+
+    def test_failed_copy_leaves_no_partial_file(self):
+        """Test that a copy failing midway removes the partial destination."""
+        source = os.path.join(self.test_folder, "file0.txt")
+        destination = os.path.join(self.test_folder, "copy.txt")
+        with patch("move_executor._copy_contents", side_effect=OSError("No space left")):
+            with self.assertRaises(OSError):
+                _stream_copy(source, destination)
+        self.assertFalse(os.path.exists(destination))
+
+    def test_stream_copy_preserves_content(self):
+        """Test that the streaming copy writes identical bytes."""
+        source = os.path.join(self.test_folder, "big.bin")
+        destination = os.path.join(self.test_folder, "copy.bin")
+        data = os.urandom(3 * 1024 * 1024 + 17)
+        with open(source, "wb") as f:
+            f.write(data)
+
+        _stream_copy(source, destination)
+        with open(destination, "rb") as f:
+            self.assertEqual(f.read(), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from move_plan import MovePlan, PlannedMove
+from move_executor import MoveExecutor
+from organize_files import plan_by_type
+import os
+import shutil
+
+
+class TestMovePlan(unittest.TestCase):
+
+    def setUp(self):
+        """Set up mock folder and files for testing."""
+        self.test_folder = "test_plan_folder"
+        self.mock_files = ["file1.pdf", "file2.jpg", "file3.mp4", "file4.txt"]
+
+        os.makedirs(self.test_folder, exist_ok=True)
+        for file_name in self.mock_files:
+            open(os.path.join(self.test_folder, file_name), "w").close()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def test_plan_by_type_does_not_touch_files(self):
+        """Test that planning computes moves without changing the folder."""
+        plan = plan_by_type(self.test_folder)
+
+        self.assertEqual(len(plan), len(self.mock_files))
+        self.assertEqual(sorted(os.listdir(self.test_folder)),
+                         sorted(self.mock_files))
+        self.assertIn(PlannedMove(
+            os.path.join(self.test_folder, "file1.pdf"),
+            os.path.join(self.test_folder, "Documents", "file1.pdf"),
+            "type"), plan.moves)
+        self.assertEqual(plan.target_dirs(), {
+            os.path.join(self.test_folder, category)
+            for category in ["Documents", "Images", "Videos"]})
+
+    def test_execute_applies_plan(self):
+        """Test that the executor applies a plan computed earlier."""
+        plan = plan_by_type(self.test_folder)
+        executor = MoveExecutor(workers=2).execute(plan)
+
+        self.assertEqual(executor.moved, len(self.mock_files))
+        for move in plan:
+            self.assertTrue(os.path.exists(move.destination))
+            self.assertFalse(os.path.exists(move.source))
+
+    def test_plan_is_reusable(self):
+        """Test that a plan can be built by hand and iterated repeatedly."""
+        plan = MovePlan(self.test_folder)
+        plan.add("a", os.path.join("x", "a"), "type")
+        self.assertEqual(list(plan), list(plan))
+        self.assertEqual(plan.target_dirs(), {"x"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch, MagicMock, mock_open
-from organize_files import organize_files, _get_file_category, _move_file
+from organize_files import (organize_files, sort_by_date, _get_file_category, _move_file,
+                            EXTENSIONS)
 import os
 import shutil
 
@@ -11,12 +12,7 @@ class TestOrganizeFiles(unittest.TestCase):
         """Set up mock folder and files for testing."""
         self.test_folder = "test_folder"
         self.mock_files = ["file1.pdf", "file2.jpg", "file3.mp4", "file4.txt"]
-        self.extensions = {
-            "Documents": [".pdf", ".docx", ".txt", ".xls", ".xlsx"],
-            "Images": [".jpg", ".jpeg", ".png", ".gif"],
-            "Videos": [".mp4", ".avi", ".mkv"],
-            "Archives": [".zip", ".rar"],
-        }
+        self.extensions = EXTENSIONS
 
         # Create mock folder and files
         os.makedirs(self.test_folder, exist_ok=True)
@@ -35,6 +31,41 @@ class TestOrganizeFiles(unittest.TestCase):
         # Check if _move_file was called for each file
         self.assertEqual(mock_move_file.call_count, len(self.mock_files))
 
+    def test_organize_files_creates_each_folder_once(self):
+        """Test that target folders are created in one batch before moving."""
+        for file_name in ["file5.pdf", "file6.jpg"]:
+            open(os.path.join(self.test_folder, file_name), "w").close()
+
+        with patch("os.makedirs", wraps=os.makedirs) as mock_os_makedirs:
+            organize_files(self.test_folder)
+
+        created = [c.args[0] for c in mock_os_makedirs.call_args_list]
+        self.assertEqual(sorted(created), sorted(
+            os.path.join(self.test_folder, category)
+            for category in ["Documents", "Images", "Videos"]))
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.test_folder, "Documents"))),
+            ["file1.pdf", "file4.txt", "file5.pdf"])
+
+    def test_organize_files_streaming(self):
+        """Test that streaming mode moves every file without a plan."""
+        organize_files(self.test_folder, streaming=True)
+        self.assertEqual(
+            sorted(os.listdir(self.test_folder)),
+            ["Documents", "Images", "Videos"])
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.test_folder, "Documents"))),
+            ["file1.pdf", "file4.txt"])
+
+    def test_sort_by_date_streaming(self):
+        """Test that the legacy date sorter streams files into year/month."""
+        sort_by_date(self.test_folder, streaming=True)
+        moved = [os.path.join(root, name)
+                 for root, _, names in os.walk(self.test_folder) for name in names]
+        self.assertEqual(len(moved), len(self.mock_files))
+        for path in moved:
+            self.assertEqual(len(os.path.relpath(path, self.test_folder).split(os.sep)), 3)
+
     def test_get_file_category(self):
         """Test if file categories are determined correctly."""
         self.assertEqual(_get_file_category(
@@ -49,8 +80,8 @@ class TestOrganizeFiles(unittest.TestCase):
             "example.unknown", self.extensions), "Others")
 
     @patch("os.makedirs")
-    @patch("shutil.move")
-    def test_move_file(self, mock_shutil_move, mock_os_makedirs):
+    @patch("os.replace")
+    def test_move_file(self, mock_os_replace, mock_os_makedirs):
         """Test if files are moved to the correct folder."""
         file_path = os.path.join(self.test_folder, "file1.pdf")
         target_folder = os.path.join(self.test_folder, "Documents")
@@ -58,8 +89,18 @@ class TestOrganizeFiles(unittest.TestCase):
 
         # Assert the folder was created
         mock_os_makedirs.assert_called_once_with(target_folder, exist_ok=True)
-        # Assert the file was moved
-        mock_shutil_move.assert_called_once_with(file_path, target_folder)
+        # Assert the file was moved with a plain rename
+        mock_os_replace.assert_called_once_with(
+            file_path, os.path.join(target_folder, "file1.pdf"))
+
+    def test_move_file_refuses_to_overwrite(self):
+        """Test that an existing file in the target folder is not replaced."""
+        target_folder = os.path.join(self.test_folder, "Documents")
+        os.makedirs(target_folder)
+        open(os.path.join(target_folder, "file1.pdf"), "w").close()
+        with self.assertRaises(FileExistsError):
+            _move_file(os.path.join(self.test_folder, "file1.pdf"),
+                       target_folder, "Documents")
 
     def test_organize_files_folder_not_found(self):
         """Test behavior when the folder does not exist."""
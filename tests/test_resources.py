@@ -1,9 +1,13 @@
 import unittest
 from unittest.mock import patch, mock_open
-from resources import load_translations, load_background, load_icon
+from resources import load_translations, load_background, load_icon, decode_background
 from PIL import Image, ImageTk
 import tkinter as tk
 import os
+import sys
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 class TestResources(unittest.TestCase):
@@ -43,6 +47,26 @@ class TestResources(unittest.TestCase):
         # Should return an ImageTk.PhotoImage object
         self.assertIsNotNone(result)
 
+    @patch("resources.os.path.exists")
+    @patch("resources.Image.open")
+    def test_decode_background_resizes_to_canvas(self, mock_image_open, mock_exists):
+        """Test that the background is drafted and scaled to the canvas size."""
+        mock_exists.return_value = True  # Simulate file existence
+        mock_image = mock_image_open.return_value
+        decode_background(self.test_background_path, (740, 600))
+        mock_image.draft.assert_called_once_with("RGB", (740, 600))
+        mock_image.convert.return_value.resize.assert_called_once_with(
+            (740, 600), Image.LANCZOS)
+
+    def test_import_does_not_load_pillow(self):
+        """Test that Pillow is only imported once an image is needed."""
+        code = ("import sys, resources; "
+                "resources.load_translations('resources/translations.json'); "
+                "print('PIL' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT,
+                                capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), "False")
+
     @patch("resources.os.path.exists")
     def test_load_background_file_not_found(self, mock_exists):
         """Test behavior when background image is not found."""
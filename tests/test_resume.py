@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import patch
+from undo_manager import UndoManager
+from resume import resume_sort
+from move_plan import MovePlan, PlannedMove
+import organize_files
+import os
+import shutil
+import sqlite3
+import threading
+
+
+class TestResume(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a folder with files and a fresh journal."""
+        self.test_folder = "test_resume_folder"
+        self.journal_path = "test_resume_journal.sqlite3"
+        self.mock_files = [f"file{i}.pdf" for i in range(10)]
+
+        os.makedirs(self.test_folder, exist_ok=True)
+        for file_name in self.mock_files:
+            open(os.path.join(self.test_folder, file_name), "w").close()
+        self.manager = UndoManager(self.journal_path)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.manager.close()
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def _cancelled_run(self, after):
+        """Organize the folder with a checkpoint, cancelling after some moves."""
+        cancel_flag = threading.Event()
+
+        def progress(done, total):
+            if done == after:
+                cancel_flag.set()
+
+        with patch.object(organize_files, "undo_manager", self.manager):
+            return organize_files.organize_files(
+                self.test_folder, progress=progress, cancel_flag=cancel_flag,
+                checkpoint=True)
+
+    def test_resume_finishes_cancelled_run(self):
+        """Test that resume moves only the files left by a cancelled run."""
+        executor = self._cancelled_run(after=4)
+        self.assertTrue(executor.cancelled)
+        self.assertEqual(executor.moved, 4)
+
+        resumed = resume_sort("organize_files", UndoManager(self.journal_path))
+        self.assertEqual(resumed.moved, len(self.mock_files) - 4)
+        self.assertEqual(os.listdir(self.test_folder), ["Documents"])
+        # The checkpoint is finished, so there is nothing left to resume
+        self.assertIsNone(resume_sort("organize_files", UndoManager(self.journal_path)))
+
+    def test_undo_reverts_both_parts(self):
+        """Test that the original and resumed moves form one undo run."""
+        self._cancelled_run(after=3)
+        resume_sort("organize_files", self.manager)
+
+        report = self.manager.undo("organize_files")
+        self.assertEqual(report.restored, len(self.mock_files))
+        self.assertEqual(sorted(os.listdir(self.test_folder)), sorted(self.mock_files))
+
+    def _crash_after(self, moved):
+        """Start a checkpointed run and stop before its moves are committed."""
+        sources = [os.path.join(self.test_folder, name) for name in self.mock_files]
+        plan = MovePlan(self.test_folder,
+                        [PlannedMove(source, source + ".moved", "type") for source in sources])
+        self.manager.save_plan("organize_files", plan)
+        for source in sources[:moved]:
+            os.rename(source, source + ".moved")
+            self.manager.record_move("organize_files", source, source + ".moved")
+
+        # Nothing is flushed or closed, as after a crash
+        count = sqlite3.connect(self.journal_path).execute(
+            "SELECT COUNT(*) FROM moves").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_resume_recovers_moves_lost_in_a_crash(self):
+        """Test that resume records completed moves that were never committed."""
+        self._crash_after(3)
+        manager = UndoManager(self.journal_path)
+        checkpoint = manager.resume("organize_files")
+        self.assertEqual(len(checkpoint.moves), len(self.mock_files) - 3)
+        report = manager.undo("organize_files")
+        manager.close()
+        self.assertEqual(report.restored, 3)
+        self.assertEqual(sorted(os.listdir(self.test_folder)), sorted(self.mock_files))
+
+    def test_undo_recovers_moves_lost_in_a_crash(self):
+        """Test that undo without a resume also reverts uncommitted moves."""
+        self._crash_after(3)
+        manager = UndoManager(self.journal_path)
+        report = manager.undo("organize_files")
+        manager.close()
+        self.assertEqual(report.restored, 3)
+        self.assertEqual(sorted(os.listdir(self.test_folder)), sorted(self.mock_files))
+
+    def test_missing_sources_are_skipped(self):
+        """Test that planned files removed since the checkpoint are skipped."""
+        self._cancelled_run(after=2)
+        remaining = sorted(f for f in os.listdir(self.test_folder) if f.endswith(".pdf"))
+        os.remove(os.path.join(self.test_folder, remaining[0]))
+
+        resumed = resume_sort("organize_files", UndoManager(self.journal_path))
+        self.assertEqual(resumed.moved, len(remaining) - 1)
+        self.assertEqual(resumed.errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+from rule_engine import Rule, RuleSet, load_rules
+from category_index import CategoryIndex
+from organize_files import organize_files, EXTENSIONS
+import os
+import json
+import time
+import shutil
+
+
+class TestRuleEngine(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a folder for files and rules files."""
+        self.test_folder = "test_rules_folder"
+        os.makedirs(self.test_folder, exist_ok=True)
+        self.rules = RuleSet([
+            Rule("Large", min_size=1000),
+            Rule("Screenshots", glob="Screenshot*.png"),
+            Rule("Documents", extensions=[".pdf", "txt"]),
+            Rule("Invoices", regex=r"^invoice[-_]\d+"),
+            Rule("Old logs", extensions=".log", min_age_days=30),
+            Rule("Images", extensions=[".png", ".jpg"]),
+            Rule("Archives", extensions=".tar.gz"),
+            Rule("Compressed", extensions=".gz"),
+        ])
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def _entry(self, file_name, size=0, age_days=0):
+        path = os.path.join(self.test_folder, file_name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        mtime = time.time() - age_days * 86400
+        os.utime(path, (mtime, mtime))
+        with os.scandir(self.test_folder) as it:
+            return next(entry for entry in it if entry.name == file_name)
+
+    def test_name_rules(self):
+        """Test extension, glob and regex rules and the first-rule-wins order."""
+        self.assertEqual(self.rules.lookup("report.PDF"), "Documents")
+        self.assertEqual(self.rules.lookup("screenshot 2024.PNG"), "Screenshots")
+        self.assertEqual(self.rules.lookup("holiday.png"), "Images")
+        # An earlier extension rule wins over a later regex rule
+        self.assertEqual(self.rules.lookup("invoice-17.txt"), "Documents")
+        self.assertEqual(self.rules.lookup("invoice_17.odt"), "Invoices")
+        self.assertEqual(self.rules.lookup("backup.tar.gz"), "Archives")
+        self.assertEqual(self.rules.lookup("notes.gz"), "Compressed")
+        self.assertEqual(self.rules.lookup("unknown.bin"), "Others")
+
+    def test_regexes_that_cannot_be_combined(self):
+        """Test regexes with inline flags, named groups or backreferences."""
+        rules = RuleSet([
+            Rule("Invoices", regex=r"(?i)^invoice"),
+            Rule("Years", regex=r"(?P<n>\d{4})-"),
+            Rule("Months", regex=r"(?P<n>\d{2})_"),
+            Rule("Doubled", regex=r"(a)\1"),
+            Rule("Notes", regex=r"^note"),
+        ])
+        self.assertEqual(rules.lookup("INVOICE-3.pdf"), "Invoices")
+        self.assertEqual(rules.lookup("photo 2024-01.jpg"), "Years")
+        self.assertEqual(rules.lookup("scan 05_x.jpg"), "Months")
+        self.assertEqual(rules.lookup("baaad.txt"), "Doubled")
+        self.assertEqual(rules.lookup("notes.txt"), "Notes")
+        self.assertEqual(rules.lookup("ab.txt"), "Others")
+
+    def test_globs_of_one_rule_sharing_a_prefix(self):
+        """Test rules with several globs in the same prefix bucket."""
+        rules = RuleSet([
+            Rule("Camera", glob=["IMG*.jpg", "IMG*.png"]),
+            Rule("Images", glob=["*.png", "*.jpg"]),
+            Rule("Notes", glob="*.txt"),
+        ])
+        self.assertEqual(rules.lookup("IMG_1.png"), "Camera")
+        self.assertEqual(rules.lookup("IMG_2.jpg"), "Camera")
+        self.assertEqual(rules.lookup("holiday.jpg"), "Images")
+        self.assertEqual(rules.lookup("logo.png"), "Images")
+        self.assertEqual(rules.lookup("todo.txt"), "Notes")
+        self.assertEqual(rules.lookup("IMG_3.gif"), "Others")
+
+    def test_size_and_age_rules(self):
+        """Test rules on file metadata, which only apply to scanned entries."""
+        self.assertEqual(self.rules.lookup_entry(self._entry("big.txt", size=2000)), "Large")
+        self.assertEqual(self.rules.lookup_entry(self._entry("small.txt", size=10)), "Documents")
+        self.assertEqual(self.rules.lookup_entry(self._entry("old.log", age_days=60)), "Old logs")
+        self.assertEqual(self.rules.lookup_entry(self._entry("new.log", age_days=1)), "Others")
+        # Without metadata the size rule cannot match
+        self.assertEqual(self.rules.lookup("big.txt"), "Documents")
+
+    def test_same_decisions_as_category_index(self):
+        """Test that a rule set built from EXTENSIONS decides like CategoryIndex."""
+        rules, index = RuleSet.from_extensions(EXTENSIONS), CategoryIndex(EXTENSIONS)
+        names = ["a.pdf", "B.JPG", "c.mkv", "d.rar", "e", ".hidden", "f.tar.gz", "g.xlsx"]
+        self.assertEqual([rules.lookup(name) for name in names],
+                         [index.lookup(name) for name in names])
+        self.assertEqual(rules.categories(), index.categories())
+
+    def test_load_rules(self):
+        """Test reading a rules file and rejecting invalid rules."""
+        path = os.path.join(self.test_folder, "rules.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"default": "Misc", "rules": [
+                {"category": "Scans", "glob": ["scan_*", "IMG*"]},
+                {"category": "Documents", "extensions": [".pdf"]}]}, f)
+        rules = load_rules(path)
+        self.assertEqual(rules.lookup("scan_001.pdf"), "Scans")
+        self.assertEqual(rules.lookup("img_1.jpg"), "Scans")
+        self.assertEqual(rules.lookup("paper.pdf"), "Documents")
+        self.assertEqual(rules.lookup("other"), "Misc")
+
+        for rule in ({"category": "Bad", "size": 3}, {"glob": "*"},
+                     {"category": "Empty"}, {"category": "Bad", "regex": "("},
+                     "Bad", {"category": 3, "glob": "*"},
+                     {"category": "Bad", "extensions": 5},
+                     {"category": "Bad", "glob": ["*", 1]},
+                     {"category": "Bad", "regex": 1},
+                     {"category": "Bad", "min_size": "10"},
+                     {"category": "Bad", "max_age_days": True}):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"rules": [rule]}, f)
+            with self.assertRaises(ValueError):
+                load_rules(path)
+        for config in ([{"category": "Bad", "glob": "*"}], {"rules": {}},
+                       {"rules": [], "default": 1}):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(config, f)
+            with self.assertRaises(ValueError):
+                load_rules(path)
+
+    def test_organize_with_rules(self):
+        """Test that organize_files sorts by a rule set, including size rules."""
+        self._entry("movie.mp4", size=5000)
+        self._entry("Screenshot 1.png")
+        self._entry("letter.pdf")
+        organize_files(self.test_folder, self.rules)
+        self.assertEqual(sorted(os.listdir(self.test_folder)),
+                         ["Documents", "Large", "Screenshots"])
+        self.assertTrue(os.path.isfile(os.path.join(self.test_folder, "Large", "movie.mp4")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import patch
+from scanner import ScanStats, scan_files
+import os
+import shutil
+
+
+class TestScanner(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a folder with files and a subfolder."""
+        self.test_folder = "test_scan_folder"
+        self.mock_files = ["file1.pdf", "file2.jpg", "file3.mp4"]
+
+        os.makedirs(os.path.join(self.test_folder, "subfolder"), exist_ok=True)
+        for file_name in self.mock_files:
+            open(os.path.join(self.test_folder, file_name), "w").close()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def test_scan_files_yields_only_files(self):
+        """Test that directories are skipped and files are yielded."""
+        names = sorted(entry.name for entry in scan_files(self.test_folder))
+        self.assertEqual(names, sorted(self.mock_files))
+
+    def test_scan_files_updates_stats(self):
+        """Test that the scan counts entries and files."""
+        stats = ScanStats()
+        list(scan_files(self.test_folder, stats))
+        self.assertEqual(stats.entries, len(self.mock_files) + 1)
+        self.assertEqual(stats.files, len(self.mock_files))
+        self.assertGreaterEqual(stats.entries_per_second, 0.0)
+        self.assertIn("entries/sec", stats.summary())
+
+    @patch("os.path.isfile")
+    @patch("os.stat")
+    def test_scan_files_makes_no_stat_calls(self, mock_stat, mock_isfile):
+        """Test that the entry type is taken from the cached scandir data."""
+        list(scan_files(self.test_folder))
+        mock_isfile.assert_not_called()
+        mock_stat.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
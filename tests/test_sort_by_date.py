@@ -43,8 +43,8 @@ class TestSortByDate(unittest.TestCase):
             f"Test cleanup completed. Removed folder: {self.test_folder}")
 
     @patch("os.makedirs")
-    @patch("shutil.move")
-    def test_sort_by_year_and_month_success(self, mock_shutil_move, mock_os_makedirs):
+    @patch("os.replace")
+    def test_sort_by_year_and_month_success(self, mock_os_replace, mock_os_makedirs):
         """Test if files are sorted by year and month successfully."""
         sort_by_year_and_month(self.test_folder)
 
@@ -69,24 +69,24 @@ class TestSortByDate(unittest.TestCase):
             file_path = os.path.join(self.test_folder, file_name)
             logging.debug(
                 f"Expected file move: {file_path} -> {target_folder}")
-            mock_shutil_move.assert_any_call(
+            mock_os_replace.assert_any_call(
                 file_path, os.path.join(target_folder, file_name))
 
         # Verify calls count
         self.assertEqual(mock_os_makedirs.call_count, len(self.mod_times),
                          "makedirs was not called expected number of times.")
-        self.assertEqual(mock_shutil_move.call_count, len(self.mock_files),
+        self.assertEqual(mock_os_replace.call_count, len(self.mock_files),
                          "Files were not moved expected number of times.")
 
-    @patch("shutil.move")
-    def test_non_file_items_skipped(self, mock_shutil_move):
+    @patch("os.replace")
+    def test_non_file_items_skipped(self, mock_os_replace):
         """Test that non-file items are skipped."""
         os.makedirs(os.path.join(self.test_folder, "subfolder"), exist_ok=True)
         sort_by_year_and_month(self.test_folder)
         logging.info("Testing skipped non-file items.")
 
         # Ensure only files were moved
-        self.assertEqual(mock_shutil_move.call_count, len(self.mock_files),
+        self.assertEqual(mock_os_replace.call_count, len(self.mock_files),
                          "Non-file items were not skipped correctly.")
         logging.debug("Non-file items test passed successfully.")
 
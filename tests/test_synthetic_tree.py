@@ -0,0 +1,59 @@
+import unittest
+from benchmarks.synthetic_tree import generate_tree, parse_mix
+from benchmarks.bench_suite import compare
+import os
+import shutil
+
+
+def listing(root):
+    return sorted((os.path.relpath(os.path.join(directory, name), root),
+                   int(os.stat(os.path.join(directory, name)).st_mtime))
+                  for directory, _, files in os.walk(root) for name in files)
+
+
+class TestSyntheticTree(unittest.TestCase):
+
+    def setUp(self):
+        """Set up the folder receiving the generated trees."""
+        self.test_folder = "test_synthetic_folder"
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def test_reproducible(self):
+        """Test that the same arguments produce the same names and mtimes."""
+        first = os.path.join(self.test_folder, "first")
+        second = os.path.join(self.test_folder, "second")
+        generate_tree(first, 200, depth=2, now=1700000000)
+        generate_tree(second, 200, depth=2, now=1700000000)
+        self.assertEqual(listing(first), listing(second))
+
+    def test_shape(self):
+        """Test the file count, nesting depth, extension mix and mtime span."""
+        folders = generate_tree(self.test_folder, 90, mix=parse_mix(".jpg=1,.pdf=2"),
+                                years=1, depth=2, fanout=2, now=1700000000)
+        self.assertEqual(len(folders), 1 + 2 + 4)
+
+        files = listing(self.test_folder)
+        self.assertEqual(len(files), 90)
+        self.assertEqual({os.path.splitext(path)[1] for path, _ in files}, {".jpg", ".pdf"})
+        self.assertTrue(all(1700000000 - 365 * 86400 <= mtime <= 1700000000
+                            for _, mtime in files))
+        self.assertEqual(max(path.count(os.sep) for path, _ in files), 2)
+
+    def test_compare_flags_regressions(self):
+        """Test that slower or larger results than the baseline are reported."""
+        baseline = {"case": {"files_per_sec": 1000, "max_rss_kib": 20000}}
+        self.assertEqual(compare({"case": {"files_per_sec": 900, "max_rss_kib": 21000}},
+                                 baseline, 0.15), {})
+        regressions = compare({"case": {"files_per_sec": 500, "max_rss_kib": 30000},
+                               "new": {"files_per_sec": 1, "max_rss_kib": 1}},
+                              baseline, 0.15)
+        self.assertEqual(list(regressions), ["case"])
+        self.assertEqual(len(regressions["case"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
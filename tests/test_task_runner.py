@@ -0,0 +1,90 @@
+import unittest
+import threading
+from task_runner import ProgressRelay, run_in_background
+
+
+class FakeApp:
+    """Stands in for Tk: callbacks scheduled with after() run on pump()."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func):
+        self.scheduled.append(func)
+
+    def pump(self):
+        scheduled, self.scheduled = self.scheduled, []
+        for func in scheduled:
+            func()
+
+
+class FakeVar:
+    def __init__(self):
+        self.values = []
+
+    def set(self, value):
+        self.values.append(value)
+
+
+class TestTaskRunner(unittest.TestCase):
+
+    def test_progress_is_throttled(self):
+        """Test that rapid updates are coalesced and the final value is kept."""
+        app, var = FakeApp(), FakeVar()
+        relay = ProgressRelay(app, var, min_interval=60)
+        relay.start()
+        for done in range(1, 1001):
+            relay.report(done, 1000)
+        app.pump()
+
+        self.assertEqual(var.values, [0.1, 100.0])
+
+    def test_run_in_background_delivers_on_main_loop(self):
+        """Test that the result reaches on_done through the main loop only."""
+        app, var = FakeApp(), FakeVar()
+        finished = threading.Event()
+        results = []
+
+        def task(relay, cancel_flag):
+            relay.set(100)
+            return "done"
+
+        def on_done(result, error):
+            results.append((result, error, threading.current_thread()))
+            finished.set()
+
+        run_in_background(app, task, var, on_done)
+        while not finished.is_set():
+            app.pump()
+
+        self.assertEqual(results, [("done", None, threading.current_thread())])
+        self.assertEqual(var.values, [100])
+        app.pump()
+        self.assertEqual(app.scheduled, [])
+
+    def test_cancel_flag_and_errors(self):
+        """Test that the task sees cancellation and its errors are reported."""
+        app = FakeApp()
+        started, finished = threading.Event(), threading.Event()
+        results = []
+
+        def task(relay, cancel_flag):
+            started.set()
+            cancel_flag.wait(5)
+            raise RuntimeError("cancelled")
+
+        def on_done(result, error):
+            results.append((result, str(error)))
+            finished.set()
+
+        cancel_flag = run_in_background(app, task, on_done=on_done)
+        started.wait(5)
+        cancel_flag.set()
+        while not finished.is_set():
+            app.pump()
+
+        self.assertEqual(results, [(None, "cancelled")])
+
+
+if __name__ == "__main__":
+    unittest.main()
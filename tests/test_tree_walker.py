@@ -0,0 +1,85 @@
+import unittest
+from tree_walker import walk_tree
+from organize_files import organize_files
+from sort_by_date import sort_by_year_and_month
+import os
+import shutil
+
+
+class TestTreeWalker(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a nested folder tree with files on every level."""
+        self.test_folder = "test_tree_folder"
+        self.mock_files = [
+            "top.pdf",
+            os.path.join("a", "one.jpg"),
+            os.path.join("a", "b", "two.pdf"),
+            os.path.join("a", "b", "c", "three.mp4"),
+            os.path.join("Documents", "sorted.pdf"),
+        ]
+        for relative_path in self.mock_files:
+            file_path = os.path.join(self.test_folder, relative_path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            open(file_path, "w").close()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def _files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.test_folder)
+            for root, _, names in os.walk(self.test_folder) for name in names)
+
+    def test_walk_tree_visits_every_folder(self):
+        """Test that every folder is yielded once with its files."""
+        walked = {os.path.relpath(directory, self.test_folder):
+                  sorted(entry.name for entry in files)
+                  for directory, files in walk_tree(self.test_folder, workers=3)}
+        self.assertEqual(walked[os.path.join("a", "b", "c")], ["three.mp4"])
+        self.assertEqual(walked["."], ["top.pdf"])
+        self.assertEqual(len(walked), 5)
+
+    def test_walk_tree_skips_folders(self):
+        """Test that skipped folders are not descended into."""
+        walked = [os.path.basename(directory) for directory, _ in
+                  walk_tree(self.test_folder, skip_dir=lambda name: name == "b")]
+        self.assertNotIn("b", walked)
+        self.assertNotIn("c", walked)
+
+    def test_recursive_organize_in_place(self):
+        """Test that each level is organized into its own category folders."""
+        organize_files(self.test_folder, recursive=True)
+        self.assertEqual(self._files(), sorted([
+            os.path.join("Documents", "top.pdf"),
+            os.path.join("Documents", "sorted.pdf"),
+            os.path.join("a", "Images", "one.jpg"),
+            os.path.join("a", "b", "Documents", "two.pdf"),
+            os.path.join("a", "b", "c", "Videos", "three.mp4"),
+        ]))
+
+    def test_recursive_organize_flatten(self):
+        """Test that flatten mode gathers every level into the root."""
+        organize_files(self.test_folder, recursive=True, flatten=True)
+        self.assertEqual(self._files(), sorted([
+            os.path.join("Documents", "top.pdf"),
+            os.path.join("Documents", "sorted.pdf"),
+            os.path.join("Documents", "two.pdf"),
+            os.path.join("Images", "one.jpg"),
+            os.path.join("Videos", "three.mp4"),
+        ]))
+
+    def test_recursive_sort_by_year_and_month_skips_year_folders(self):
+        """Test that year folders from an earlier run are not re-sorted."""
+        sort_by_year_and_month(self.test_folder, recursive=True, flatten=True)
+        first = self._files()
+        sort_by_year_and_month(self.test_folder, recursive=True, flatten=True)
+        self.assertEqual(self._files(), first)
+        self.assertEqual(len(first), len(self.mock_files))
+        self.assertTrue(all(len(path.split(os.sep)) == 3 for path in first))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from undo_manager import UndoManager
+import os
+import shutil
+import sqlite3
+
+
+class TestUndoManager(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a folder with sorted files and a fresh journal."""
+        self.test_folder = "test_undo_folder"
+        self.journal_path = os.path.join(self.test_folder, "journal.sqlite3")
+        self.mock_files = ["file1.pdf", "file2.jpg", "file3.mp4"]
+
+        os.makedirs(os.path.join(self.test_folder, "sorted"), exist_ok=True)
+        for file_name in self.mock_files:
+            open(os.path.join(self.test_folder, file_name), "w").close()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def _sort(self, manager):
+        """Move every file into the sorted folder and record the moves."""
+        manager.start("organize_files")
+        for file_name in self.mock_files:
+            source = os.path.join(self.test_folder, file_name)
+            destination = os.path.join(self.test_folder, "sorted", file_name)
+            os.rename(source, destination)
+            manager.record_move("organize_files", source, destination)
+
+    def test_undo_survives_a_new_manager(self):
+        """Test that a journal written by one manager is undone by another."""
+        writer = UndoManager(self.journal_path)
+        self._sort(writer)
+        writer.close()
+
+        report = UndoManager(self.journal_path).undo("organize_files")
+        for file_name in self.mock_files:
+            self.assertTrue(os.path.exists(os.path.join(self.test_folder, file_name)))
+        self.assertEqual(report.restored, len(self.mock_files))
+
+    def test_journal_records_full_paths(self):
+        """Test that both full source and destination paths are stored."""
+        manager = UndoManager(self.journal_path)
+        self._sort(manager)
+        manager.flush()
+
+        rows = sqlite3.connect(self.journal_path).execute(
+            "SELECT source, destination FROM moves ORDER BY id").fetchall()
+        self.assertEqual(len(rows), len(self.mock_files))
+        self.assertEqual(rows[0], (
+            os.path.abspath(os.path.join(self.test_folder, "file1.pdf")),
+            os.path.abspath(os.path.join(self.test_folder, "sorted", "file1.pdf"))))
+
+    def test_moves_are_committed_in_batches(self):
+        """Test that records are buffered until a batch is full."""
+        manager = UndoManager(self.journal_path, batch_size=2)
+        self._sort(manager)
+
+        count = sqlite3.connect(self.journal_path).execute(
+            "SELECT COUNT(*) FROM moves").fetchone()[0]
+        self.assertEqual(count, 2)  # The third move is still buffered
+        manager.flush()
+        count = sqlite3.connect(self.journal_path).execute(
+            "SELECT COUNT(*) FROM moves").fetchone()[0]
+        self.assertEqual(count, 3)
+
+    def test_undo_only_latest_run_once(self):
+        """Test that a run is undone once and missing data is handled."""
+        manager = UndoManager(self.journal_path)
+        manager.undo("organize_files")  # Nothing recorded yet, no error
+        self._sort(manager)
+        manager.undo("organize_files")
+        manager.undo("organize_files")  # Already undone, nothing happens
+        self.assertEqual(sorted(os.listdir(self.test_folder)),
+                         sorted(self.mock_files + ["journal.sqlite3", "sorted"]))
+
+    def test_parallel_undo_reports_and_removes_folders(self):
+        """Test grouped parallel replay, failure reporting and folder cleanup."""
+        manager = UndoManager(self.journal_path)
+        manager.start("sort_by_year_and_month")
+        manager.record_folder("sort_by_year_and_month", os.path.join(self.test_folder, "2025"))
+        sources = []
+        for i in range(40):
+            source = os.path.join(self.test_folder, f"photo{i}.jpg")
+            month_folder = os.path.join(self.test_folder, "2025", f"{i % 4 + 1:02d}")
+            destination = os.path.join(month_folder, f"photo{i}.jpg")
+            if not os.path.isdir(month_folder):
+                os.makedirs(month_folder)
+                manager.record_folder("sort_by_year_and_month", month_folder)
+            open(destination, "w").close()
+            manager.record_move("sort_by_year_and_month", source, destination)
+            sources.append(source)
+        os.remove(os.path.join(self.test_folder, "2025", "01", "photo0.jpg"))
+
+        report = manager.undo("sort_by_year_and_month", workers=4)
+
+        self.assertEqual(report.restored, 39)
+        self.assertEqual(report.missing, 1)
+        self.assertEqual(report.failures, [])
+        self.assertEqual(report.removed_folders, 5)  # Four months and the year
+        self.assertFalse(os.path.exists(os.path.join(self.test_folder, "2025")))
+        self.assertTrue(all(os.path.exists(source) for source in sources[1:]))
+        self.assertIn("files/sec", report.summary())
+
+    def test_undo_keeps_folders_it_did_not_create(self):
+        """Test that an empty folder that existed before the run is kept."""
+        manager = UndoManager(self.journal_path)
+        self._sort(manager)
+        manager.undo("organize_files")
+        self.assertTrue(os.path.isdir(os.path.join(self.test_folder, "sorted")))
+
+    def test_undo_does_not_move_into_a_folder(self):
+        """Test that a folder now at the original path fails the restore."""
+        manager = UndoManager(self.journal_path)
+        self._sort(manager)
+        os.makedirs(os.path.join(self.test_folder, "file1.pdf", "inner"))
+
+        report = manager.undo("organize_files")
+        self.assertEqual(report.restored, 2)
+        self.assertEqual(len(report.failures), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.test_folder, "sorted", "file1.pdf")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import patch
+import organize_files
+import watcher
+import os
+import time
+import shutil
+import threading
+
+
+class TestWatcher(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a watched folder with one file already present."""
+        self.test_folder = "test_watcher_folder"
+        os.makedirs(self.test_folder, exist_ok=True)
+        open(os.path.join(self.test_folder, "existing.pdf"), "w").close()
+        open(os.path.join(self.test_folder, "existing.iso.crdownload"), "w").close()
+
+        self.stop = threading.Event()
+        self.batches = []
+        patcher = patch.object(organize_files, "undo_manager", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        try:
+            watcher.Inotify(self.test_folder).close()
+        except OSError as e:
+            self.skipTest(f"inotify unavailable: {e}")
+
+        started = threading.Event()
+        self.thread = threading.Thread(target=self._watch, args=(started,))
+        self.thread.start()
+        started.wait(2)
+
+    def tearDown(self):
+        """Stop the watcher and clean up."""
+        self.stop.set()
+        if hasattr(self, "thread"):
+            self.thread.join(5)
+        if os.path.exists(self.test_folder):
+            shutil.rmtree(self.test_folder)
+
+    def _watch(self, started):
+        def on_batch(executor):
+            self.batches.append(executor.moved)
+            started.set()
+        self.executor = watcher.watch(self.test_folder, "type", self.stop, on_batch=on_batch)
+
+    def _wait_for(self, path, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if os.path.exists(path):
+                return time.monotonic()
+            time.sleep(0.01)
+        self.fail(f"{path} was not filed in {timeout}s")
+
+    def test_existing_files_are_sorted_first(self):
+        """Test that files present before watching are organized."""
+        self._wait_for(os.path.join(self.test_folder, "Documents", "existing.pdf"))
+        # A download already in progress is left alone
+        self.assertTrue(os.path.exists(
+            os.path.join(self.test_folder, "existing.iso.crdownload")))
+        self.assertEqual(watcher._settled_files(self.test_folder), [])
+
+    def test_new_file_is_filed_within_a_second(self):
+        """Test that a closed file is filed quickly."""
+        with open(os.path.join(self.test_folder, "photo.jpg"), "w") as f:
+            f.write("data")
+        closed = time.monotonic()
+        filed = self._wait_for(os.path.join(self.test_folder, "Images", "photo.jpg"))
+        self.assertLess(filed - closed, 1.0)
+
+    def test_open_file_waits_until_closed(self):
+        """Test that a file still being written is not moved."""
+        path = os.path.join(self.test_folder, "movie.mp4")
+        with open(path, "w") as f:
+            f.write("part one")
+            f.flush()
+            time.sleep(watcher.DEBOUNCE_SECONDS * 3)
+            self.assertTrue(os.path.exists(path))
+            f.write("part two")
+        self._wait_for(os.path.join(self.test_folder, "Videos", "movie.mp4"))
+
+    def test_partial_downloads_are_ignored(self):
+        """Test that in-progress downloads stay until renamed into place."""
+        part = os.path.join(self.test_folder, "archive.zip.part")
+        with open(part, "w") as f:
+            f.write("data")
+        time.sleep(watcher.DEBOUNCE_SECONDS * 3)
+        self.assertTrue(os.path.exists(part))
+
+        os.rename(part, os.path.join(self.test_folder, "archive.zip"))
+        self._wait_for(os.path.join(self.test_folder, "Archives", "archive.zip"))
+
+
+if __name__ == "__main__":
+    unittest.main()
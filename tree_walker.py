@@ -0,0 +1,115 @@
+import os
+import time
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from scanner import ScanStats
+import instrumentation
+
+
+def walk_tree(root, skip_dir=None, workers=4, stats=None, scan=None):
+    """
+    Walks a directory tree, scanning subtrees concurrently on a thread pool.
+
+    Every directory is read with a single os.scandir call that separates its
+    files from its subdirectories. Symlinked directories are not followed, so
+    the walk cannot loop.
+
+    Args:
+        root (str): Top of the tree to walk.
+        skip_dir (function, optional): Called with a subdirectory name; when it
+            returns True the subdirectory and everything below it is skipped.
+            Used to leave the folders created by the sorters alone.
+        workers (int): Number of directories scanned at the same time.
+        stats (ScanStats, optional): Collector for scan throughput across the
+            whole tree.
+        scan (function, optional): Reads one directory, with the result shape
+            of _scan_directory. MetadataIndex.scan serves unchanged
+            directories from its index instead.
+
+    Yields:
+        tuple: (directory path, list of os.DirEntry for its regular files),
+            in the order scans complete. With a custom scan function, the
+            file items are whatever it returns.
+    """
+    if stats is None:
+        stats = ScanStats()
+    workers = max(1, int(workers or 1))
+    if scan is None:
+        scan = _scan_directory
+
+    pending = deque([root])
+    running = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            # Keep a bounded number of scans in flight
+            while pending and len(running) < workers * 2:
+                running.add(pool.submit(scan, pending.popleft()))
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                directory, files, subdirs, entries, elapsed = future.result()
+                stats.entries += entries
+                stats.files += len(files)
+                stats.elapsed += elapsed
+                instrumentation.add("list", elapsed, entries)
+
+                for name, path in subdirs:
+                    if skip_dir is None or not skip_dir(name):
+                        pending.append(path)
+                yield directory, files
+
+
+def iter_tree_moves(root, plan_entries, skip_dir=None, flatten=False, workers=4, stats=None,
+                    scan=None):
+    """
+    Lazily yields planned moves for every directory of a tree.
+
+    Args:
+        root (str): Top of the tree to organize.
+        plan_entries (function): Strategy planner, called as
+            plan_entries(file_entries, target_root) and returning PlannedMove
+            entries for those files.
+        skip_dir (function, optional): Predicate naming folders to skip, see
+            walk_tree().
+        flatten (bool): Plan every file into the folders of the root instead
+            of applying the strategy separately at each level.
+        workers (int): Number of directories scanned at the same time.
+        stats (ScanStats, optional): Collector for scan throughput.
+        scan (function, optional): Directory reader, see walk_tree().
+
+    Yields:
+        PlannedMove: Moves for the files of each directory.
+    """
+    for directory, files in walk_tree(root, skip_dir, workers, stats, scan):
+        target_root = root if flatten else directory
+        yield from plan_entries(files, target_root)
+
+
+def _scan_directory(directory):
+    """
+    Reads one directory, separating regular files from subdirectories.
+
+    Args:
+        directory (str): Directory to read.
+
+    Returns:
+        tuple: (directory, files, subdirs, entry count, seconds spent), where
+            files is a list of os.DirEntry and subdirs a list of (name, path).
+    """
+    started = time.perf_counter()
+    files, subdirs, entries = [], [], 0
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                entries += 1
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append((entry.name, entry.path))
+                    elif entry.is_file():
+                        files.append(entry)
+                except OSError as e:
+                    logging.error(f"Cannot read entry {entry.path}: {e}")
+    except OSError as e:
+        logging.error(f"Cannot scan folder {directory}: {e}")
+    return directory, files, subdirs, entries, time.perf_counter() - started
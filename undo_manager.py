@@ -1,5 +1,15 @@
 import os
+import time
+import errno
+import shutil
+import sqlite3
 import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from move_plan import PlannedMove
+from log_pipeline import log_file, flush_summary
+import instrumentation
 
 # Configure logging for UndoManager operations
 logging.basicConfig(
@@ -7,53 +17,736 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Folder of the files kept between runs, in the user's data directory so
+# they do not depend on where the application is started from
+if os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+    STATE_DIR = os.path.join(os.environ["LOCALAPPDATA"], "FileZen")
+else:
+    STATE_DIR = os.path.join(
+        os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state"),
+        "filezen")
+
+# Journal shared by every UndoManager of the application
+DEFAULT_JOURNAL_PATH = os.environ.get(
+    "FILEZEN_UNDO_JOURNAL", os.path.join(STATE_DIR, "undo_journal.sqlite3"))
+
+# Number of moves buffered before they are committed (and synced) together
+JOURNAL_BATCH_SIZE = 1000
+
+# Number of journal rows read per batch during undo
+UNDO_BATCH_SIZE = 5000
+
+# Unfinished run that can be resumed: its folder, whether its moves may
+# replace existing files, and the planned moves that have not completed
+Checkpoint = namedtuple("Checkpoint", ["folder_path", "overwrite", "moves"])
+
+
+class UndoReport:
+    """
+    Outcome of an undo operation.
+    """
+
+    def __init__(self, sort_type):
+        """
+        Initializes empty counters for an undo of a sorting type.
+
+        Args:
+            sort_type (str): The type of sorting operation being undone.
+        """
+        self.sort_type = sort_type
+        self.restored = 0  # Files moved back to their original path
+        self.missing = 0  # Files no longer at their recorded destination
+        self.failures = []  # (file path, error message) for failed restores
+        self.removed_folders = 0  # Emptied sort folders removed at the end
+        self.separated = 0  # Duplicate hard links turned back into copies
+        self.elapsed = 0.0
+
+    @property
+    def files_per_second(self):
+        """
+        Returns:
+            float: Restored files per second, or 0.0 if nothing was timed.
+        """
+        if self.elapsed <= 0:
+            return 0.0
+        return self.restored / self.elapsed
+
+    def totals(self):
+        """
+        Returns:
+            dict: Counters of the undo for its run report.
+        """
+        return {"restored": self.restored, "missing": self.missing,
+                "failures": len(self.failures), "removed_folders": self.removed_folders,
+                "separated": self.separated}
+
+    def summary(self):
+        """
+        Returns:
+            str: Human-readable one-line summary of the undo.
+        """
+        return (f"Undo of {self.sort_type}: restored {self.restored} files in "
+                f"{self.elapsed:.3f}s ({self.files_per_second:.0f} files/sec), "
+                f"{self.missing} missing, {len(self.failures)} failed, "
+                f"{self.removed_folders} folders removed")
+
 
 class UndoManager:
     """
     Manages the undo functionality for file operations, allowing restoration
     of files to their original state after sorting.
+
+    Every move is appended to an on-disk SQLite journal with its full source
+    and destination path, so undo information survives the process and does
+    not have to fit in memory. Records are buffered and committed in batches,
+    which keeps the number of fsync calls low on multi-million-file runs.
+    Moves of a checkpointed run lost with an uncommitted batch are recovered
+    from its plan by resume() and undo(), so a crashed run can still be
+    undone as a whole.
     """
 
-    def __init__(self):
+    def __init__(self, journal_path=None, batch_size=JOURNAL_BATCH_SIZE, flush_seconds=None):
         """
-        Initializes the UndoManager instance, storing states for various sorting types.
+        Initializes the UndoManager instance. The journal file is opened on
+        first use, so creating a manager has no filesystem side effects.
+
+        Args:
+            journal_path (str, optional): Path of the journal database.
+                Defaults to DEFAULT_JOURNAL_PATH.
+            batch_size (int): Moves buffered before a commit.
+            flush_seconds (float, optional): Also commit a move recorded this
+                long after the previous commit, bounding what a killed
+                process loses. By default only batch_size triggers a commit.
         """
-        self.states = {}  # Dictionary to store the original states of files.
+        self.journal_path = journal_path or DEFAULT_JOURNAL_PATH
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._flushed_at = time.monotonic()
+        self._conn = None
+        self._lock = threading.RLock()
+        self._run_ids = {}  # Sort type -> journal id of its current run
+        self._pending = []  # (run id, source, destination) not yet committed
+        self._pending_folders = []  # (run id, folder) not yet committed
+        self._pending_links = []  # (run id, path) not yet committed
 
     def save_state(self, sort_type, files):
         """
-        Saves the original state of files before applying sorting operations.
+        Marks the start of a sorting operation for files that are about to move.
+
+        The journal stores complete moves as they happen (see record_move),
+        so the file list itself only needs to be counted here.
 
         Args:
             sort_type (str): The type of sorting operation (e.g., "organize_files", "sort_by_date").
-            files (list): List of file paths to save their original state.
+            files (list): List of file paths that the operation will move.
+
+        Returns:
+            None
+        """
+        self.start(sort_type)
+        logging.info(
+            f"Original state saved for sorting type: {sort_type} ({len(files)} files)")
+
+    def start(self, sort_type):
+        """
+        Opens a new journal run for a sorting type. Undo always reverts the
+        most recent run of a type.
+
+        Args:
+            sort_type (str): The type of sorting operation that is starting.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.flush()
+            conn = self._connect()
+            cursor = conn.execute(
+                "INSERT INTO runs (sort_type, started) VALUES (?, ?)",
+                (sort_type, time.time()))
+            conn.commit()
+            self._run_ids[sort_type] = cursor.lastrowid
+
+    def record_move(self, sort_type, source, destination):
+        """
+        Records a completed move so it can be reverted later.
+
+        Args:
+            sort_type (str): The type of sorting operation that moved the file.
+            source (str): Full path the file had before the move.
+            destination (str): Full path the file has after the move.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if sort_type not in self._run_ids:
+                self.start(sort_type)
+            self._pending.append((self._run_ids[sort_type],
+                                  os.path.abspath(source),
+                                  os.path.abspath(destination)))
+            if len(self._pending) >= self.batch_size or (
+                    self.flush_seconds is not None
+                    and time.monotonic() - self._flushed_at >= self.flush_seconds):
+                self.flush()
+
+    def record_folder(self, sort_type, folder):
+        """
+        Records a folder created by a sorting operation, so undo may remove
+        it again once it is empty. Folders that existed before are never
+        recorded, and so never removed.
+
+        Args:
+            sort_type (str): The type of sorting operation that created the folder.
+            folder (str): Path of the new folder.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if sort_type not in self._run_ids:
+                self.start(sort_type)
+            self._pending_folders.append((self._run_ids[sort_type], os.path.abspath(folder)))
+
+    def record_link(self, sort_type, path):
+        """
+        Records a duplicate replaced by a hard link before its move, so undo
+        gives it back content of its own instead of a shared inode.
+
+        Args:
+            sort_type (str): The type of sorting operation that linked the file.
+            path (str): Path of the linked duplicate before it was moved.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if sort_type not in self._run_ids:
+                self.start(sort_type)
+            self._pending_links.append((self._run_ids[sort_type], os.path.abspath(path)))
+
+    def flush(self):
+        """
+        Commits buffered moves, folders and links to the journal in a single
+        transaction.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if not (self._pending or self._pending_folders or self._pending_links):
+                return
+            conn = self._connect()
+            conn.executemany(
+                "INSERT INTO moves (run_id, source, destination) VALUES (?, ?, ?)",
+                self._pending)
+            conn.executemany(
+                "INSERT INTO folders (run_id, path) VALUES (?, ?)", self._pending_folders)
+            conn.executemany(
+                "INSERT INTO links (run_id, path) VALUES (?, ?)", self._pending_links)
+            conn.commit()
+            self._pending = []
+            self._pending_folders = []
+            self._pending_links = []
+            self._flushed_at = time.monotonic()
+
+    def merge(self, sort_type, journal_paths):
+        """
+        Copies the moves other journals recorded for a sorting type into one
+        new run of this journal, so a single undo reverts all of them.
+
+        Used by batch runs, where every worker process keeps its own journal
+        instead of contending for this one.
+
+        Args:
+            sort_type (str): The type of sorting operation to merge.
+            journal_paths (iterable): Paths of the journals to copy from.
+
+        Returns:
+            int: Number of moves merged.
+        """
+        merged = 0
+        with self._lock:
+            self.start(sort_type)
+            run_id = self._run_ids[sort_type]
+            conn = self._connect()
+            for path in journal_paths:
+                conn.execute("ATTACH DATABASE ? AS other", (path,))
+                try:
+                    cursor = conn.execute(
+                        "INSERT INTO moves (run_id, source, destination) "
+                        "SELECT ?, m.source, m.destination FROM other.moves m "
+                        "JOIN other.runs r ON r.id = m.run_id "
+                        "WHERE r.sort_type = ? AND r.undone = 0 ORDER BY m.id",
+                        (run_id, sort_type))
+                    merged += cursor.rowcount
+                    conn.execute(
+                        "INSERT INTO folders (run_id, path) "
+                        "SELECT ?, f.path FROM other.folders f "
+                        "JOIN other.runs r ON r.id = f.run_id "
+                        "WHERE r.sort_type = ? AND r.undone = 0 ORDER BY f.id",
+                        (run_id, sort_type))
+                    conn.execute(
+                        "INSERT INTO links (run_id, path) "
+                        "SELECT ?, l.path FROM other.links l "
+                        "JOIN other.runs r ON r.id = l.run_id "
+                        "WHERE r.sort_type = ? AND r.undone = 0 ORDER BY l.id",
+                        (run_id, sort_type))
+                    conn.commit()
+                finally:
+                    conn.execute("DETACH DATABASE other")
+        logging.info(f"Merged {merged} moves of {sort_type} into one undo run")
+        return merged
+
+    def latest_run(self, sort_type):
+        """
+        Args:
+            sort_type (str): The type of sorting operation.
+
+        Returns:
+            int: Journal id of the latest run of the type, 0 if there is none.
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MAX(id) FROM runs WHERE sort_type = ?", (sort_type,)).fetchone()
+            return row[0] or 0
+
+    def join_runs(self, sort_type, after):
+        """
+        Folds every run of a sorting type started after a given run into the
+        latest one, so a single undo reverts all of them, as when one command
+        sorts several folders. The checkpoints of the folded runs are
+        dropped; moves they lost in a crash are recorded first.
+
+        Args:
+            sort_type (str): The type of sorting operation.
+            after (int): Journal id of the last run to leave alone, as
+                returned by latest_run() beforehand.
+
+        Returns:
+            int: Number of runs folded into the latest one.
+        """
+        with self._lock:
+            self.flush()
+            conn = self._connect()
+            run_ids = [run_id for run_id, in conn.execute(
+                "SELECT id FROM runs WHERE sort_type = ? AND id > ? AND undone = 0 "
+                "ORDER BY id", (sort_type, after))]
+            if len(run_ids) < 2:
+                return 0
+            *folded, latest = run_ids
+            for run_id in folded:
+                self._reconcile(conn, run_id)
+                for table in ("moves", "folders", "links"):
+                    conn.execute(f"UPDATE {table} SET run_id = ? WHERE run_id = ?",
+                                 (latest, run_id))
+                conn.execute("DELETE FROM planned WHERE run_id = ?", (run_id,))
+                conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+                conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+            conn.commit()
+        return len(folded)
+
+    def save_plan(self, sort_type, plan, overwrite=True):
+        """
+        Stores the move plan of the current run as its checkpoint.
+
+        Together with the moves recorded as they complete, the plan tells
+        resume() exactly which moves are left after a crash or cancellation,
+        without rescanning the folder.
+
+        Args:
+            sort_type (str): The type of sorting operation about to run.
+            plan (MovePlan): Every move the run will make.
+            overwrite (bool): Whether the run lets moves replace existing files.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if sort_type not in self._run_ids:
+                self.start(sort_type)
+            run_id = self._run_ids[sort_type]
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO checkpoints (run_id, folder, overwrite) VALUES (?, ?, ?)",
+                (run_id, os.path.abspath(plan.folder_path), int(overwrite)))
+            conn.executemany(
+                "INSERT INTO planned (run_id, source, destination, strategy) "
+                "VALUES (?, ?, ?, ?)",
+                ((run_id, os.path.abspath(move.source),
+                  os.path.abspath(move.destination), move.strategy)
+                 for move in plan))
+            conn.commit()
+
+    def complete_plan(self, sort_type):
+        """
+        Marks the checkpoint of the current run as finished, so it is no
+        longer offered by resume(). The stored plan is dropped.
+
+        Args:
+            sort_type (str): The type of sorting operation that finished.
 
         Returns:
             None
         """
-        self.states[sort_type] = {
-            file: os.path.basename(file) for file in files}
-        logging.info(f"Original state saved for sorting type: {sort_type}")
+        with self._lock:
+            run_id = self._run_ids.get(sort_type)
+            if run_id is None:
+                return
+            conn = self._connect()
+            self.flush()
+            conn.execute("UPDATE checkpoints SET finished = 1 WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM planned WHERE run_id = ?", (run_id,))
+            conn.commit()
 
-    def undo(self, sort_type):
+    def resume(self, sort_type):
+        """
+        Reopens the latest run of a sorting type if it stopped before its
+        plan was finished. Moves made from now on are recorded in that run,
+        so a single undo reverts both parts.
+
+        Planned moves whose source no longer exists are skipped. If their
+        destination exists, they completed just before a crash without
+        reaching the journal, and are recorded now; otherwise the user
+        removed the file.
+
+        Args:
+            sort_type (str): The type of sorting operation to resume.
+
+        Returns:
+            Checkpoint: The remaining moves, or None if there is nothing to resume.
+        """
+        with self._lock:
+            self.flush()
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT r.id, c.folder, c.overwrite FROM runs r "
+                "JOIN checkpoints c ON c.run_id = r.id "
+                "WHERE r.id = (SELECT MAX(id) FROM runs WHERE sort_type = ?) "
+                "AND r.undone = 0 AND c.finished = 0", (sort_type,)).fetchone()
+            if row is None:
+                logging.warning(f"No unfinished run to resume for sorting type: {sort_type}.")
+                return None
+            run_id, folder_path, overwrite = row
+            moves = []
+            skipped = self._reconcile(conn, run_id, moves)
+            self._run_ids[sort_type] = run_id
+        logging.info(f"Resuming {sort_type} in {folder_path}: {len(moves)} moves left, "
+                     f"{skipped} sources already gone")
+        return Checkpoint(folder_path, bool(overwrite), moves)
+
+    @instrumentation.instrumented("undo", UndoReport.totals, sort_type="sort_type")
+    def undo(self, sort_type, workers=4):
         """
         Restores files to their original state for the specified sorting type.
 
+        The moves of the latest run are streamed from the journal newest
+        first, in batches grouped by destination folder, and each group is
+        restored on a worker thread. Duplicates the run replaced by hard links
+        then get a copy of their own again, and folders the run created are
+        removed in one sweep at the end, if the undo left them empty.
+
         Args:
             sort_type (str): The type of sorting operation to undo.
+            workers (int): Number of folders restored at the same time.
 
         Returns:
-            None
+            UndoReport: Throughput and failures of the undo.
         """
-        if sort_type not in self.states:
-            logging.warning(
-                f"No undo data available for sorting type: {sort_type}.")
-            return
+        report = UndoReport(sort_type)
+        started = time.perf_counter()
+        workers = max(1, int(workers or 1))
 
-        for file, original_path in self.states[sort_type].items():
-            if os.path.exists(file):  # Verify if the file still exists
-                # Move the file back to its original path
-                os.rename(file, original_path)
-                logging.info(f"File restored: {file} -> {original_path}")
+        with self._lock:
+            self.flush()
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT id FROM runs WHERE sort_type = ? AND undone = 0 "
+                "ORDER BY id DESC LIMIT 1", (sort_type,)).fetchone()
+            if row is None:
+                logging.warning(
+                    f"No undo data available for sorting type: {sort_type}.")
+                return report
+            run_id = row[0]
+            self._reconcile(conn, run_id)
 
+            moves = conn.execute(
+                "SELECT destination, source FROM moves WHERE run_id = ? "
+                "ORDER BY id DESC", (run_id,))
+            running = set()
+            # Timed here, since the run is not visible from the pool threads
+            rename = instrumentation.timed("restore", os.rename)
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                while True:
+                    rows = moves.fetchmany(UNDO_BATCH_SIZE)
+                    if not rows:
+                        break
+
+                    groups = {}
+                    for file, original_path in rows:
+                        groups.setdefault(os.path.dirname(file), []).append(
+                            (file, original_path))
+
+                    for group in groups.values():
+                        running.add(pool.submit(_restore_group, group, rename))
+                    # Bound the number of batches held in memory
+                    while len(running) > workers * 4:
+                        done, running = wait(running, return_when=FIRST_COMPLETED)
+                        _merge_results(report, done)
+
+                _merge_results(report, running)
+
+            for path, in conn.execute(
+                    "SELECT path FROM links WHERE run_id = ? ORDER BY id", (run_id,)):
+                try:
+                    report.separated += _separate_link(path)
+                except FileNotFoundError:
+                    continue  # Not restored, or removed by the user
+                except OSError as e:
+                    logging.error(f"Error copying linked duplicate {path}: {e}")
+                    report.failures.append((path, str(e)))
+
+            report.removed_folders = _remove_empty_folders(
+                path for path, in conn.execute(
+                    "SELECT path FROM folders WHERE run_id = ?", (run_id,)))
+
+            conn.execute("UPDATE runs SET undone = 1 WHERE id = ?", (run_id,))
+            conn.execute("DELETE FROM planned WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM folders WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM links WHERE run_id = ?", (run_id,))
+            conn.commit()
+            if self._run_ids.get(sort_type) == run_id:
+                del self._run_ids[sort_type]
+
+        report.elapsed = time.perf_counter() - started
+        flush_summary()
+        logging.info(report.summary())
         logging.info(f"Undo operation completed for sorting type: {sort_type}")
+        return report
+
+    def _reconcile(self, conn, run_id, remaining=None):
+        """
+        Records the planned moves of a checkpointed run that completed but
+        were lost with an uncommitted batch: their source is gone and their
+        destination exists. Runs without a stored plan are left as they are.
+
+        Args:
+            conn (Connection): Open journal connection.
+            run_id (int): Journal id of the run.
+            remaining (list, optional): Receives a PlannedMove per planned
+                move whose source still exists.
+
+        Returns:
+            int: Planned sources that are gone without a destination either.
+        """
+        # NOT IN is evaluated against a single temporary index of the
+        # completed sources, so this stays O(n log n) on huge plans
+        rows = conn.execute(
+            "SELECT source, destination, strategy FROM planned "
+            "WHERE run_id = ? AND source NOT IN "
+            "(SELECT source FROM moves WHERE run_id = ?) ORDER BY id",
+            (run_id, run_id))
+        completed, missing = [], 0
+        while True:
+            batch = rows.fetchmany(UNDO_BATCH_SIZE)
+            if not batch:
+                break
+            for source, destination, strategy in batch:
+                if os.path.lexists(source):
+                    if remaining is not None:
+                        remaining.append(PlannedMove(source, destination, strategy))
+                elif os.path.lexists(destination):
+                    completed.append((run_id, source, destination))
+                else:
+                    missing += 1
+
+        # Inserted once the query is done, since it reads the moves table
+        if completed:
+            conn.executemany(
+                "INSERT INTO moves (run_id, source, destination) VALUES (?, ?, ?)",
+                completed)
+            conn.commit()
+            logging.info(f"Recorded {len(completed)} moves that completed "
+                         f"before the run stopped")
+        return missing
+
+    def close(self):
+        """
+        Flushes pending moves and closes the journal.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self):
+        """
+        Opens the journal on first use and creates its tables.
+
+        Returns:
+            sqlite3.Connection: The shared connection of this manager.
+        """
+        if self._conn is None:
+            directory = os.path.dirname(self.journal_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Moves are recorded from executor worker threads
+            self._conn = sqlite3.connect(
+                self.journal_path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY,
+                    sort_type TEXT NOT NULL,
+                    started REAL NOT NULL,
+                    undone INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS moves (
+                    id INTEGER PRIMARY KEY,
+                    run_id INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    destination TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS moves_by_run ON moves (run_id);
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    run_id INTEGER PRIMARY KEY,
+                    folder TEXT NOT NULL,
+                    overwrite INTEGER NOT NULL,
+                    finished INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS planned (
+                    id INTEGER PRIMARY KEY,
+                    run_id INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    destination TEXT NOT NULL,
+                    strategy TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS planned_by_run ON planned (run_id);
+                CREATE TABLE IF NOT EXISTS folders (
+                    id INTEGER PRIMARY KEY,
+                    run_id INTEGER NOT NULL,
+                    path TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS folders_by_run ON folders (run_id);
+                CREATE TABLE IF NOT EXISTS links (
+                    id INTEGER PRIMARY KEY,
+                    run_id INTEGER NOT NULL,
+                    path TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS links_by_run ON links (run_id);
+                """)
+        return self._conn
+
+
+def _restore_group(group, rename=os.rename):
+    """
+    Moves the files of one destination folder back to their original paths.
+
+    Args:
+        group (list): (current path, original path) pairs.
+        rename (function): Renames one file, possibly timed.
+
+    Returns:
+        tuple: (restored count, missing count, list of (path, error message)).
+    """
+    restored, missing, failures = 0, 0, []
+    for file, original_path in group:
+        try:
+            # Move the file back to its original path
+            rename(file, original_path)
+        except FileNotFoundError:
+            if os.path.lexists(file):
+                failures.append((file, "original folder no longer exists"))
+            else:
+                missing += 1  # Already moved or deleted by the user
+            continue
+        except OSError as e:
+            try:
+                # The sort copied across devices, so the way back does too.
+                # Any other error, such as a folder now at the original
+                # path, is a failure rather than a reason to copy.
+                if e.errno != errno.EXDEV or os.path.isdir(original_path):
+                    raise
+                shutil.move(file, original_path)
+            except OSError:
+                logging.error(f"Error restoring {file}: {e}")
+                failures.append((file, str(e)))
+                continue
+        restored += 1
+        log_file("Restored", file, original_path)
+    return restored, missing, failures
+
+
+def _separate_link(path):
+    """
+    Replaces a hard link with a copy of its content, so the file no longer
+    changes together with the file it was linked to.
+
+    Args:
+        path (str): File that was replaced by a hard link.
+
+    Raises:
+        OSError: If the file cannot be copied.
+
+    Returns:
+        bool: True if the file was separated, False if it no longer shares
+            its inode with another path.
+    """
+    if os.stat(path).st_nlink < 2:
+        return False
+    temporary = path + ".filezen-copy"
+    try:
+        shutil.copy2(path, temporary)
+        # Atomic swap, the path is never missing
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.lexists(temporary):
+            os.remove(temporary)
+        raise
+    return True
+
+
+def _merge_results(report, futures):
+    """
+    Adds the results of finished restore groups to a report.
+
+    Args:
+        report (UndoReport): Report to update.
+        futures (iterable): Finished futures of _restore_group.
+
+    Returns:
+        None
+    """
+    for future in futures:
+        restored, missing, failures = future.result()
+        report.restored += restored
+        report.missing += missing
+        report.failures.extend(failures)
+
+
+def _remove_empty_folders(created_folders):
+    """
+    Removes the folders an undone run created, such as category or year and
+    month folders, if they are empty after the undo. Deepest folders go
+    first, so a year folder is removed after its months.
+
+    Args:
+        created_folders (iterable): Folders the undone run created.
+
+    Returns:
+        int: Number of folders removed.
+    """
+    removed = 0
+    for folder in sorted(set(created_folders), key=lambda path: path.count(os.sep),
+                         reverse=True):
+        try:
+            os.rmdir(folder)  # Fails, and is skipped, unless the folder is empty
+            removed += 1
+        except OSError:
+            continue
+    return removed
@@ -0,0 +1,250 @@
+import os
+import time
+import errno
+import struct
+import select
+import ctypes
+import ctypes.util
+import logging
+import organize_files
+import sort_by_date
+from move_executor import MoveExecutor
+
+# Quiet period after a file is closed or renamed into the folder before it
+# is filed, so writers that close and reopen a file are not cut off
+DEBOUNCE_SECONDS = 0.2
+
+# Longest wait for events, bounding how late a cancel request is noticed
+POLL_SECONDS = 0.5
+
+# Suffixes of downloads in progress; the finished file is renamed into place
+PARTIAL_SUFFIXES = (".part", ".crdownload", ".download", ".partial", ".tmp")
+
+# inotify event masks, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+# struct inotify_event header: wd, mask, cookie, len; the name follows
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Strategy flag -> (planner, undo manager, undo sort type)
+_STRATEGIES = {
+    "type": (organize_files._type_moves,
+             lambda: organize_files.undo_manager, "organize_files"),
+    "date": (sort_by_date._year_month_moves,
+             lambda: sort_by_date.undo_manager, "sort_by_year_and_month"),
+}
+
+
+class Inotify:
+    """
+    Minimal ctypes binding to Linux inotify for a single folder.
+
+    Only events for files that are complete are requested: closed after
+    writing, or renamed into the folder. Modifications are also reported so
+    a reopened file can be held back.
+    """
+
+    def __init__(self, folder_path):
+        """
+        Starts watching a folder.
+
+        Args:
+            folder_path (str): Folder to watch.
+
+        Raises:
+            OSError: If inotify is not available or the folder cannot be watched.
+        """
+        library = ctypes.util.find_library("c")
+        if library is None:
+            raise OSError(errno.ENOSYS, "inotify requires the C library (Linux)")
+        libc = ctypes.CDLL(library, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available on this system")
+
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        watch = libc.inotify_add_watch(
+            self.fd, os.fsencode(folder_path), IN_CLOSE_WRITE | IN_MOVED_TO | IN_MODIFY)
+        if watch < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, os.strerror(err), folder_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read(self, timeout):
+        """
+        Waits for events.
+
+        Args:
+            timeout (float): Longest wait in seconds.
+
+        Returns:
+            list: (mask, file name) pairs, empty on timeout. A mask with
+                IN_Q_OVERFLOW means events were lost.
+        """
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events, offset = [], 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            events.append((mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        """
+        Stops watching.
+
+        Returns:
+            None
+        """
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _Arrival:
+    """
+    A newly arrived file, shaped like the os.DirEntry objects the strategy
+    planners expect. Its stat result is read once and cached.
+    """
+
+    __slots__ = ("name", "path", "_stat")
+
+    def __init__(self, folder_path, name):
+        self.name = name
+        self.path = os.path.join(folder_path, name)
+        self._stat = None
+
+    def stat(self):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+
+def watch(folder_path, strategy="type", cancel_flag=None, workers=1, initial=True,
+          debounce=DEBOUNCE_SECONDS, on_batch=None, category_index=None):
+    """
+    Keeps organizing a folder as files arrive, until cancel_flag is set.
+
+    New files are routed through the same planners as the one-shot sorters,
+    and every move is recorded in one undo run for the whole session.
+
+    Args:
+        folder_path (str): Folder to watch.
+        strategy (str): "type" for category folders, "date" for year/month
+            folders.
+        cancel_flag (Event, optional): Stops watching when set. Without it
+            the watch runs until interrupted.
+        workers (int): Number of concurrent moves per batch.
+        initial (bool): Sort the files already in the folder first.
+        debounce (float): Quiet seconds before a closed file is filed.
+        on_batch (function, optional): Called with the executor after every
+            batch of arrivals has been filed.
+        category_index (CategoryIndex or RuleSet, optional): Rules of the
+            "type" strategy. Defaults to organize_files.default_category_index().
+
+    Raises:
+        FileNotFoundError: If the specified folder does not exist.
+        OSError: If inotify is not available.
+
+    Returns:
+        MoveExecutor: The executor of the session, with its totals.
+    """
+    if not os.path.isdir(folder_path):
+        logging.error(f"Folder does not exist: {folder_path}")
+        raise FileNotFoundError(f"Folder does not exist: {folder_path}")
+
+    plan_entries, undo_manager, sort_type = _STRATEGIES[strategy]
+    if strategy == "type":
+        if category_index is None:
+            category_index = organize_files.default_category_index()
+
+        def plan_entries(entries, root):
+            return organize_files._type_moves(entries, root, category_index)
+    executor = MoveExecutor(workers, undo_manager(), sort_type)
+    pending = {}  # File name -> time it may be filed
+
+    with Inotify(folder_path) as inotify:
+        # Watching starts before the initial scan, so no arrival falls between
+        if initial:
+            now = time.monotonic()
+            for name in _settled_files(folder_path):
+                pending[name] = now
+
+        logging.info(f"Watching {folder_path} ({strategy})")
+        while cancel_flag is None or not cancel_flag.is_set():
+            now = time.monotonic()
+            timeout = POLL_SECONDS
+            if pending:
+                timeout = min(timeout, min(pending.values()) - now)
+
+            for mask, name in inotify.read(timeout):
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped: fall back to a scan of the folder
+                    logging.warning("inotify queue overflowed, rescanning folder")
+                    for name in _settled_files(folder_path):
+                        pending.setdefault(name, time.monotonic() + debounce)
+                elif mask & (IN_ISDIR | IN_IGNORED) or name.endswith(PARTIAL_SUFFIXES):
+                    continue
+                elif mask & IN_MODIFY:
+                    # Written again after closing: wait for the next close
+                    pending.pop(name, None)
+                else:
+                    pending[name] = time.monotonic() + debounce
+
+            now = time.monotonic()
+            due = [name for name, ready in pending.items() if ready <= now]
+            if not due:
+                continue
+            for name in due:
+                del pending[name]
+
+            arrivals = [_Arrival(folder_path, name) for name in due
+                        if os.path.isfile(os.path.join(folder_path, name))]
+            if arrivals:
+                executor.execute_stream(plan_entries(arrivals, folder_path))
+                logging.info(executor.summary())
+                if on_batch is not None:
+                    on_batch(executor)
+
+    logging.info(f"Stopped watching {folder_path}")
+    return executor
+
+
+def _settled_files(folder_path):
+    """
+    Lists the files of a folder that may be filed, skipping downloads that
+    are still in progress.
+
+    Args:
+        folder_path (str): Watched folder.
+
+    Returns:
+        list: File names.
+    """
+    with os.scandir(folder_path) as it:
+        return [entry.name for entry in it
+                if entry.is_file() and not entry.name.endswith(PARTIAL_SUFFIXES)]